@@ -0,0 +1,960 @@
+'''
+Stores of experiments & configs.
+
+The controller loads & saves the list of experiments, the params of each
+experiment, the list of configs of each experiment & the params of each
+config through a config store. SQLiteConfigStore keeps all of them in a
+single SQLite database next to the controller, with a row per experiment
+& per config, indexed by name, so switching experiment or config is a
+single indexed read. Lists of configs only read the names of the configs;
+their params are only read when a config is loaded. Each save is a
+transaction, so a failed write doesn't leave a half-written config.
+
+Experiments saved in the old layout of folders (experiments.json, &
+experiment_params.json, configs.json & a folder with config_params.json
+for each config in each experiment folder) are migrated into the
+database when it is first opened; the migration is recorded in the same
+transaction, so one that failed is tried again, & the migrated configs
+with invalid params are reported. The folders are left in place, & are still where
+the files produced for an experiment or config (eg. frame timings &
+prerendered frames) are saved.
+
+If SQLite isn't available (it is optional under IronPython), the old
+layout of folders is used with FolderConfigStore, which has the same
+methods.
+
+The controller keeps the configs it has loaded (after converting their
+params) in a ConfigCache, so switching back to a recently used config
+doesn't read or convert it again.
+
+The controller doesn't save to the store itself: it marks what has
+changed as dirty in a SaveQueue, which saves it in a background thread
+once no more changes have been made for a moment, so a burst of edits
+is saved once & the UI thread never waits for a write. JSON files are
+written to a temporary file that then replaces the old one, so a crash
+can't leave a half-written file.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+import os
+import json
+import time
+import shutil
+import threading
+
+from collections import OrderedDict
+
+from stim_params import StimParams
+from param_validation import validate_configs, format_errors
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+# name of the database file
+STORE_FILE_NAME = "configs.db"
+
+# max # of configs kept in a ConfigCache
+DEFAULT_CACHE_CAPACITY = 32
+
+# time without changes after which a SaveQueue saves what has changed (s)
+DEFAULT_SAVE_DELAY = 0.5
+
+# names of the files of the old layout of folders
+EXPERIMENTS_FILE_NAME       = "experiments.json"
+EXPERIMENT_PARAMS_FILE_NAME = "experiment_params.json"
+CONFIGS_FILE_NAME           = "configs.json"
+CONFIG_PARAMS_FILE_NAME     = "config_params.json"
+
+SCHEMA = ["CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)",
+          "CREATE TABLE IF NOT EXISTS experiments (name TEXT PRIMARY KEY, position INTEGER, current_config TEXT, params TEXT, modified REAL)",
+          "CREATE TABLE IF NOT EXISTS configs (experiment TEXT, name TEXT, position INTEGER, params TEXT, modified REAL, PRIMARY KEY (experiment, name))"]
+
+class SQLiteConfigStore():
+    '''
+    Experiments & configs in a SQLite database.
+
+    Params are stored as JSON, along with the time (s since the epoch) at
+    which they were last saved. The load methods return None for anything
+    that hasn't been saved. The store can be used from any thread.
+    '''
+
+    def __init__(self, base_path, path=None):
+        self.base_path = base_path
+
+        if path is None:
+            path = os.path.join(base_path, STORE_FILE_NAME)
+
+        self.path = path
+
+        self.lock = threading.Lock()
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+
+        # with a write-ahead log, a transaction only needs to be synced to disk at checkpoints; it is still atomic
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+
+        with self.lock, self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+            migrated = self.connection.execute("SELECT 1 FROM state WHERE key = 'migrated'").fetchone() is not None
+
+        if not migrated:
+            self.migrate_folders()
+
+    def close(self):
+        self.connection.close()
+
+    # --- EXPERIMENTS --- #
+
+    def load_experiments(self):
+        # get the experiments list & current experiment
+        with self.lock:
+            names = [ row[0] for row in self.connection.execute("SELECT name FROM experiments ORDER BY position") ]
+            row   = self.connection.execute("SELECT value FROM state WHERE key = 'current_experiment'").fetchone()
+
+        if len(names) == 0 or row is None:
+            return None
+
+        return {'experiments_list': names,
+                'current_experiment': row[0]}
+
+    def save_experiments(self, experiments):
+        with self.lock, self.connection:
+            self.save_experiments_list(experiments['experiments_list'])
+
+            self.connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('current_experiment', ?)", (experiments['current_experiment'],))
+
+    def save_experiments_list(self, names):
+        # add experiments that aren't in the store yet & set the order of all of them, unless it hasn't changed
+        if [ row[0] for row in self.connection.execute("SELECT name FROM experiments ORDER BY position") ] == list(names):
+            return
+
+        for position, name in enumerate(names):
+            self.connection.execute("INSERT OR IGNORE INTO experiments (name) VALUES (?)", (name,))
+            self.connection.execute("UPDATE experiments SET position = ? WHERE name = ?", (position, name))
+
+    def load_experiment_params(self, experiment):
+        with self.lock:
+            row = self.connection.execute("SELECT params FROM experiments WHERE name = ?", (experiment,)).fetchone()
+
+        if row is None or row[0] is None:
+            return None
+
+        return json.loads(row[0])
+
+    def save_experiment_params(self, experiment, experiment_params):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO experiments (name, position) VALUES (?, (SELECT COUNT(*) FROM experiments))", (experiment,))
+            self.connection.execute("UPDATE experiments SET params = ?, modified = ? WHERE name = ?", (json.dumps(experiment_params), time.time(), experiment))
+
+    def rename_experiment(self, old_experiment, new_experiment):
+        # rename an experiment & its configs (& its folder, if it has one); get whether it was renamed
+        with self.lock:
+            if self.connection.execute("SELECT 1 FROM experiments WHERE name = ?", (new_experiment,)).fetchone() is not None:
+                return False
+
+            return self.rename_with_folder(os.path.join(self.base_path, old_experiment), os.path.join(self.base_path, new_experiment),
+                                           [("UPDATE experiments SET name = ? WHERE name = ?", (new_experiment, old_experiment)),
+                                            ("UPDATE configs SET experiment = ? WHERE experiment = ?", (new_experiment, old_experiment))])
+
+    def remove_experiment(self, experiment):
+        # remove an experiment & its configs (& its folder, if it has one); get whether it was removed
+        with self.lock, self.connection:
+            if not remove_folder(os.path.join(self.base_path, experiment)):
+                return False
+
+            self.connection.execute("DELETE FROM experiments WHERE name = ?", (experiment,))
+            self.connection.execute("DELETE FROM configs WHERE experiment = ?", (experiment,))
+
+        return True
+
+    # --- CONFIGS --- #
+
+    def load_configs(self, experiment):
+        # get the configs list & current config of an experiment, without the params of the configs
+        with self.lock:
+            names = [ row[0] for row in self.connection.execute("SELECT name FROM configs WHERE experiment = ? ORDER BY position", (experiment,)) ]
+            row   = self.connection.execute("SELECT current_config FROM experiments WHERE name = ?", (experiment,)).fetchone()
+
+        if len(names) == 0 or row is None or row[0] is None:
+            return None
+
+        return {'configs_list': names,
+                'current_config': row[0]}
+
+    def save_configs(self, experiment, configs):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO experiments (name, position) VALUES (?, (SELECT COUNT(*) FROM experiments))", (experiment,))
+
+            names = [ row[0] for row in self.connection.execute("SELECT name FROM configs WHERE experiment = ? ORDER BY position", (experiment,)) ]
+
+            if names != list(configs['configs_list']):
+                for position, name in enumerate(configs['configs_list']):
+                    self.connection.execute("INSERT OR IGNORE INTO configs (experiment, name) VALUES (?, ?)", (experiment, name))
+                    self.connection.execute("UPDATE configs SET position = ? WHERE experiment = ? AND name = ?", (position, experiment, name))
+
+            self.connection.execute("UPDATE experiments SET current_config = ? WHERE name = ?", (configs['current_config'], experiment))
+
+    def load_config_params(self, experiment, config):
+        with self.lock:
+            row = self.connection.execute("SELECT params FROM configs WHERE experiment = ? AND name = ?", (experiment, config)).fetchone()
+
+        if row is None or row[0] is None:
+            return None
+
+        return json.loads(row[0])
+
+    def save_config_params(self, experiment, config, config_params):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO configs (experiment, name, position) VALUES (?, ?, (SELECT COUNT(*) FROM configs WHERE experiment = ?))", (experiment, config, experiment))
+            self.connection.execute("UPDATE configs SET params = ?, modified = ? WHERE experiment = ? AND name = ?", (json.dumps(config_params), time.time(), experiment, config))
+
+    def rename_config(self, experiment, old_config, new_config):
+        # rename a config (& its folder, if it has one); get whether it was renamed
+        with self.lock:
+            if self.connection.execute("SELECT 1 FROM configs WHERE experiment = ? AND name = ?", (experiment, new_config)).fetchone() is not None:
+                return False
+
+            return self.rename_with_folder(os.path.join(self.base_path, experiment, old_config), os.path.join(self.base_path, experiment, new_config),
+                                           [("UPDATE configs SET name = ? WHERE experiment = ? AND name = ?", (new_config, experiment, old_config))])
+
+    def remove_config(self, experiment, config):
+        # remove a config (& its folder, if it has one); get whether it was removed
+        with self.lock, self.connection:
+            if not remove_folder(os.path.join(self.base_path, experiment, config)):
+                return False
+
+            self.connection.execute("DELETE FROM configs WHERE experiment = ? AND name = ?", (experiment, config))
+
+        return True
+
+    def rename_with_folder(self, old_folder, new_folder, updates):
+        # run the updates that rename an experiment or config & then rename its folder, in one transaction that is
+        # rolled back if the folder can't be renamed; the folder is renamed back if the transaction fails after that
+        renamed = False
+
+        try:
+            with self.connection:
+                for statement, values in updates:
+                    self.connection.execute(statement, values)
+
+                if not rename_folder(old_folder, new_folder):
+                    self.connection.rollback()
+                    return False
+
+                renamed = True
+        except sqlite3.Error:
+            if renamed:
+                rename_folder(new_folder, old_folder)
+
+            raise
+
+        return True
+
+    def modified_time(self, experiment, config):
+        # get the last time (s since the epoch) at which the params of an experiment or of one of its configs were saved
+        with self.lock:
+            experiment_row = self.connection.execute("SELECT modified FROM experiments WHERE name = ?", (experiment,)).fetchone()
+            config_row     = self.connection.execute("SELECT modified FROM configs WHERE experiment = ? AND name = ?", (experiment, config)).fetchone()
+
+        return max([ row[0] for row in (experiment_row, config_row) if row is not None and row[0] is not None ] or [0])
+
+    # --- MIGRATION --- #
+
+    def migrate_folders(self):
+        # copy the experiments & configs saved in the old layout of folders into the store, & record that they
+        # have been, in one transaction
+        experiments_path = os.path.join(self.base_path, EXPERIMENTS_FILE_NAME)
+        experiments      = load_json(experiments_path)
+
+        if experiments is None:
+            # there is nothing to migrate, unless the experiments couldn't be read
+            if not os.path.exists(experiments_path):
+                with self.lock, self.connection:
+                    self.record_migration()
+
+            return
+
+        with self.lock:
+            # stores created before migrations were recorded were migrated when they were created
+            if self.connection.execute("SELECT 1 FROM experiments").fetchone() is not None:
+                with self.connection:
+                    self.record_migration()
+
+                return
+
+        folder_store = FolderConfigStore(self.base_path)
+
+        n_configs = 0
+
+        # params of the migrated configs, to be checked once they are migrated
+        migrated_params = {}
+
+        with self.lock, self.connection:
+            for experiment in experiments['experiments_list']:
+                experiment_params = load_json(os.path.join(self.base_path, experiment, EXPERIMENT_PARAMS_FILE_NAME))
+                configs           = load_json(os.path.join(self.base_path, experiment, CONFIGS_FILE_NAME))
+
+                self.connection.execute("INSERT OR IGNORE INTO experiments (name) VALUES (?)", (experiment,))
+
+                if experiment_params is not None:
+                    self.connection.execute("UPDATE experiments SET params = ?, modified = ? WHERE name = ?", (json.dumps(experiment_params), folder_store.modified_time(experiment, None), experiment))
+
+                if configs is None:
+                    continue
+
+                self.connection.execute("UPDATE experiments SET current_config = ? WHERE name = ?", (configs['current_config'], experiment))
+
+                for position, config in enumerate(configs['configs_list']):
+                    config_params = load_json(os.path.join(self.base_path, experiment, config, CONFIG_PARAMS_FILE_NAME))
+
+                    self.connection.execute("INSERT OR IGNORE INTO configs (experiment, name) VALUES (?, ?)", (experiment, config))
+                    self.connection.execute("UPDATE configs SET position = ? WHERE experiment = ? AND name = ?", (position, experiment, config))
+
+                    if config_params is not None:
+                        self.connection.execute("UPDATE configs SET params = ?, modified = ? WHERE experiment = ? AND name = ?",
+                                                (json.dumps(config_params), os.path.getmtime(os.path.join(self.base_path, experiment, config, CONFIG_PARAMS_FILE_NAME)), experiment, config))
+
+                        migrated_params["{}/{}".format(experiment, config)] = config_params
+
+                    n_configs += 1
+
+            self.save_experiments_list(experiments['experiments_list'])
+
+            self.connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('current_experiment', ?)", (experiments['current_experiment'],))
+
+            self.record_migration()
+
+        print("SQLiteConfigStore: Migrated {} experiments & {} configs into {}.".format(len(experiments['experiments_list']), n_configs, self.path))
+
+        # report the migrated configs with invalid params, which are set to their defaults when they're loaded
+        all_errors = validate_configs(migrated_params, require_all=False)
+
+        for name in sorted(all_errors):
+            print("SQLiteConfigStore: Invalid config params in {} ({}).".format(name, format_errors(all_errors[name])))
+
+    def record_migration(self):
+        # record the time at which the old layout of folders was migrated, so that it isn't migrated again
+        self.connection.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('migrated', ?)", (str(time.time()),))
+
+class FolderConfigStore():
+    '''
+    Experiments & configs in the old layout of folders, with a JSON file
+    for each list & set of params.
+
+    Has the same methods as SQLiteConfigStore.
+    '''
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+
+    def close(self):
+        pass
+
+    # --- EXPERIMENTS --- #
+
+    def load_experiments(self):
+        return load_json(os.path.join(self.base_path, EXPERIMENTS_FILE_NAME))
+
+    def save_experiments(self, experiments):
+        save_json(os.path.join(self.base_path, EXPERIMENTS_FILE_NAME), experiments)
+
+    def load_experiment_params(self, experiment):
+        return load_json(os.path.join(self.base_path, experiment, EXPERIMENT_PARAMS_FILE_NAME))
+
+    def save_experiment_params(self, experiment, experiment_params):
+        save_json(os.path.join(self.base_path, experiment, EXPERIMENT_PARAMS_FILE_NAME), experiment_params)
+
+    def rename_experiment(self, old_experiment, new_experiment):
+        if os.path.exists(os.path.join(self.base_path, new_experiment)):
+            return False
+
+        return rename_folder(os.path.join(self.base_path, old_experiment), os.path.join(self.base_path, new_experiment))
+
+    def remove_experiment(self, experiment):
+        return remove_folder(os.path.join(self.base_path, experiment))
+
+    # --- CONFIGS --- #
+
+    def load_configs(self, experiment):
+        return load_json(os.path.join(self.base_path, experiment, CONFIGS_FILE_NAME))
+
+    def save_configs(self, experiment, configs):
+        save_json(os.path.join(self.base_path, experiment, CONFIGS_FILE_NAME), configs)
+
+    def load_config_params(self, experiment, config):
+        return load_json(os.path.join(self.base_path, experiment, config, CONFIG_PARAMS_FILE_NAME))
+
+    def save_config_params(self, experiment, config, config_params):
+        save_json(os.path.join(self.base_path, experiment, config, CONFIG_PARAMS_FILE_NAME), config_params)
+
+    def rename_config(self, experiment, old_config, new_config):
+        if os.path.exists(os.path.join(self.base_path, experiment, new_config)):
+            return False
+
+        return rename_folder(os.path.join(self.base_path, experiment, old_config), os.path.join(self.base_path, experiment, new_config))
+
+    def remove_config(self, experiment, config):
+        return remove_folder(os.path.join(self.base_path, experiment, config))
+
+    def modified_time(self, experiment, config):
+        paths = [os.path.join(self.base_path, experiment, EXPERIMENT_PARAMS_FILE_NAME)]
+
+        if config is not None:
+            paths.append(os.path.join(self.base_path, experiment, config, CONFIG_PARAMS_FILE_NAME))
+
+        return max([ os.path.getmtime(path) for path in paths if os.path.exists(path) ] or [0])
+
+class ConfigCache():
+    '''
+    Bounded cache of config params, by experiment & config name, which
+    forgets the least recently used config when it is full.
+
+    Configs are copied when they are taken out of the cache, so changes
+    to a config that haven't been saved don't end up in it. put() keeps
+    the params it is given without copying them, so params that will be
+    changed afterwards should be copied before they are cached.
+    '''
+
+    def __init__(self, capacity=DEFAULT_CACHE_CAPACITY):
+        self.capacity = capacity
+
+        self.configs = OrderedDict()
+
+        self.hits   = 0
+        self.misses = 0
+
+    def get(self, experiment, config):
+        # get a copy of the params of a config, or None if they aren't cached
+        key = (experiment, config)
+
+        config_params = self.configs.pop(key, None)
+
+        if config_params is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        # move the config to the most recently used end
+        self.configs[key] = config_params
+
+        return copy_params(config_params)
+
+    def put(self, experiment, config, config_params):
+        # cache the params of a config, which mustn't be changed afterwards
+        key = (experiment, config)
+
+        self.configs.pop(key, None)
+        self.configs[key] = config_params
+
+        while len(self.configs) > self.capacity:
+            self.configs.popitem(last=False)
+
+    def invalidate(self, experiment, config=None):
+        # forget a config, or all of the configs of an experiment
+        for key in list(self.configs):
+            if key[0] == experiment and (config is None or key[1] == config):
+                del self.configs[key]
+
+    def format_counts(self):
+        return "{} hits, {} misses, {} configs cached".format(self.hits, self.misses, len(self.configs))
+
+class SaveQueue():
+    '''
+    Saves documents (eg. the params of a config) in a background thread.
+
+    Each document has a key & a function that saves it. mark_dirty() takes
+    a copy of a document, which is saved once no document has been marked
+    for delay s; a document that is marked again before then is only saved
+    once, with its latest contents. A document that is the same as when it
+    was last saved (or loaded, see mark_clean()) isn't saved again.
+
+    Documents that are waiting to be saved can be read back with
+    pending(), so loading a document never gets an older version of it,
+    & changed_time() gives the time at which they were changed, eg. to
+    tell whether files made from them are out of date before they are
+    saved.
+    flush() saves everything straight away & close() also stops the
+    thread; the controller calls it when it closes.
+    '''
+
+    def __init__(self, delay=DEFAULT_SAVE_DELAY):
+        self.delay = delay
+
+        # documents waiting to be saved, the contents they were last saved with & the times at which documents
+        # that haven't been saved yet were last changed, by key
+        self.dirty = OrderedDict()
+        self.saved = {}
+
+        self.changed_times = {}
+
+        self.condition = threading.Condition()
+
+        self.running = True
+        self.saving  = False
+
+        self.last_marked_time = 0
+
+        self.n_marked = 0
+        self.n_saved  = 0
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def mark_dirty(self, key, save, document):
+        # save a copy of a document with save(document), unless it hasn't changed
+        with self.condition:
+            self.n_marked += 1
+
+            if key not in self.dirty and self.saved.get(key) == document:
+                return
+
+            self.dirty.pop(key, None)
+            self.dirty[key] = (save, copy_params(document))
+
+            self.last_marked_time = time.time()
+
+            self.changed_times[key] = self.last_marked_time
+
+            self.condition.notify_all()
+
+    def mark_clean(self, key, document):
+        # note that a document is stored with the given contents (eg. after it was loaded)
+        with self.condition:
+            if key not in self.dirty:
+                self.saved[key] = copy_params(document)
+
+    def forget_saved(self):
+        # forget what documents were last saved with (eg. after documents were renamed or removed in the store)
+        with self.condition:
+            self.saved.clear()
+
+    def pending(self, key):
+        # get a copy of a document that is waiting to be saved, or None
+        with self.condition:
+            if key not in self.dirty:
+                return None
+
+            return copy_params(self.dirty[key][1])
+
+    def changed_time(self, keys):
+        # get the last time (s since the epoch) at which any of the documents with the given keys were changed,
+        # if they haven't been saved since (including documents that are being saved), otherwise 0
+        with self.condition:
+            return max([0] + [ self.changed_times[key] for key in keys if key in self.changed_times ])
+
+    def run(self):
+        while True:
+            with self.condition:
+                # wait until documents have been marked & then left alone for the delay
+                while self.running and (len(self.dirty) == 0 or self.saving or time.time() - self.last_marked_time < self.delay):
+                    if len(self.dirty) == 0 or self.saving:
+                        self.condition.wait()
+                    else:
+                        self.condition.wait(self.delay - (time.time() - self.last_marked_time))
+
+                if not self.running:
+                    return
+
+                documents = self.take_dirty()
+
+            self.save_documents(documents)
+
+    def take_dirty(self):
+        # take the documents waiting to be saved (with the condition held)
+        documents = list(self.dirty.items())
+
+        self.dirty.clear()
+        self.saving = True
+
+        return documents
+
+    def save_documents(self, documents):
+        saved = []
+
+        for key, (save, document) in documents:
+            try:
+                save(document)
+
+                saved.append((key, document))
+            except Exception as error:
+                print("SaveQueue: Could not save {}: {}.".format(key, error))
+
+        with self.condition:
+            for key, document in saved:
+                self.saved[key] = document
+
+                # documents that were changed again while they were being saved are still waiting
+                if key not in self.dirty:
+                    self.changed_times.pop(key, None)
+
+            self.n_saved += len(saved)
+
+            self.saving = False
+            self.condition.notify_all()
+
+    def flush(self):
+        # save the documents waiting to be saved now, after any save in progress
+        with self.condition:
+            while self.saving:
+                self.condition.wait()
+
+            documents = self.take_dirty()
+
+        self.save_documents(documents)
+
+    def close(self):
+        # save everything & stop the thread
+        self.flush()
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        self.thread.join()
+
+    def format_counts(self):
+        return "{} changes, {} saves".format(self.n_marked, self.n_saved)
+
+# --- HELPER FUNCTIONS --- #
+
+def open_config_store(base_path):
+    # open the store of the experiments & configs in the given folder, using SQLite if it is available
+    if sqlite3 is not None:
+        try:
+            return SQLiteConfigStore(base_path)
+        except sqlite3.Error as error:
+            print("ConfigStore: Could not open {}: {}. Using folders instead.".format(os.path.join(base_path, STORE_FILE_NAME), error))
+
+    return FolderConfigStore(base_path)
+
+def load_json(path):
+    # load a JSON file, or get None if it doesn't exist or can't be read
+    if not os.path.exists(path) and os.path.exists(path + ".tmp"):
+        # a save was interrupted after the temporary file was written
+        path = path + ".tmp"
+
+    try:
+        with open(path, "r") as input_file:
+            return json.load(input_file)
+    except (IOError, OSError, ValueError):
+        return None
+
+def save_json(path, value):
+    # save a value as a JSON file, creating its folder if necessary; it is written to a temporary file
+    # first, so that the file is never left half-written
+    folder = os.path.dirname(path)
+
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    with open(path + ".tmp", "w") as output_file:
+        json.dump(value, output_file)
+
+    replace_file(path + ".tmp", path)
+
+def replace_file(new_path, path):
+    # replace a file with another one, atomically where possible (os.replace() isn't in Python 2)
+    if hasattr(os, "replace"):
+        os.replace(new_path, path)
+        return
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    os.rename(new_path, path)
+
+def copy_params(value):
+    # copy params made of dicts, lists & typed stim params of numbers, strings & bools
+    if isinstance(value, StimParams):
+        return value.copy()
+
+    if isinstance(value, dict):
+        return dict([ (key, copy_params(item)) for key, item in value.items() ])
+
+    if isinstance(value, list):
+        return [ copy_params(item) for item in value ]
+
+    return value
+
+def rename_folder(old_folder, new_folder):
+    # rename a folder if it exists; get whether that worked
+    if not os.path.exists(old_folder):
+        return True
+
+    try:
+        os.rename(old_folder, new_folder)
+    except OSError:
+        return False
+
+    return True
+
+def remove_folder(folder):
+    # delete a folder if it exists; get whether that worked
+    if not os.path.exists(folder):
+        return True
+
+    try:
+        shutil.rmtree(folder)
+    except OSError:
+        return False
+
+    return True
+
+# --- TESTS --- #
+
+def check_config_store(n_experiments=300, n_configs=10, n_switches=1000):
+    # save experiments & configs in the old layout of folders, migrate them into a SQLite store & check
+    # that both stores load the same params, & time switching experiment & config with each
+    import random
+    import tempfile
+
+    base_path = tempfile.mkdtemp()
+
+    try:
+        folder_store = FolderConfigStore(base_path)
+
+        experiment_names = [ "Experiment {}".format(i) for i in range(n_experiments) ]
+
+        # a migration that can't read the experiments isn't recorded, so it's tried again
+        with open(os.path.join(base_path, EXPERIMENTS_FILE_NAME), "w") as output_file:
+            output_file.write("{")
+
+        SQLiteConfigStore(base_path).close()
+
+        folder_store.save_experiments({'experiments_list': experiment_names, 'current_experiment': experiment_names[1]})
+
+        for experiment in experiment_names:
+            config_names = [ "Config {}".format(i) for i in range(n_configs) ]
+
+            folder_store.save_experiment_params(experiment, {'screen_cm_width': 20, 'width': 0.5, 'experiment': experiment})
+            folder_store.save_configs(experiment, {'configs_list': config_names, 'current_config': config_names[-1]})
+
+            for config in config_names:
+                folder_store.save_config_params(experiment, config, {'stim_list': ["grating"], 'types_list': ["Grating"], 'durations_list': [5.0],
+                                                                     'parameters_list': [{'frequency': 0.2, 'angle': len(config)}], 'TTL_params': {'delay': 10}})
+
+        # configs with invalid params are migrated, & reported
+        folder_store.save_config_params("Experiment 0", "Config 0", {'stim_list': ["grating"], 'types_list': ["Grating"], 'durations_list': [-5.0],
+                                                                     'parameters_list': [{'frequency': 0.2}], 'TTL_params': {'delay': 10}})
+
+        store = SQLiteConfigStore(base_path)
+
+        assert store.load_experiments() == folder_store.load_experiments()
+        assert store.load_config_params("Experiment 0", "Config 0")['durations_list'] == [-5.0]
+
+        for experiment in experiment_names[::37]:
+            assert store.load_experiment_params(experiment) == folder_store.load_experiment_params(experiment)
+            assert store.load_configs(experiment) == folder_store.load_configs(experiment)
+            assert store.load_config_params(experiment, "Config 3") == folder_store.load_config_params(experiment, "Config 3")
+
+        # renaming & removing keep the configs of an experiment & its folder
+        assert store.rename_experiment("Experiment 5", "Renamed")
+        assert not store.rename_experiment("Renamed", "Experiment 6")
+        assert store.load_config_params("Renamed", "Config 3") == folder_store.load_config_params("Renamed", "Config 3")
+
+        # if the folder can't be renamed, neither is the config
+        save_json(os.path.join(base_path, "Renamed", "Taken", "file.json"), {})
+        assert not store.rename_config("Renamed", "Config 2", "Taken")
+        assert "Config 2" in store.load_configs("Renamed")['configs_list'] and os.path.exists(os.path.join(base_path, "Renamed", "Config 2"))
+        remove_folder(os.path.join(base_path, "Renamed", "Taken"))
+
+        # the folders are only migrated once
+        store.save_experiment_params("Renamed", {'width': 1.0})
+        store.close()
+
+        store = SQLiteConfigStore(base_path)
+        assert store.load_experiment_params("Renamed") == {'width': 1.0}
+
+        assert store.remove_config("Renamed", "Config 3")
+        assert store.load_config_params("Renamed", "Config 3") is None
+        assert "Config 3" not in store.load_configs("Renamed")['configs_list']
+
+        # saving a config adds it to the end of its experiment
+        store.save_config_params("Renamed", "New Config", {'stim_list': []})
+        assert store.load_configs("Renamed")['configs_list'][-1] == "New Config"
+        assert store.modified_time("Renamed", "New Config") >= store.modified_time("Renamed", "Config 4")
+
+        # time switching to a random experiment, loading its current config & saving the current experiment, as the controller does
+        generator = random.Random(0)
+        experiments = [ generator.choice(experiment_names[6:]) for i in range(n_switches) ]
+
+        durations = []
+
+        for switch_store in (folder_store, store):
+            experiments_dict = switch_store.load_experiments()
+
+            start_time = time.time()
+            for experiment in experiments:
+                switch_store.load_experiment_params(experiment)
+                configs = switch_store.load_configs(experiment)
+                switch_store.load_config_params(experiment, configs['current_config'])
+
+                experiments_dict['current_experiment'] = experiment
+                switch_store.save_experiments(experiments_dict)
+            durations.append(time.time() - start_time)
+
+        store.close()
+
+        print("config store: {} experiments x {} configs; switching experiment takes {:.3f} ms with folders, {:.3f} ms with SQLite".format(n_experiments, n_configs, 1000.0*durations[0]/n_switches, 1000.0*durations[1]/n_switches))
+    finally:
+        shutil.rmtree(base_path)
+
+def check_config_cache(n_configs=16, n_lookups=10000):
+    # check that the cache forgets the least recently used configs, that cached configs can't be changed
+    # from outside of it & that invalidating works, & time a hit against loading a config from a store
+    import random
+    import tempfile
+
+    config_params = {'stim_list': ["grating", "dot"], 'types_list': ["Grating", "Moving Dot"], 'durations_list': [5.0, 3.0], 'TTL_params': {'delay': 10.0},
+                     'parameters_list': [{'frequency': 0.2, 'init_phase': 0.0, 'velocity': 5.0, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0.0},
+                                         {'radius': 10.0, 'moving_dot_init_x_pos': 0.0, 'moving_dot_init_y_pos': 0.0, 'v_x': 1.0, 'v_y': 0.0, 'moving_dot_brightness': 1.0, 'background_brightness': 0.0}]}
+
+    cache = ConfigCache(capacity=3)
+
+    for config in ["a", "b", "c"]:
+        cache.put("Experiment", config, config_params)
+
+    assert cache.get("Experiment", "a") == config_params
+    cache.put("Experiment", "d", config_params)
+
+    # "b" was the least recently used
+    assert cache.get("Experiment", "b") is None
+    assert cache.get("Experiment", "c") is not None
+
+    cached = cache.get("Experiment", "a")
+    cached['parameters_list'][0]['frequency'] = 1.0
+    assert cache.get("Experiment", "a")['parameters_list'][0]['frequency'] == 0.2
+
+    cache.invalidate("Experiment", "a")
+    assert cache.get("Experiment", "a") is None and cache.get("Experiment", "d") is not None
+
+    cache.invalidate("Experiment")
+    assert len(cache.configs) == 0
+
+    assert (cache.hits, cache.misses) == (5, 2), cache.format_counts()
+
+    from param_validation import validate_config, repaired_config
+    from stim_params import DEFAULT_STIM_PARAMS, STIM_PARAMS_CLASSES, config_params_from_json
+
+    TTL_params = {'delay': 10.0, 'frequency': 50.0, 'pulse_width': 1.0, 'duration': 5.0}
+
+    def load_config_params(store, config):
+        # load a config, check & repair its params & convert them to their types, as the controller does
+        loaded = store.load_config_params("Experiment", config)
+
+        errors = validate_config(loaded, require_all=False)
+
+        return config_params_from_json(repaired_config(loaded, errors, 10.0, TTL_params), STIM_PARAMS_CLASSES)
+
+    # time flipping between recently used configs, with & without the cache
+    base_path = tempfile.mkdtemp()
+
+    try:
+        store = SQLiteConfigStore(base_path)
+        cache = ConfigCache()
+
+        # configs of a few stims with their default params
+        config_params = {'stim_list': ["grating", "dot", "looming dot"], 'types_list': ["Grating", "Moving Dot", "Looming Dot"], 'durations_list': [5.0, 3.0, 2.0],
+                         'parameters_list': [ DEFAULT_STIM_PARAMS[stim_type] for stim_type in ["Grating", "Moving Dot", "Looming Dot"] ], 'TTL_params': TTL_params}
+
+        for i in range(n_configs):
+            store.save_config_params("Experiment", "Config {}".format(i), config_params)
+
+        generator = random.Random(0)
+        configs = [ "Config {}".format(generator.randrange(n_configs)) for i in range(n_lookups) ]
+
+        start_time = time.time()
+        for config in configs:
+            load_config_params(store, config)
+        store_duration = time.time() - start_time
+
+        start_time = time.time()
+        for config in configs:
+            if cache.get("Experiment", config) is None:
+                cache.put("Experiment", config, copy_params(load_config_params(store, config)))
+        cache_duration = time.time() - start_time
+
+        store.close()
+    finally:
+        shutil.rmtree(base_path)
+
+    print("config cache: {}; {:.1f} us per config from the store, {:.1f} us with the cache".format(cache.format_counts(), 1e6*store_duration/n_lookups, 1e6*cache_duration/n_lookups))
+
+def check_save_queue(n_edits=1000):
+    # check that a burst of edits is saved once with the latest contents, that unchanged documents aren't
+    # saved & that pending documents can be read back, & time marking a document dirty
+    saves = []
+
+    def save(document):
+        saves.append(document)
+
+    queue = SaveQueue(delay=0.2)
+
+    config_params = {'stim_list': ["grating"], 'durations_list': [5.0], 'parameters_list': [{'frequency': 0.2}]}
+
+    start_time = time.time()
+    for i in range(n_edits):
+        config_params['durations_list'][0] = float(i)
+        queue.mark_dirty(("config params", "Experiment", "Config"), save, config_params)
+    duration = time.time() - start_time
+
+    assert queue.pending(("config params", "Experiment", "Config"))['durations_list'] == [n_edits - 1.0]
+    assert len(saves) == 0
+
+    # unsaved changes have the time of the last edit, so files made before it are out of date
+    changed_time = queue.changed_time([("experiment params", "Experiment"), ("config params", "Experiment", "Config")])
+    assert start_time <= changed_time <= time.time()
+    assert queue.changed_time([("experiment params", "Experiment")]) == 0
+
+    time.sleep(0.5)
+
+    assert [ document['durations_list'] for document in saves ] == [[n_edits - 1.0]], len(saves)
+    assert queue.pending(("config params", "Experiment", "Config")) is None
+    assert queue.changed_time([("config params", "Experiment", "Config")]) == 0
+
+    # saving the same contents again does nothing, & nor do loaded documents that haven't changed
+    queue.mark_dirty(("config params", "Experiment", "Config"), save, config_params)
+    queue.mark_clean(("configs", "Experiment"), {'configs_list': ["Config"], 'current_config': "Config"})
+    queue.mark_dirty(("configs", "Experiment"), save, {'configs_list': ["Config"], 'current_config': "Config"})
+
+    # closing saves everything straight away
+    queue.mark_dirty(("experiments",), save, {'experiments_list': ["Experiment"], 'current_experiment': "Experiment"})
+    queue.close()
+
+    assert len(saves) == 2 and saves[1]['current_experiment'] == "Experiment", saves
+    assert not queue.thread.is_alive()
+
+    # an interrupted save leaves the temporary file, which is loaded instead
+    import tempfile
+
+    folder = tempfile.mkdtemp()
+
+    try:
+        path = os.path.join(folder, "configs.json")
+
+        save_json(path, {'configs_list': ["a"]})
+        save_json(path, {'configs_list': ["b"]})
+        assert load_json(path) == {'configs_list': ["b"]} and not os.path.exists(path + ".tmp")
+
+        os.rename(path, path + ".tmp")
+        assert load_json(path) == {'configs_list': ["b"]}
+    finally:
+        shutil.rmtree(folder)
+
+    print("save queue: {}; {:.1f} us to mark a config dirty".format(queue.format_counts(), 1e6*duration/n_edits))
+
+if __name__ == "__main__":
+    check_config_store()
+    check_config_cache()
+    check_save_queue()
@@ -1,628 +1,689 @@
-from param_window import ParamWindow
-from stim_window import StimWindow
-from black_projector_window import BlackProjectorWindow
-
-import threading
-import os
-import shutil
-import datetime
-import time
-import json
-
-from OpenTK import *
-from OpenTK.Graphics import *
-from OpenTK.Graphics.OpenGL import *
-from OpenTK.Input import *
-
-from shared import *
-
-class StimController():
-    def __init__(self):
-        print("Controller: Initializing.")
-
-        self.base_path = os.path.dirname(__file__)
-
-        self.display_index = 1
-
-        self.timer_thread = None
-
-        self.running_stim = False # whether the stimulation is running
-        self.begin_stim   = False # whether the stimulation needs to begin
-
-        # troubleshooting mode - this determines whether external triggers
-        # will affect the stimulation and stimulation parameters will be
-        # saved to a text file
-        self.troubleshooting = True
-
-        # load saved experiments
-        self.load_experiments()
-
-        # load experiment parameters for the current experiment
-        self.load_experiment_params()
-
-        # load saved configs
-        self.load_configs()
-
-        # load config parameters for the current config
-        self.load_config_params()
-
-        # initialize param & stim windows
-        self.param_window = None
-        self.stim_window  = None
-
-        self.black_projector_window = None
-        self.black_projector_thread = None
-
-        # try to use a second display (projector)
-        display = DisplayDevice.GetDisplay(DisplayIndex.Second)
-
-        if display is not None:
-            # start threads for param & stim windows
-            self.black_projector_thread = threading.Thread(target=self.create_black_projector_window)
-            self.black_projector_thread.start()
-
-            time.sleep(1)
-        else:
-            self.display_index = 0
-
-        # start threads for param & stim windows
-        self.param_thread = threading.Thread(target=self.create_param_window)
-        self.stim_thread  = threading.Thread(target=self.create_stim_window)
-        self.param_thread.start()
-        self.stim_thread.start()
-
-    def load_experiments(self):
-        print("Controller: Loading experiments.")
-
-        # stop any running stim
-        self.running_stim = False
-
-        # sete xperiments file
-        self.experiments_file = os.path.join(self.base_path, "experiments.json")
-
-        try:
-            # load experiments
-            with open(self.experiments_file, "r") as input_file:
-                self.experiments = json.load(input_file)
-        except:
-            # if none exist, create & save a default experiment
-            self.experiments = {'experiments_list': ['Default Experiment'],
-                                'current_experiment': 'Default Experiment'}
-            self.save_experiments()
-
-        print("Controller: Current experiment: {}.".format(self.experiments['current_experiment']))
-
-    def save_experiments(self):
-        print("Controller: Saving experiments in {}.".format(self.experiments_file))
-
-        # save experiments to file
-        with open(self.experiments_file, "w") as output_file:
-            json.dump(self.experiments, output_file)
-
-    def load_configs(self):
-        print("Controller: Loading configs for {}.".format(self.experiments['current_experiment']))
-
-        # stop any running stim
-        self.running_stim = False
-
-        # set path to current experiment
-        self.current_experiment_folder = os.path.join(self.base_path, self.experiments['current_experiment'])
-
-        # set configs file
-        self.configs_file = "configs.json"
-
-        # set path to configs file
-        self.configs_path = os.path.join(self.current_experiment_folder, self.configs_file)
-
-        try:
-            # load configs
-            with open(self.configs_path, "r") as input_file:
-                self.configs = json.load(input_file)
-        except:
-            # if none exist, create & save a default config
-            self.configs = {'configs_list': ['Default Config'],
-                           'current_config': 'Default Config'}
-            self.save_configs()
-
-        print("Controller: Current config: {}.".format(self.configs['current_config']))
-
-    def save_configs(self):
-        print("Controller: Saving configs in {}.".format(self.configs_path))
-
-        # save configs to file
-        with open(self.configs_path, "w") as output_file:
-            json.dump(self.configs, output_file)
-
-    def load_experiment_params(self):
-        print("Controller: Loading experiment params for {}.".format(self.experiments['current_experiment']))
-
-        # stop any running stim
-        self.running_stim = False
-
-        # set experiment folder
-        self.current_experiment_folder = os.path.join(self.base_path, self.experiments['current_experiment'])
-
-        # create a folder if necessary
-        if not os.path.exists(self.current_experiment_folder):
-            print("A folder for the current experiment does not exist. Creating a new folder.")
-            os.makedirs(self.current_experiment_folder)
-
-        # set experiment params file
-        self.experiment_params_file = "experiment_params.json"
-
-        # set path to experiment params file
-        self.experiment_params_path = os.path.join(self.current_experiment_folder, self.experiment_params_file)
-       
-        try:
-            # load experiment params
-            with open(self.experiment_params_path, "r") as input_file:
-                self.experiment_params = json.load(input_file)
-
-            # convert params to floats
-            for key in self.experiment_params:
-                try:
-                    self.experiment_params[key] = float(self.experiment_params[key])
-                except:
-                    pass
-        except:
-            # if none exist, create & save a default set of experiment params
-            self.experiment_params = DEFAULT_EXPERIMENT_PARAMS
-
-            # calculate resolution param
-            self.experiment_params['resolution'] = self.experiment_params['screen_px_width']/self.experiment_params['screen_cm_width']
-
-            self.save_experiment_params()
-
-    def save_experiment_params(self):
-        print("Controller: Saving experiment params in {}.".format(self.experiment_params_path))
-
-        # save experiment params to file
-        with open(self.experiment_params_path, "w") as output_file:
-            json.dump(self.experiment_params, output_file)
-
-    def set_experiment_params(self, new_params):
-        print("Controller: Setting experiment params.")
-
-        # set experiment params dict to a new one
-        self.experiment_params['screen_cm_width'] = new_params['screen_cm_width']
-        self.experiment_params['screen_px_width'] = new_params['screen_px_width']
-        self.experiment_params['distance']        = new_params['distance']
-        self.experiment_params['dish_radius']     = new_params['dish_radius']
-        self.experiment_params['warp_perspective'] = new_params['warp_perspective']
-        self.experiment_params['width']           = new_params['width']
-        self.experiment_params['height']          = new_params['height']
-        self.experiment_params['x_offset']        = new_params['x_offset']
-        self.experiment_params['y_offset']        = new_params['y_offset']
-
-        # calculate resolution param
-        self.experiment_params['resolution'] = self.experiment_params['screen_px_width']/self.experiment_params['screen_cm_width']
-
-    def load_config_params(self):
-        print("Controller: Loading config params for {}.".format(self.configs['current_config']))
-
-        # stop any running stim
-        self.running_stim = False
-
-        # set config folder
-        self.current_config_folder = os.path.join(self.current_experiment_folder, self.configs['current_config'])
-
-        # create a folder if necessary
-        if not os.path.exists(self.current_config_folder):
-            print("A folder for the current config does not exist. Creating a new folder.")
-            os.makedirs(self.current_config_folder)
-
-        # set config params file
-        self.config_params_file = "config_params.json"
-
-        # set path to config params file
-        self.config_params_path = os.path.join(self.current_config_folder, self.config_params_file)
-       
-        try:
-            # load config params
-            with open(self.config_params_path, "r") as input_file:
-                self.config_params = json.load(input_file)
-
-            # convert params to floats
-            for i, duration in enumerate(self.config_params['durations_list']):
-                self.config_params['durations_list'][i] = float(duration)
-
-            for i, params in enumerate(self.config_params['parameters_list']):
-                stim_type = self.config_params['types_list'][i]
-                self.config_params['parameters_list'][i] = self.default_stim_params(stim_type).copy()
-                for key in params:
-                    try:
-                        self.config_params['parameters_list'][i][key] = float(params[key])
-                    except:
-                        pass
-
-            for key in self.config_params['TTL_params']:
-                self.config_params['TTL_params'][key] = float(self.config_params['TTL_params'][key])
-
-        except:
-            # if none exist, create & save a default set of config params
-            self.config_params = DEFAULT_CONFIG_PARAMS
-
-            self.save_config_params()
-
-    def save_config_params(self):
-        print("Controller: Saving config params in {}.".format(self.config_params_path))
-
-        # save config params to file
-        with open(self.config_params_path, "w") as output_file:
-            json.dump(self.config_params, output_file)
-
-    def create_param_window(self):
-        print("Controller: Creating param window.")
-
-        self.param_window = ParamWindow(self)
-
-        # run param window
-        self.param_window.run()
-
-    def create_stim_window(self):
-        print("Controller: Creating stim window.")
-
-        self.stim_window = StimWindow(self, display_index=self.display_index)
-
-        # run stim window @ 60fps
-        self.stim_window.Run(60)
-
-    def create_black_projector_window(self):
-        print("Controller: Creating black projector window.")
-
-        self.black_projector_window = BlackProjectorWindow(self)
-
-        # run stim window @ 60fps
-        try:
-            self.black_projector_window.Run(60)
-        except:
-            pass
-
-    def start_stim(self, ignore_troubleshooting=False):
-        if ignore_troubleshooting or not self.troubleshooting:
-            print("Controller: Starting stim.")
-
-            self.timer_thread = Timer(self.param_window.progress_label, self)
-            self.timer_thread.start()
-
-            self.begin_stim   = True
-            self.running_stim = True
-
-            self.param_window.start_stop_button.Text = "Stop"
-
-    def stop_stim(self, ignore_troubleshooting=False):
-        if ignore_troubleshooting or not self.troubleshooting:
-            print("Controller: Stopping stim.")
-
-            if self.timer_thread:
-                self.timer_thread.running = False
-            self.timer_thread = None
-            self.param_window.progress_label.Text = ""
-
-            self.begin_stim   = False
-            self.running_stim = False
-
-            self.param_window.start_stop_button.Text = "Start"
-
-    def change_experiment(self, experiment_name):
-        print("Controller: Changing experiment to {}.".format(experiment_name))
-
-        # update experiments dict
-        self.experiments['current_experiment'] = experiment_name
-
-        # load experiment params
-        self.load_experiment_params()
-
-        # load configs for new experiment
-        self.load_configs()
-
-        # load config params
-        self.load_config_params()
-
-        # update stim params
-        self.stim_window.update_params()
-
-        # save new experiments dict
-        self.save_experiments()
-
-    def rename_experiment(self, old_experiment_name, new_experiment_name):
-        print("Controller: Renaming experiment '{0}' to '{1}'.".format(old_experiment_name, new_experiment_name))
-
-        # rename folder that corresponds to the experiment
-        try:
-            os.rename(old_experiment_name, new_experiment_name)
-        except:
-            return False
-
-        # update experiments dict
-        experiment_index = self.experiments['experiments_list'].index(old_experiment_name)
-        self.experiments['experiments_list'][experiment_index] = new_experiment_name
-        self.experiments['current_experiment'] = new_experiment_name
-
-        # load experiment params
-        self.load_experiment_params()
-
-        # load configs for new experiment
-        self.load_configs()
-
-        # load config params
-        self.load_config_params()
-
-        # save new experiments dict
-        self.save_experiments()
-
-        return True
-
-    def remove_experiment(self, experiment_name):
-        print("Controller: Removing experiment '{}'.".format(experiment_name))
-
-        try:
-            # delete folder that corresponds to the experiment
-            shutil.rmtree(os.path.join(self.base_path, experiment_name))
-        except:
-            return False
-
-        # update experiments dict
-        self.experiments['experiments_list'].remove(experiment_name)
-
-        # switch to the previous experiment
-        self.change_experiment(self.experiments['experiments_list'][-1])
-
-        # save new experiments dict
-        self.save_experiments()
-
-        return True
-
-    def change_config(self, config_name):
-        print("Controller: Changing config to {}.".format(config_name))
-
-        # update configs dict
-        self.configs['current_config'] = config_name
-
-        # load params for new config
-        self.load_config_params()
-
-        # update stim params
-        self.stim_window.update_params()
-
-        # save new configs dict
-        self.save_configs()
-
-    def rename_config(self, old_config_name, new_config_name):
-        print("Controller: Renaming config '{0}' to '{1}'.".format(old_config_name, new_config_name))
-
-        # rename folder that corresponds to the config
-        try:
-            old_config_folder = os.path.join(self.current_experiment_folder, old_config_name)
-            new_config_folder = os.path.join(self.current_experiment_folder, new_config_name)
-            os.rename(old_config_folder, new_config_folder)
-        except:
-            return False
-
-        # update configs dict
-        config_index = self.configs['configs_list'].index(old_config_name)
-        self.configs['configs_list'][config_index] = new_config_name
-        self.configs['current_config'] = new_config_name
-
-        # load params for new config
-        self.load_config_params()
-
-        # save new configs dict
-        self.save_configs()
-
-        return True
-
-    def remove_config(self, config_name):
-        print("Controller: Removing config '{}'.".format(config_name))
-
-        try:
-            # delete folder that corresponds to the config
-            config_folder = os.path.join(self.current_experiment_folder, config_name)
-            shutil.rmtree(config_folder)
-        except:
-            return False
-
-        # update configs dict
-        self.configs['configs_list'].remove(config_name)
-
-        # switch to the previous config
-        self.change_config(self.configs['configs_list'][-1])
-
-        # save new experiments dict
-        self.save_configs()
-
-        return True
-
-    def add_stim(self, stim_name, stim_type, stim_duration, stim_params):
-        print("Controller: Adding {0} stim '{1}'.".format(stim_type, stim_name))
-
-        # add stim to experiment params dict
-        self.config_params['stim_list'].append(stim_name)
-        self.config_params['durations_list'].append(stim_duration)
-        self.config_params['types_list'].append(stim_type)
-        self.config_params['parameters_list'].append(stim_params)
-
-        # update stim params
-        self.stim_window.update_params()
-
-    def remove_stim(self, stim_index):
-        print("Controller: Removing stim at index {}.".format(stim_index))
-
-        # remove stim from experiment params dict
-        del self.config_params['stim_list'][stim_index]
-        del self.config_params['durations_list'][stim_index]
-        del self.config_params['types_list'][stim_index]
-        del self.config_params['parameters_list'][stim_index]
-
-        # reset stim index
-        self.stim_window.stim_index = 0
-
-        # create the first stim
-        self.stim_window.create_stim()
-
-        # update stim params
-        self.stim_window.update_params()
-
-    def change_param(self, param_dimension, change_in_param):
-        self.stim_window.change_param(param_dimension, change_in_param)
-
-    def default_stim_params(self, stim_type):
-        # create new stim parameters
-        if stim_type == "Looming Dot":
-            stim_parameters = DEFAULT_LOOMING_DOT_PARAMS
-        elif stim_type == "Moving Dot":
-            stim_parameters = DEFAULT_MOVING_DOT_PARAMS
-        elif stim_type == "Combined Dots":
-            stim_parameters = DEFAULT_COMBINED_DOTS_PARAMS
-        elif stim_type == "Optomotor Grating":
-            stim_parameters = DEFAULT_OPTOMOTOR_GRATING_PARAMS
-        # elif stim_type == "Multiple Moving Dots":     ##Should give initial params?
-        #   stim_parameters = {'dot_params': [{'radius': 10.0,     ##moving dot from here
-        #                                           'moving_dot_init_x_pos': 0.0,
-        #                                           'moving_dot_init_y_pos': 0.0,
-        #                                           'v_x': 0.01,
-        #                                           'v_y': 0.0,
-        #                                           'l_v': 150,
-        #                                           'moving_dot_brightness': 1.0},
-        #                                           {'radius': 10.0,     ##moving dot from here
-        #                                           'moving_dot_init_x_pos': 0.0,
-        #                                           'moving_dot_init_y_pos': 0.0,
-        #                                           'v_x': 0.01,
-        #                                           'v_y': 0.0,
-        #                                           'l_v': 150,
-        #                                           'moving_dot_brightness': 1.0}]} ## moving dot to here
-        elif stim_type == "Grating":
-            stim_parameters = DEFAULT_GRATING_PARAMS
-        elif stim_type == "Broadband Grating":
-            stim_parameters = DEFAULT_BROADBAND_GRATING_PARAMS
-        elif stim_type == "White Flash":
-            stim_parameters = DEFAULT_WHITE_FLASH_PARAMS
-        elif stim_type in ("Delay", "Black Flash"):
-            stim_parameters = {}
-
-        return stim_parameters
-
-    def default_stim_duration(self):
-        return DEFAULT_STIM_DURATION
-
-    def current_stim_state(self):
-        return self.stim_window.current_stim_state()
-
-    def toggle_troubleshooting(self, sender=None, event=None):
-        self.troubleshooting = not self.troubleshooting
-
-        if self.troubleshooting == True:
-            print("Troubleshooting mode enabled.")
-        else:
-            print("Troubleshooting mode disabled.")
-
-    def restart_stim_window(self, display_index):
-        if display_index != self.display_index:
-            self.display_index = display_index
-
-            if self.stim_window:
-                self.stim_window.Dispose()
-
-            self.stim_window = None
-
-            self.stim_thread.join()
-
-            if self.display_index == 1:
-                # try to use a second display (projector)
-                display = DisplayDevice.GetDisplay(DisplayIndex.Second)
-
-                if display is not None:
-                    # start threads for param & stim windows
-                    self.black_projector_thread = threading.Thread(target=self.create_black_projector_window)
-                    self.black_projector_thread.start()
-
-                    time.sleep(1)
-                else:
-                    self.display_index = 0
-                    self.param_window.display_chooser.SelectedItem = "Monitor"
-
-            # start thread for stim window
-            self.stim_thread = threading.Thread(target=self.create_stim_window)
-            self.stim_thread.start()
-
-    def close_windows(self):
-        print("Controller: Closing windows.")
-
-        # close param & stim windows
-        if self.stim_window:
-            self.stim_window.Exit()
-
-        if self.black_projector_window:
-            self.black_projector_window.Exit()
-
-        if self.stim_thread:
-            # close the threads
-            self.stim_thread.join()
-
-        if self.black_projector_thread:
-            self.black_projector_thread.join()
-
-        self.stim_window            = None
-        self.param_window           = None
-        self.black_projector_window = None
-        self.param_thread           = None
-        self.stim_thread            = None
-        self.black_projector_thread = None
-
-        print("Controller: Closed all threads.")
-
-class Timer(threading.Thread):
-    def __init__(self, progress_label, controller):
-        super(Timer, self).__init__()
-        self.progress_label = progress_label
-        self.controller = controller
-        self.running = True
-
-    def run(self):
-        self.stim_start_time = time.time()
-
-        while self.running:
-            curr_time = time.time() - self.stim_start_time
-            minutes   = int(curr_time // 60)
-            seconds   = int(curr_time % 60)
-            stim_name = self.controller.stim_window.stim_name
-            self.progress_label.Text = "{0:02d}:{1:02d} - {2}".format(minutes, seconds, stim_name)
-
-# --- HELPER FUNCTIONS --- #
-
-def is_number(s):
-    try:
-        float(s)
-        return True
-    except ValueError:
-        return False
-
-def is_positive_number(s):
-    return is_number(s) and float(s) > 0
-
-def is_nonnegative_number(s):
-    return is_number(s) and float(s) >= 0
-
-def is_number_between_0_and_1(s):
-    return is_number(s) and 0 <= float(s) <= 1
-
-# ------------------------ #
-
-def add_heading_label(text, panel):
-    # add heading label
-    label = Label()
-    label.Parent = panel
-    label.Text = text
-    label.AutoSize = True
-    label.Font = controller.HEADER_FONT
-    label.Margin = Padding(0, 5, 0, 5)
-
-def add_param_label(text, panel):
-    # add param label
-    label = Label()
-    label.Parent = panel
-    label.Text = text
-    label.AutoSize = True
-    label.Font = controller.BODY_FONT
-    label.Margin = Padding(0, 5, 0, 0)
-    label.Width = panel.Width
+from param_window import ParamWindow
+from stim_window import StimWindow
+from black_projector_window import BlackProjectorWindow
+
+import threading
+import os
+import datetime
+import time
+import json
+import atexit
+
+from functools import partial
+
+from OpenTK import *
+from OpenTK.Graphics import *
+from OpenTK.Graphics.OpenGL import *
+from OpenTK.Input import *
+
+from shared import *
+
+from stim_table import TableCompiler
+from config_store import open_config_store, ConfigCache, SaveQueue, copy_params
+from param_validation import validate_config, validate_experiment_params, repaired_config, with_defaults, format_errors
+
+class StimController():
+    def __init__(self):
+        print("Controller: Initializing.")
+
+        self.base_path = os.path.dirname(__file__)
+
+        self.display_index = 1
+
+        self.timer_thread = None
+
+        self.running_stim = False # whether the stimulation is running
+        self.begin_stim   = False # whether the stimulation needs to begin
+
+        self.stim_table = None # compiled states of the stims on every frame
+
+        # compiles the config into a stim table in the background whenever its params change
+        self.table_compiler = TableCompiler()
+
+        self.frame_timings_path = None # where to save the frame timings of the next stimulation (by default, in the config's folder)
+
+        # troubleshooting mode - this determines whether external triggers
+        # will affect the stimulation and stimulation parameters will be
+        # saved to a text file
+        self.troubleshooting = True
+
+        # open the store of experiments & configs
+        self.store = open_config_store(self.base_path)
+
+        # configs that have been loaded, with their params converted
+        self.config_cache = ConfigCache()
+
+        # changes waiting to be saved in the background; anything left is saved when the program exits
+        self.saves = SaveQueue()
+        atexit.register(self.saves.flush)
+
+        # load saved experiments
+        self.load_experiments()
+
+        # load experiment parameters for the current experiment
+        self.load_experiment_params()
+
+        # load saved configs
+        self.load_configs()
+
+        # load config parameters for the current config
+        self.load_config_params()
+
+        # initialize param & stim windows
+        self.param_window = None
+        self.stim_window  = None
+
+        self.black_projector_window = None
+        self.black_projector_thread = None
+
+        # try to use a second display (projector)
+        display = DisplayDevice.GetDisplay(DisplayIndex.Second)
+
+        if display is not None:
+            # start threads for param & stim windows
+            self.black_projector_thread = threading.Thread(target=self.create_black_projector_window)
+            self.black_projector_thread.start()
+
+            time.sleep(1)
+        else:
+            self.display_index = 0
+
+        # start threads for param & stim windows
+        self.param_thread = threading.Thread(target=self.create_param_window)
+        self.stim_thread  = threading.Thread(target=self.create_stim_window)
+        self.param_thread.start()
+        self.stim_thread.start()
+
+    def load_experiments(self):
+        print("Controller: Loading experiments.")
+
+        # stop any running stim
+        self.running_stim = False
+
+        # load experiments
+        self.experiments = self.load_document(("experiments",), self.store.load_experiments)
+
+        if self.experiments is None:
+            # if none exist, create & save a default experiment
+            self.experiments = {'experiments_list': ['Default Experiment'],
+                                'current_experiment': 'Default Experiment'}
+            self.save_experiments()
+
+        print("Controller: Current experiment: {}.".format(self.experiments['current_experiment']))
+
+    def save_experiments(self):
+        print("Controller: Saving experiments.")
+
+        # save experiments to the store in the background
+        self.saves.mark_dirty(("experiments",), self.store.save_experiments, self.experiments)
+
+    def load_configs(self):
+        print("Controller: Loading configs for {}.".format(self.experiments['current_experiment']))
+
+        # stop any running stim
+        self.running_stim = False
+
+        # set path to current experiment
+        self.current_experiment_folder = os.path.join(self.base_path, self.experiments['current_experiment'])
+
+        # load configs
+        self.configs = self.load_document(("configs", self.experiments['current_experiment']),
+                                          partial(self.store.load_configs, self.experiments['current_experiment']))
+
+        if self.configs is None:
+            # if none exist, create & save a default config
+            self.configs = {'configs_list': ['Default Config'],
+                           'current_config': 'Default Config'}
+            self.save_configs()
+
+        print("Controller: Current config: {}.".format(self.configs['current_config']))
+
+    def save_configs(self):
+        print("Controller: Saving configs for {}.".format(self.experiments['current_experiment']))
+
+        # save configs to the store in the background
+        self.saves.mark_dirty(("configs", self.experiments['current_experiment']),
+                              partial(self.store.save_configs, self.experiments['current_experiment']), self.configs)
+
+    def load_experiment_params(self):
+        print("Controller: Loading experiment params for {}.".format(self.experiments['current_experiment']))
+
+        # stop any running stim
+        self.running_stim = False
+
+        # set experiment folder, where files produced for the experiment are saved
+        self.current_experiment_folder = os.path.join(self.base_path, self.experiments['current_experiment'])
+
+        # load experiment params
+        self.experiment_params = self.load_document(("experiment params", self.experiments['current_experiment']),
+                                                    partial(self.store.load_experiment_params, self.experiments['current_experiment']))
+
+        if self.experiment_params is not None:
+            # check the params, setting invalid params & params missing from experiments saved by older
+            # versions to their defaults
+            errors = validate_experiment_params(self.experiment_params, require_all=False)
+
+            if errors:
+                print("Controller: Invalid experiment params ({}).".format(format_errors(errors)))
+
+            self.experiment_params = with_defaults(self.experiment_params, errors, DEFAULT_EXPERIMENT_PARAMS)
+
+            # convert params to floats
+            for key in self.experiment_params:
+                try:
+                    self.experiment_params[key] = float(self.experiment_params[key])
+                except:
+                    pass
+        else:
+            # if none exist, create & save a default set of experiment params
+            self.experiment_params = DEFAULT_EXPERIMENT_PARAMS
+
+            # calculate resolution param
+            self.experiment_params['resolution'] = self.experiment_params['screen_px_width']/self.experiment_params['screen_cm_width']
+
+            self.save_experiment_params()
+
+    def save_experiment_params(self):
+        print("Controller: Saving experiment params for {}.".format(self.experiments['current_experiment']))
+
+        # save experiment params to the store in the background
+        self.saves.mark_dirty(("experiment params", self.experiments['current_experiment']),
+                              partial(self.store.save_experiment_params, self.experiments['current_experiment']), self.experiment_params)
+
+    def set_experiment_params(self, new_params):
+        print("Controller: Setting experiment params.")
+
+        # set experiment params dict to a new one
+        self.experiment_params['screen_cm_width'] = new_params['screen_cm_width']
+        self.experiment_params['screen_px_width'] = new_params['screen_px_width']
+        self.experiment_params['distance']        = new_params['distance']
+        self.experiment_params['dish_radius']     = new_params['dish_radius']
+        self.experiment_params['warp_perspective'] = new_params['warp_perspective']
+        self.experiment_params['width']           = new_params['width']
+        self.experiment_params['height']          = new_params['height']
+        self.experiment_params['x_offset']        = new_params['x_offset']
+        self.experiment_params['y_offset']        = new_params['y_offset']
+
+        # calculate resolution param
+        self.experiment_params['resolution'] = self.experiment_params['screen_px_width']/self.experiment_params['screen_cm_width']
+
+    def load_config_params(self):
+        print("Controller: Loading config params for {}.".format(self.configs['current_config']))
+
+        # stop any running stim
+        self.running_stim = False
+
+        # set config folder, where files produced for the config are saved
+        self.current_config_folder = os.path.join(self.current_experiment_folder, self.configs['current_config'])
+
+        # use the config's params if they have been loaded recently
+        config_params = self.config_cache.get(self.experiments['current_experiment'], self.configs['current_config'])
+
+        if config_params is not None:
+            print("Controller: Using cached config params ({}).".format(self.config_cache.format_counts()))
+
+            self.config_params = config_params
+            return
+
+        try:
+            # load config params
+            self.config_params = self.load_document(("config params", self.experiments['current_experiment'], self.configs['current_config']),
+                                                    partial(self.store.load_config_params, self.experiments['current_experiment'], self.configs['current_config']))
+
+            # check the params, setting invalid params to their defaults; params missing from configs saved
+            # by older versions are set to their defaults too, so they aren't reported
+            errors = validate_config(self.config_params, require_all=False)
+
+            if errors:
+                print("Controller: Invalid config params ({}).".format(format_errors(errors)))
+
+            self.config_params = repaired_config(self.config_params, errors, DEFAULT_STIM_DURATION, DEFAULT_TTL_PARAMS)
+
+            # convert params to their types
+            self.config_params = config_params_from_json(self.config_params, STIM_PARAMS_CLASSES)
+
+            # cache a copy of the params, since they are changed as they are edited
+            self.config_cache.put(self.experiments['current_experiment'], self.configs['current_config'], copy_params(self.config_params))
+        except:
+            # if none exist (or they can't be repaired), create & save a default set of config params
+            self.config_params = config_params_from_json(DEFAULT_CONFIG_PARAMS, STIM_PARAMS_CLASSES)
+
+            self.save_config_params()
+
+    def save_config_params(self):
+        print("Controller: Saving config params for {}.".format(self.configs['current_config']))
+
+        # save config params to the store in the background
+        self.saves.mark_dirty(("config params", self.experiments['current_experiment'], self.configs['current_config']),
+                              partial(self.store.save_config_params, self.experiments['current_experiment'], self.configs['current_config']), config_params_to_json(self.config_params))
+
+        # the cached params are replaced by a copy of the saved ones
+        self.config_cache.put(self.experiments['current_experiment'], self.configs['current_config'], copy_params(self.config_params))
+
+    def load_document(self, key, load):
+        # get a document (eg. config params) that is waiting to be saved, or load it from the store
+        document = self.saves.pending(key)
+
+        if document is None:
+            document = load()
+
+            if document is not None:
+                self.saves.mark_clean(key, document)
+
+        return document
+
+    def params_modified_time(self):
+        # get the last time (s since the epoch) at which the params of the current experiment or config were changed,
+        # including changes that are waiting to be saved
+        experiment = self.experiments['current_experiment']
+        config     = self.configs['current_config']
+
+        changed_time = self.saves.changed_time([("experiment params", experiment), ("config params", experiment, config)])
+
+        return max(changed_time, self.store.modified_time(experiment, config))
+
+    def create_param_window(self):
+        print("Controller: Creating param window.")
+
+        self.param_window = ParamWindow(self)
+
+        # run param window
+        self.param_window.run()
+
+    def create_stim_window(self):
+        print("Controller: Creating stim window.")
+
+        self.stim_window = StimWindow(self, display_index=self.display_index)
+
+        # run stim window @ 60fps
+        self.stim_window.Run(60)
+
+    def create_black_projector_window(self):
+        print("Controller: Creating black projector window.")
+
+        self.black_projector_window = BlackProjectorWindow(self)
+
+        # run stim window @ 60fps
+        try:
+            self.black_projector_window.Run(60)
+        except:
+            pass
+
+    def start_stim(self, ignore_troubleshooting=False):
+        if ignore_troubleshooting or not self.troubleshooting:
+            print("Controller: Starting stim.")
+
+            self.timer_thread = Timer(self.param_window.progress_label, self)
+            self.timer_thread.start()
+
+            # use the config's table, which has usually been compiled in the background since its params changed
+            if self.stim_window is not None:
+                self.stim_table = self.table_compiler.table(self.frame_rate(self.stim_window))
+            else:
+                self.stim_table = None
+
+            # start detecting dropped & duplicated frames
+            if self.stim_window is not None:
+                self.stim_window.swap_monitor.reset(self.stim_window.clock.period)
+
+            self.begin_stim   = True
+            self.running_stim = True
+
+            self.param_window.start_stop_button.Text = "Stop"
+
+    def compile_stim_table(self, stim_window):
+        # compile the current config into a table of the states of its stims on every frame in the background,
+        # for the given stim window at its measured refresh rate
+        print("Controller: Compiling config at {:.3f} Hz.".format(self.frame_rate(stim_window)))
+
+        self.table_compiler.request(stim_window, copy_params(self.config_params), self.frame_rate(stim_window))
+
+    def frame_rate(self, stim_window):
+        # get the refresh rate measured by the stim window (Hz)
+        return 1000.0/stim_window.clock.period
+
+    def stop_stim(self, ignore_troubleshooting=False):
+        if ignore_troubleshooting or not self.troubleshooting:
+            print("Controller: Stopping stim.")
+
+            if self.timer_thread:
+                self.timer_thread.running = False
+            self.timer_thread = None
+            self.param_window.progress_label.Text = ""
+
+            self.begin_stim   = False
+            self.running_stim = False
+
+            self.param_window.start_stop_button.Text = "Start"
+
+            self.save_frame_timings()
+
+            if self.stim_window is not None:
+                for line in self.stim_window.swap_monitor.format_counts():
+                    print("Controller: {}".format(line))
+
+                # the refresh rate has been measured again, so compile the table for the next stimulation at it
+                self.compile_stim_table(self.stim_window)
+
+    def save_frame_timings(self):
+        # summarize how long the frames of the stimulation took & save their timings
+        if self.stim_window is None or self.stim_window.timings.n_frames == 0:
+            return
+
+        timings = self.stim_window.timings
+        budget  = self.stim_window.clock.period
+
+        for line in timings.format_summary(budget):
+            print("Controller: {}".format(line))
+
+        if self.frame_timings_path is None:
+            path = os.path.join(self.current_config_folder, "frame timings.csv")
+        else:
+            path = self.frame_timings_path
+
+        try:
+            # config folders are only created when something is saved in them
+            if not os.path.exists(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+            timings.save(path, budget)
+        except (IOError, OSError) as error:
+            print("Controller: Could not save frame timings in {}: {}.".format(path, error))
+
+        self.frame_timings_path = None
+
+    def change_experiment(self, experiment_name):
+        print("Controller: Changing experiment to {}.".format(experiment_name))
+
+        # update experiments dict
+        self.experiments['current_experiment'] = experiment_name
+
+        # load experiment params
+        self.load_experiment_params()
+
+        # load configs for new experiment
+        self.load_configs()
+
+        # load config params
+        self.load_config_params()
+
+        # update stim params
+        self.stim_window.update_params()
+
+        # save new experiments dict
+        self.save_experiments()
+
+    def rename_experiment(self, old_experiment_name, new_experiment_name):
+        print("Controller: Renaming experiment '{0}' to '{1}'.".format(old_experiment_name, new_experiment_name))
+
+        # save any changes under the old name first
+        self.saves.flush()
+
+        # rename the experiment & the folder that corresponds to it
+        if not self.store.rename_experiment(old_experiment_name, new_experiment_name):
+            return False
+
+        # forget what was saved & cached under the old name
+        self.saves.forget_saved()
+        self.config_cache.invalidate(old_experiment_name)
+
+        # update experiments dict
+        experiment_index = self.experiments['experiments_list'].index(old_experiment_name)
+        self.experiments['experiments_list'][experiment_index] = new_experiment_name
+        self.experiments['current_experiment'] = new_experiment_name
+
+        # load experiment params
+        self.load_experiment_params()
+
+        # load configs for new experiment
+        self.load_configs()
+
+        # load config params
+        self.load_config_params()
+
+        # save new experiments dict
+        self.save_experiments()
+
+        return True
+
+    def remove_experiment(self, experiment_name):
+        print("Controller: Removing experiment '{}'.".format(experiment_name))
+
+        # save any changes first, so that they aren't saved after the experiment is deleted
+        self.saves.flush()
+
+        # delete the experiment & the folder that corresponds to it
+        if not self.store.remove_experiment(experiment_name):
+            return False
+
+        # forget what was saved & cached under the removed name
+        self.saves.forget_saved()
+        self.config_cache.invalidate(experiment_name)
+
+        # update experiments dict
+        self.experiments['experiments_list'].remove(experiment_name)
+
+        # switch to the previous experiment
+        self.change_experiment(self.experiments['experiments_list'][-1])
+
+        # save new experiments dict
+        self.save_experiments()
+
+        return True
+
+    def change_config(self, config_name):
+        print("Controller: Changing config to {}.".format(config_name))
+
+        # update configs dict
+        self.configs['current_config'] = config_name
+
+        # load params for new config
+        self.load_config_params()
+
+        # update stim params
+        self.stim_window.update_params()
+
+        # save new configs dict
+        self.save_configs()
+
+    def rename_config(self, old_config_name, new_config_name):
+        print("Controller: Renaming config '{0}' to '{1}'.".format(old_config_name, new_config_name))
+
+        # save any changes under the old name first
+        self.saves.flush()
+
+        # rename the config & the folder that corresponds to it
+        if not self.store.rename_config(self.experiments['current_experiment'], old_config_name, new_config_name):
+            return False
+
+        # forget what was saved & cached under the old name
+        self.saves.forget_saved()
+        self.config_cache.invalidate(self.experiments['current_experiment'], old_config_name)
+
+        # update configs dict
+        config_index = self.configs['configs_list'].index(old_config_name)
+        self.configs['configs_list'][config_index] = new_config_name
+        self.configs['current_config'] = new_config_name
+
+        # load params for new config
+        self.load_config_params()
+
+        # save new configs dict
+        self.save_configs()
+
+        return True
+
+    def remove_config(self, config_name):
+        print("Controller: Removing config '{}'.".format(config_name))
+
+        # save any changes first, so that they aren't saved after the config is deleted
+        self.saves.flush()
+
+        # delete the config & the folder that corresponds to it
+        if not self.store.remove_config(self.experiments['current_experiment'], config_name):
+            return False
+
+        # forget what was saved & cached under the removed name
+        self.saves.forget_saved()
+        self.config_cache.invalidate(self.experiments['current_experiment'], config_name)
+
+        # update configs dict
+        self.configs['configs_list'].remove(config_name)
+
+        # switch to the previous config
+        self.change_config(self.configs['configs_list'][-1])
+
+        # save new experiments dict
+        self.save_configs()
+
+        return True
+
+    def add_stim(self, stim_name, stim_type, stim_duration, stim_params):
+        print("Controller: Adding {0} stim '{1}'.".format(stim_type, stim_name))
+
+        # add stim to experiment params dict
+        self.config_params['stim_list'].append(stim_name)
+        self.config_params['durations_list'].append(stim_duration)
+        self.config_params['types_list'].append(stim_type)
+        self.config_params['parameters_list'].append(stim_params)
+
+        # update stim params
+        self.stim_window.update_params()
+
+    def remove_stim(self, stim_index):
+        print("Controller: Removing stim at index {}.".format(stim_index))
+
+        # remove stim from experiment params dict
+        del self.config_params['stim_list'][stim_index]
+        del self.config_params['durations_list'][stim_index]
+        del self.config_params['types_list'][stim_index]
+        del self.config_params['parameters_list'][stim_index]
+
+        # reset stim index
+        self.stim_window.stim_index = 0
+
+        # create the first stim
+        self.stim_window.create_stim()
+
+        # update stim params
+        self.stim_window.update_params()
+
+    def change_param(self, param_dimension, change_in_param):
+        self.stim_window.change_param(param_dimension, change_in_param)
+
+    def default_stim_params(self, stim_type):
+        # create new stim parameters
+        return STIM_PARAMS_CLASSES[stim_type]()
+
+    def default_stim_duration(self):
+        return DEFAULT_STIM_DURATION
+
+    def current_stim_state(self):
+        return self.stim_window.current_stim_state()
+
+    def toggle_troubleshooting(self, sender=None, event=None):
+        self.troubleshooting = not self.troubleshooting
+
+        if self.troubleshooting == True:
+            print("Troubleshooting mode enabled.")
+        else:
+            print("Troubleshooting mode disabled.")
+
+    def restart_stim_window(self, display_index):
+        if display_index != self.display_index:
+            self.display_index = display_index
+
+            if self.stim_window:
+                self.stim_window.Dispose()
+
+            self.stim_window = None
+
+            self.stim_thread.join()
+
+            if self.display_index == 1:
+                # try to use a second display (projector)
+                display = DisplayDevice.GetDisplay(DisplayIndex.Second)
+
+                if display is not None:
+                    # start threads for param & stim windows
+                    self.black_projector_thread = threading.Thread(target=self.create_black_projector_window)
+                    self.black_projector_thread.start()
+
+                    time.sleep(1)
+                else:
+                    self.display_index = 0
+                    self.param_window.display_chooser.SelectedItem = "Monitor"
+
+            # start thread for stim window
+            self.stim_thread = threading.Thread(target=self.create_stim_window)
+            self.stim_thread.start()
+
+    def close_windows(self):
+        print("Controller: Closing windows.")
+
+        # close param & stim windows
+        if self.stim_window:
+            self.stim_window.Exit()
+
+        if self.black_projector_window:
+            self.black_projector_window.Exit()
+
+        if self.stim_thread:
+            # close the threads
+            self.stim_thread.join()
+
+        if self.black_projector_thread:
+            self.black_projector_thread.join()
+
+        self.stim_window            = None
+        self.param_window           = None
+        self.black_projector_window = None
+        self.param_thread           = None
+        self.stim_thread            = None
+        self.black_projector_thread = None
+
+        # save any remaining changes
+        self.saves.close()
+
+        self.table_compiler.close()
+
+        print("Controller: Saved {}.".format(self.saves.format_counts()))
+        print("Controller: Closed all threads.")
+
+class Timer(threading.Thread):
+    def __init__(self, progress_label, controller):
+        super(Timer, self).__init__()
+        self.progress_label = progress_label
+        self.controller = controller
+        self.running = True
+
+    def run(self):
+        self.stim_start_time = time.time()
+
+        while self.running:
+            curr_time = time.time() - self.stim_start_time
+            minutes   = int(curr_time // 60)
+            seconds   = int(curr_time % 60)
+            stim_name = self.controller.stim_window.stim_name
+            self.progress_label.Text = "{0:02d}:{1:02d} - {2}".format(minutes, seconds, stim_name)
+
+# --- HELPER FUNCTIONS --- #
+
+def add_heading_label(text, panel):
+    # add heading label
+    label = Label()
+    label.Parent = panel
+    label.Text = text
+    label.AutoSize = True
+    label.Font = controller.HEADER_FONT
+    label.Margin = Padding(0, 5, 0, 5)
+
+def add_param_label(text, panel):
+    # add param label
+    label = Label()
+    label.Parent = panel
+    label.Text = text
+    label.AutoSize = True
+    label.Font = controller.BODY_FONT
+    label.Margin = Padding(0, 5, 0, 0)
+    label.Width = panel.Width
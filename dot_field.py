@@ -0,0 +1,302 @@
+'''
+Fields of moving dots.
+
+A DotField holds the dots of a stim as a struct of arrays: the positions
+at t = 0, velocities, radii & brightnesses of all of the dots are each
+stored in a single contiguous array. Every dot moves at a constant
+velocity & wraps around the bounds of the field, so its position at any
+time is computed directly from these arrays. The dots are uploaded to the
+backend once (see create_dots() in render_backend.py) and the whole field
+is then drawn in a single call for the current time, with the positions
+computed by the backend (on the GPU in the OpenTK backend), so drawing a
+frame doesn't loop over the dots in Python.
+
+Dots with limited lifetimes are kept in a DotSchedule, which is computed
+from a seed when a stim is set up: every life of every dot is a dot of
+its field, sorted by the time at which it is born, so the dots that are
+alive at any time are a contiguous range of the field that is looked up
+by bisection & drawn in the same single call.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+import array
+import bisect
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class DotField():
+    '''
+    Dots moving at constant velocities, as a struct of arrays.
+
+    Positions & radii are in the units the stim draws in (normalized
+    device coordinates of the frame buffer), velocities are per ms &
+    brightnesses are 0 - 1. Radii are horizontal; dots are drawn as
+    circles on the screen.
+    '''
+
+    # values per dot in the vertices uploaded to the backend: x, y, v_x, v_y, radius, brightness
+    stride = 6
+
+    def __init__(self, x, y, v_x, v_y, radius, brightness):
+        self.x          = array.array('f', x)
+        self.y          = array.array('f', y)
+        self.v_x        = array.array('f', v_x)
+        self.v_y        = array.array('f', v_y)
+        self.radius     = array.array('f', radius)
+        self.brightness = array.array('f', brightness)
+
+        self.n_dots = len(self.x)
+
+    def vertices(self):
+        # get the interleaved values of the dots, to be uploaded to the backend
+        vertices = array.array('f', [0.0])*(self.stride*self.n_dots)
+
+        vertices[0::self.stride] = self.x
+        vertices[1::self.stride] = self.y
+        vertices[2::self.stride] = self.v_x
+        vertices[3::self.stride] = self.v_y
+        vertices[4::self.stride] = self.radius
+        vertices[5::self.stride] = self.brightness
+
+        return vertices
+
+    def positions(self, t, bounds):
+        # get the x & y positions of the dots at time t (ms), wrapped into (x_0, y_0, x_1, y_1) bounds
+        return dot_positions(self.vertices(), self.stride, t, bounds)
+
+class DotSchedule():
+    '''
+    Dots with limited lifetimes, which are replaced by new dots when they
+    die, as a DotField with a dot for each life.
+
+    The dots of the field are sorted by birth time (ms) & each is alive
+    from its birth until lifetime ms later. Positions in the field are
+    extrapolated back to t = 0 from where each dot is born, so they are
+    computed from the time like those of any other field.
+    '''
+
+    def __init__(self, field, births, lifetime):
+        self.field    = field
+        self.births   = array.array('d', births)
+        self.lifetime = lifetime
+
+    def alive(self, t):
+        # get the index of the first dot alive at time t (ms) & the # of dots alive
+        first = bisect.bisect_right(self.births, t - self.lifetime)
+
+        return first, bisect.bisect_right(self.births, t) - first
+
+# fields computed by random_dot_field() & schedules computed by random_dot_kinematogram(), by their args
+_fields    = {}
+_schedules = {}
+
+# max # of fields & of schedules that are kept
+MAX_FIELDS    = 16
+MAX_SCHEDULES = 16
+
+# --- HELPER FUNCTIONS --- #
+
+def random_dot_field(n_dots, bounds, v_x, v_y, spread_x, spread_y, radius, brightness, seed=0):
+    # get a field of dots at random positions within the bounds, moving at the given velocity plus a
+    # random amount of up to spread_x & spread_y in either direction; the field only depends on the seed.
+    # Fields only depend on their args, so they are kept to be reused, like schedules
+    key = (n_dots, bounds, v_x, v_y, spread_x, spread_y, radius, brightness, seed)
+
+    if key in _fields:
+        return _fields[key]
+
+    generator = random.Random(seed)
+
+    x_0, y_0, x_1, y_1 = bounds
+
+    x = [ generator.uniform(x_0, x_1) for i in range(n_dots) ]
+    y = [ generator.uniform(y_0, y_1) for i in range(n_dots) ]
+
+    dot_v_x = [ v_x + generator.uniform(-spread_x, spread_x) for i in range(n_dots) ]
+    dot_v_y = [ v_y + generator.uniform(-spread_y, spread_y) for i in range(n_dots) ]
+
+    field = DotField(x, y, dot_v_x, dot_v_y, [radius]*n_dots, [brightness]*n_dots)
+
+    if len(_fields) >= MAX_FIELDS:
+        _fields.clear()
+
+    _fields[key] = field
+
+    return field
+
+def random_dot_kinematogram(n_dots, bounds, speed_x, speed_y, direction, coherence, lifetime, duration, radius, brightness, seed=0):
+    # get a schedule of n_dots dots that live for lifetime ms, covering the duration (ms); a coherence
+    # fraction of the dots move in the given direction (deg) & the rest in random directions, at a speed
+    # of speed_x horizontally & speed_y vertically (per ms). Dots are born at random positions within the
+    # bounds, with the first lives staggered so that the dots don't all die at once. Schedules only
+    # depend on their args, so they are kept to be reused (the stims of a config are set up when it
+    # is compiled, before it is shown)
+    key = (n_dots, bounds, speed_x, speed_y, direction, coherence, lifetime, duration, radius, brightness, seed)
+
+    if key in _schedules:
+        return _schedules[key]
+
+    generator = random.Random(seed)
+
+    x_0, y_0, x_1, y_1 = bounds
+
+    n_coherent = int(round(coherence*n_dots))
+
+    lives = []
+
+    for dot in range(n_dots):
+        birth = -generator.uniform(0, lifetime)
+
+        # cover the frame shown at the end of the duration
+        while birth < duration + lifetime:
+            x = generator.uniform(x_0, x_1)
+            y = generator.uniform(y_0, y_1)
+
+            if dot < n_coherent:
+                angle = math.radians(direction)
+            else:
+                angle = generator.uniform(0, 2*math.pi)
+
+            v_x = speed_x*math.cos(angle)
+            v_y = speed_y*math.sin(angle)
+
+            lives.append((birth, x - v_x*birth, y - v_y*birth, v_x, v_y))
+
+            birth += lifetime
+
+    lives.sort()
+
+    field = DotField([ life[1] for life in lives ], [ life[2] for life in lives ], [ life[3] for life in lives ],
+                     [ life[4] for life in lives ], [radius]*len(lives), [brightness]*len(lives))
+
+    schedule = DotSchedule(field, [ life[0] for life in lives ], lifetime)
+
+    if len(_schedules) >= MAX_SCHEDULES:
+        _schedules.clear()
+
+    _schedules[key] = schedule
+
+    return schedule
+
+def dot_positions(vertices, stride, t, bounds, first=0, count=None):
+    # get the wrapped x & y positions at time t (ms) of the dots in an interleaved vertex sequence,
+    # as arrays if NumPy is available (as the backends compute them), or lists otherwise
+    x_0, y_0, x_1, y_1 = bounds
+
+    if count is None:
+        count = len(vertices)//stride - first
+
+    if np is not None:
+        dots = np.asarray(vertices, np.float32).reshape(-1, stride)[first:first + count]
+
+        return (x_0 + np.mod(dots[:, 0] + dots[:, 2]*t - x_0, x_1 - x_0),
+                y_0 + np.mod(dots[:, 1] + dots[:, 3]*t - y_0, y_1 - y_0))
+
+    start = first*stride
+    end   = (first + count)*stride
+
+    return ([ x_0 + (x + v_x*t - x_0) % (x_1 - x_0) for x, v_x in zip(vertices[start:end:stride], vertices[start + 2:end:stride]) ],
+            [ y_0 + (y + v_y*t - y_0) % (y_1 - y_0) for y, v_y in zip(vertices[start + 1:end:stride], vertices[start + 3:end:stride]) ])
+
+# --- TESTS --- #
+
+def check_dot_field(n_dots=5000, n_frames=600):
+    # check that dot positions wrap into the bounds & match those of the dots moved one at a time, & time
+    # computing them for every frame
+    import time
+
+    bounds = (-0.55, -0.6, 0.55, 0.6)
+    width  = bounds[2] - bounds[0]
+
+    field = random_dot_field(n_dots, bounds, 0.002, -0.001, 0.001, 0.001, 0.01, 1.0, seed=3)
+
+    # fields are reused, & computing one again gives the same dots
+    assert random_dot_field(n_dots, bounds, 0.002, -0.001, 0.001, 0.001, 0.01, 1.0, seed=3) is field
+
+    _fields.clear()
+    assert random_dot_field(n_dots, bounds, 0.002, -0.001, 0.001, 0.001, 0.01, 1.0, seed=3).vertices() == field.vertices()
+
+    vertices = field.vertices()
+
+    for t in [0.0, 1000.0, 123456.7]:
+        x, y = dot_positions(vertices, field.stride, t, bounds)
+
+        assert min(x) >= bounds[0] and max(x) <= bounds[2]
+        assert min(y) >= bounds[1] and max(y) <= bounds[3]
+
+        # move the first 100 dots one at a time, wrapping whenever they leave the bounds
+        for i in range(100):
+            dot_x = field.x[i] + field.v_x[i]*t
+
+            while dot_x >= bounds[2]:
+                dot_x -= width
+            while dot_x < bounds[0]:
+                dot_x += width
+
+            # allow for positions that are wrapped differently due to rounding
+            assert min(abs(x[i] - dot_x), abs(abs(x[i] - dot_x) - width)) < 1e-3, (t, i)
+
+    first_x, first_y = dot_positions(vertices, field.stride, 1000.0, bounds, first=10, count=5)
+    assert list(first_x) == list(dot_positions(vertices, field.stride, 1000.0, bounds)[0][10:15])
+
+    start_time = time.time()
+    for frame in range(n_frames):
+        dot_positions(vertices, field.stride, frame*1000.0/60, bounds)
+    duration = time.time() - start_time
+
+    print("dot field: {} dots, {:.3f} ms/frame to compute positions ({})".format(n_dots, 1000.0*duration/n_frames, "NumPy" if np is not None else "lists"))
+
+def check_dot_schedule(n_dots=500, lifetime=100.0, duration=10000.0, frame_rate=60):
+    # check that the same # of dots are alive on every frame, that dots are born in the bounds & that the
+    # coherent dots move in the given direction, & time looking up the dots alive on a frame
+    import time
+
+    bounds = (-0.55, -0.6, 0.55, 0.6)
+
+    schedule = random_dot_kinematogram(n_dots, bounds, 0.002, 0.001, 90, 0.3, lifetime, duration, 0.01, 1.0, seed=5)
+
+    assert random_dot_kinematogram(n_dots, bounds, 0.002, 0.001, 90, 0.3, lifetime, duration, 0.01, 1.0, seed=5) is schedule
+    assert list(schedule.births) == sorted(schedule.births)
+
+    field = schedule.field
+    n_frames = int(duration*frame_rate/1000) + 1
+
+    for frame in range(n_frames):
+        t = frame*1000.0/frame_rate
+
+        first, count = schedule.alive(t)
+
+        assert count == n_dots, (frame, count)
+        assert schedule.births[first] > t - lifetime and schedule.births[first + count - 1] <= t
+
+    # dots are born within the bounds
+    for i in range(0, len(schedule.births), 97):
+        birth = schedule.births[i]
+
+        assert bounds[0] <= field.x[i] + field.v_x[i]*birth <= bounds[2]
+        assert bounds[1] <= field.y[i] + field.v_y[i]*birth <= bounds[3]
+
+    # 30% of the dots move straight up
+    first, count = schedule.alive(5000.0)
+    n_coherent = len([ i for i in range(first, first + count) if abs(field.v_x[i]) < 1e-9 and abs(field.v_y[i] - 0.001) < 1e-9 ])
+    assert n_coherent == int(round(0.3*n_dots)), n_coherent
+
+    start_time = time.time()
+    for frame in range(n_frames):
+        schedule.alive(frame*1000.0/frame_rate)
+    duration = time.time() - start_time
+
+    print("dot schedule: {} dots in {} lives, {:.2f} us/frame to look up the dots alive".format(n_dots, field.n_dots, 1e6*duration/n_frames))
+
+if __name__ == "__main__":
+    check_dot_field()
+    check_dot_schedule()
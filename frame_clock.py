@@ -0,0 +1,167 @@
+'''
+Frame-indexed stimulus clock.
+
+Stimulus time is derived from the number of refreshes since the start of
+the stimulation & the measured refresh period, instead of by adding up the
+measured times between updates, so timing jitter doesn't accumulate into
+the positions & phases of the stims. Stims compute their state from this
+time (see Motion), so the state on any frame can be recomputed without
+replaying the frames before it.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+# bounds on the measured refresh period, relative to the nominal one
+MIN_PERIOD_RATIO = 0.9
+MAX_PERIOD_RATIO = 1.1
+
+class FrameClock():
+    '''
+    Clock that counts refreshes.
+
+    tick() is called once per displayed frame with a timestamp (ms). The
+    number of refreshes since the last tick is the time since it divided by
+    the refresh period, rounded, so a dropped frame advances the count by
+    the refreshes that were missed & the stims stay in step with the wall
+    clock. The refresh period starts at the nominal one & is corrected for
+    drift by fitting a line to the timestamps of the frames against their
+    indices once min_samples frames have been seen.
+    '''
+
+    def __init__(self, frame_rate=60, min_samples=30):
+        self.nominal_period = 1000.0/frame_rate # ms
+        self.period         = self.nominal_period
+        self.min_samples    = min_samples
+
+        self.reset(0)
+
+    def reset(self, timestamp):
+        # start counting frames from the given timestamp (ms); the measured period is kept
+        self.frame          = 0
+        self.dropped_frames = 0
+
+        self.start_timestamp = timestamp
+        self.last_timestamp  = timestamp
+
+        # sums for the least-squares fit of (frame, time since start) pairs
+        self.n_samples = 1
+        self.sum_x  = 0.0
+        self.sum_y  = 0.0
+        self.sum_xx = 0.0
+        self.sum_xy = 0.0
+
+    def tick(self, timestamp):
+        # count the refreshes since the last tick & get the current time (ms)
+        n_frames = max(1, int(round((timestamp - self.last_timestamp)/self.period)))
+
+        self.frame += n_frames
+        self.dropped_frames += n_frames - 1
+
+        self.last_timestamp = timestamp
+
+        self.fit(self.frame, timestamp - self.start_timestamp)
+
+        return self.time()
+
+    def fit(self, x, y):
+        # add a sample to the fit & update the period with its slope
+        self.n_samples += 1
+        self.sum_x  += x
+        self.sum_y  += y
+        self.sum_xx += x*x
+        self.sum_xy += x*y
+
+        if self.n_samples < self.min_samples:
+            return
+
+        denominator = self.n_samples*self.sum_xx - self.sum_x**2
+
+        if denominator > 0:
+            period = (self.n_samples*self.sum_xy - self.sum_x*self.sum_y)/denominator
+
+            # ignore fits thrown off by stalls
+            if MIN_PERIOD_RATIO*self.nominal_period <= period <= MAX_PERIOD_RATIO*self.nominal_period:
+                self.period = period
+
+    def time(self):
+        # get the time of the current frame (ms)
+        return self.frame*self.period
+
+    def time_since(self, frame):
+        # get the time from the given frame to the current one (ms)
+        return (self.frame - frame)*self.period
+
+class Motion():
+    '''
+    Value that changes at a constant rate, such as a position or a phase.
+
+    The value at time t (ms) is computed from the value & time at which the
+    rate was last set, so it doesn't depend on how often it is evaluated.
+    Changing the rate continues from the value at the last time given.
+    '''
+
+    def __init__(self, value, rate):
+        self.value   = value # value at t_value
+        self.rate    = rate  # per ms
+        self.t_value = 0.0
+        self.t       = 0.0
+
+    def at(self, t):
+        # get the value at the given time
+        self.t = t
+
+        return self.value + self.rate*(t - self.t_value)
+
+    def change_rate(self, rate):
+        # change the rate, continuing from the current value
+        self.value   = self.at(self.t)
+        self.t_value = self.t
+        self.rate    = rate
+
+# --- TESTS --- #
+
+def check_frame_clock(n_frames=36000, period=1000.0/59.94, jitter=2.0, drop_every=997):
+    # run the clock for 10 min of frames at a refresh rate that differs from the nominal one, with
+    # jittered timestamps & dropped frames, & compare its time with the true time of each frame
+    import random
+
+    random.seed(0)
+
+    clock = FrameClock(60)
+    clock.reset(0)
+
+    frame = 0
+
+    worst_error = 0
+    worst_nominal_error = 0
+
+    for i in range(1, n_frames):
+        frame += 2 if i % drop_every == 0 else 1
+
+        timestamp = frame*period + random.uniform(-jitter, jitter)
+
+        t = clock.tick(timestamp)
+
+        worst_error = max(worst_error, abs(t - frame*period))
+
+        # error of counting frames at the nominal period, without drift correction
+        worst_nominal_error = max(worst_nominal_error, abs(clock.frame*clock.nominal_period - frame*period))
+
+        assert clock.frame == frame, i
+
+    print("frame clock: max error {:.3f} ms over {} frames ({} dropped, measured period {:.4f} ms, true {:.4f} ms); {:.1f} ms without drift correction".format(worst_error, n_frames, clock.dropped_frames, clock.period, period, worst_nominal_error))
+
+    assert abs(clock.period - period) < 1e-3
+    assert worst_error < 2*jitter + 0.5
+
+    # rate changes continue from the current value
+    motion = Motion(1.0, 0.5)
+    assert motion.at(10) == 6.0
+    motion.change_rate(-1.0)
+    assert motion.at(10) == 6.0 and motion.at(12) == 4.0
+
+if __name__ == "__main__":
+    check_frame_clock()
@@ -0,0 +1,228 @@
+'''
+Files of prerendered stimulus frames.
+
+A config can be rendered ahead of time (see prerender_config() in
+software_backend.py) into a frame file, which StimWindow then plays back by
+memory-mapping it & uploading one frame per refresh, so that playback costs
+the same no matter how complex the stims are. The file also holds the
+state of the stim (as given by current_stim_state()) on every frame, so
+the state that is logged is exactly the one that was displayed.
+
+Layout (little-endian):
+
+    header       HEADER_FORMAT, padded to DATA_OFFSET bytes
+    blocks       distinct frames, as width*height RGB texels with the bottom row first
+    table        block index of every frame (uint32)
+    states       JSON with the keys of every stim & the state on every frame
+
+Consecutive frames that are identical (eg. flashes & delays) share a block.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+import os
+import json
+import struct
+import array
+
+MAGIC   = b"VSFRAMES"
+VERSION = 1
+
+# magic, version, width, height, x offset, y offset, # of frames, # of blocks,
+# frame rate, table offset, states offset, states length
+HEADER_FORMAT = "<8sIIIiiIIdQQQ"
+
+# offset of the first block, leaving room for the header
+DATA_OFFSET = 4096
+
+# name of the frame file in a config's folder
+FRAME_FILE_NAME = "frames.dat"
+
+class FrameFileWriter():
+    '''
+    Writes frames & their states to a frame file.
+
+    Frames are given as width*height*3 byte strings, along with the state
+    dict & keys from current_stim_state().
+    '''
+
+    def __init__(self, path, width, height, x_offset=0, y_offset=0, frame_rate=60):
+        self.path       = path
+        self.width      = width
+        self.height     = height
+        self.x_offset   = x_offset
+        self.y_offset   = y_offset
+        self.frame_rate = frame_rate
+
+        self.frame_size = width*height*3
+
+        self.table      = array.array('I')
+        self.states     = []
+        self.keys       = {}
+        self.last_frame = None
+
+        # write to a temporary file, so that a frame file is never left half-written
+        self.temp_path = path + ".tmp"
+        self.file = open(self.temp_path, "wb")
+        self.file.write(b"\0"*DATA_OFFSET)
+
+        self.n_blocks = 0
+
+    def write(self, frame, state, keys):
+        # add a frame, reusing the previous block if the frame hasn't changed
+        if len(frame) != self.frame_size:
+            raise ValueError("Frame has {} bytes, expected {}.".format(len(frame), self.frame_size))
+
+        if frame != self.last_frame:
+            self.file.write(frame)
+            self.last_frame = frame
+            self.n_blocks += 1
+
+        self.table.append(self.n_blocks - 1)
+
+        self.states.append(state)
+        self.keys[state["stim #"]] = keys
+
+    def close(self):
+        # write the table, states & header, and move the file into place
+        table_offset = DATA_OFFSET + self.n_blocks*self.frame_size
+
+        self.file.write(table_to_bytes(self.table))
+
+        states = json.dumps({"keys": [ self.keys[index] for index in sorted(self.keys) ],
+                             "stim indices": sorted(self.keys),
+                             "frames": self.states}).encode("utf-8")
+
+        states_offset = table_offset + 4*len(self.table)
+
+        self.file.write(states)
+
+        self.file.seek(0)
+        self.file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.width, self.height, self.x_offset, self.y_offset,
+                                    len(self.table), self.n_blocks, self.frame_rate, table_offset, states_offset, len(states)))
+
+        self.file.close()
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        os.rename(self.temp_path, self.path)
+
+        print("FrameFileWriter: Wrote {} frames ({} distinct) to {}.".format(len(self.table), self.n_blocks, self.path))
+
+class FrameFile():
+    '''
+    Header, frame table & states of a frame file.
+
+    Frames themselves aren't read here; the texels of frame i are the
+    frame_size bytes at frame_offset(i), which StimWindow reads from a
+    memory-mapped view of the file (read_frame() reads them without one).
+    '''
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(path, "rb") as input_file:
+            header = input_file.read(struct.calcsize(HEADER_FORMAT))
+
+            if len(header) < struct.calcsize(HEADER_FORMAT) or header[:len(MAGIC)] != MAGIC:
+                raise ValueError("{} is not a frame file.".format(path))
+
+            (magic, version, self.width, self.height, self.x_offset, self.y_offset, self.n_frames, self.n_blocks,
+             self.frame_rate, table_offset, states_offset, states_length) = struct.unpack(HEADER_FORMAT, header)
+
+            if version != VERSION:
+                raise ValueError("{} has version {}, expected {}.".format(path, version, VERSION))
+
+            self.frame_size = self.width*self.height*3
+
+            input_file.seek(table_offset)
+            self.table = table_from_bytes(input_file.read(4*self.n_frames))
+
+            input_file.seek(states_offset)
+            states = json.loads(input_file.read(states_length).decode("utf-8"))
+
+        self.states = states["frames"]
+        self.keys   = dict(zip(states["stim indices"], states["keys"]))
+
+    def frame_offset(self, index):
+        # get the offset of the texels of the given frame
+        return DATA_OFFSET + self.table[index]*self.frame_size
+
+    def block_index(self, index):
+        # get the block holding the given frame, so that uploads can be skipped if it hasn't changed
+        return self.table[index]
+
+    def state(self, index):
+        # get the state dict & keys of the stim on the given frame
+        state = self.states[index]
+
+        return dict(state), list(self.keys[state["stim #"]])
+
+    def read_frame(self, index):
+        # read the texels of the given frame
+        with open(self.path, "rb") as input_file:
+            input_file.seek(self.frame_offset(index))
+
+            return input_file.read(self.frame_size)
+
+# --- HELPER FUNCTIONS --- #
+
+# whether the table needs to be byte-swapped to be stored little-endian
+_big_endian = struct.pack("=I", 1) != struct.pack("<I", 1)
+
+def table_to_bytes(table):
+    # get the little-endian bytes of a uint32 array
+    if _big_endian:
+        table = array.array('I', table)
+        table.byteswap()
+
+    # (arrays only have tostring() in IronPython 2.7)
+    return table.tobytes() if hasattr(table, "tobytes") else table.tostring()
+
+def table_from_bytes(data):
+    # get a uint32 array from little-endian bytes
+    table = array.array('I')
+
+    if hasattr(table, "frombytes"):
+        table.frombytes(data)
+    else:
+        table.fromstring(data)
+
+    if _big_endian:
+        table.byteswap()
+
+    return table
+
+def frame_file_path(config_folder):
+    # get the path of the frame file in a config's folder
+    return os.path.join(config_folder, FRAME_FILE_NAME)
+
+def open_frame_file(path, params_time=None, width=None, height=None):
+    # open a frame file if it exists, was saved after its params were last saved at params_time (s since
+    # the epoch) & has the given frame size; otherwise get None
+    if not os.path.exists(path):
+        return None
+
+    if params_time is not None and params_time > os.path.getmtime(path):
+        print("FrameFile: {} is older than its params; not using it.".format(path))
+        return None
+
+    try:
+        frame_file = FrameFile(path)
+    except (IOError, OSError, ValueError) as error:
+        print("FrameFile: Could not open {}: {}.".format(path, error))
+        return None
+
+    if frame_file.n_frames == 0:
+        print("FrameFile: {} has no frames; not using it.".format(path))
+        return None
+
+    if (width is not None and frame_file.width != width) or (height is not None and frame_file.height != height):
+        print("FrameFile: {} has {}x{} frames, but the viewport is {}x{}; not using it.".format(path, frame_file.width, frame_file.height, width, height))
+        return None
+
+    return frame_file
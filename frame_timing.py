@@ -0,0 +1,330 @@
+'''
+Per-frame timing instrumentation.
+
+StimWindow records how long each frame's update, render & buffer swap take
+in a FrameTimings ring buffer while the stimulation is running. The buffer
+is preallocated, so recording a frame is a few array stores. At the end of
+the stimulation the timings are saved to a CSV file & summarized per stim
+type, showing which stims don't fit in the refresh period.
+
+A frame is over budget if its update & render take longer than the refresh
+period. The swap isn't counted, since it waits for the next refresh & so
+takes up whatever time is left.
+
+StimWindow also timestamps every buffer swap with a SwapMonitor, which
+detects frames that weren't presented on time from the intervals between
+swaps, so that trials with corrupted stimuli can be excluded. A
+SimulatedDisplay stands in for a display with vsync, so this can be tested
+without one.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+import array
+import math
+import random
+
+# number of frames that are kept (~18 min at 60 Hz)
+DEFAULT_CAPACITY = 65536
+
+# percentiles given in summaries
+PERCENTILES = [50, 95, 99]
+
+class FrameTimings():
+    '''
+    Fixed-size ring buffer of the update, render & swap durations (ms) of
+    frames, along with the type of the stim shown on each.
+
+    record_update() starts a new frame & record_render() fills in its
+    render & swap durations. Once the buffer is full, the oldest frames
+    are overwritten.
+    '''
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+
+        self.update_durations = array.array('d', [0.0])*capacity
+        self.render_durations = array.array('d', [0.0])*capacity
+        self.swap_durations   = array.array('d', [0.0])*capacity
+        self.stim_type_codes  = array.array('i', [0])*capacity
+
+        # stim types, indexed by the codes stored for each frame
+        self.stim_types = []
+        self.stim_type_indices = {}
+
+        self.reset()
+
+    def reset(self):
+        # forget all recorded frames
+        self.n_frames = 0
+        self.index    = -1
+
+    def record_update(self, stim_type, duration):
+        # start a new frame showing the given stim type, with the given update duration
+        code = self.stim_type_indices.get(stim_type)
+
+        if code is None:
+            code = len(self.stim_types)
+
+            self.stim_types.append(stim_type)
+            self.stim_type_indices[stim_type] = code
+
+        self.index = self.n_frames % self.capacity
+        self.n_frames += 1
+
+        self.update_durations[self.index] = duration
+        self.render_durations[self.index] = 0.0
+        self.swap_durations[self.index]   = 0.0
+        self.stim_type_codes[self.index]  = code
+
+    def record_render(self, duration, swap_duration):
+        # set the render & swap durations of the current frame
+        if self.index >= 0:
+            self.render_durations[self.index] = duration
+            self.swap_durations[self.index]   = swap_duration
+
+    def frame_indices(self):
+        # get the buffer indices of the frames that are kept, oldest first, & the number of the first one
+        if self.n_frames <= self.capacity:
+            return list(range(self.n_frames)), 0
+
+        start = self.n_frames % self.capacity
+
+        return list(range(start, self.capacity)) + list(range(start)), self.n_frames - self.capacity
+
+    def summary(self, budget):
+        # get a dict of the # of frames, percentiles of durations & # of frames over the given budget (ms) for each stim type
+        durations = {}
+
+        for index in self.frame_indices()[0]:
+            stim_type = self.stim_types[self.stim_type_codes[index]]
+
+            if stim_type not in durations:
+                durations[stim_type] = ([], [], [])
+
+            update_durations, render_durations, swap_durations = durations[stim_type]
+
+            update_durations.append(self.update_durations[index])
+            render_durations.append(self.render_durations[index])
+            swap_durations.append(self.swap_durations[index])
+
+        summary = {}
+
+        for stim_type in durations:
+            update_durations, render_durations, swap_durations = durations[stim_type]
+
+            work_durations = [ update_durations[i] + render_durations[i] for i in range(len(update_durations)) ]
+
+            summary[stim_type] = {"frames": len(work_durations),
+                                  "over budget": len([ duration for duration in work_durations if duration > budget ]),
+                                  "update": percentiles(update_durations),
+                                  "render": percentiles(render_durations),
+                                  "swap": percentiles(swap_durations),
+                                  "update + render": percentiles(work_durations)}
+
+        return summary
+
+    def format_summary(self, budget):
+        # get a summary of the timings as lines of text
+        summary = self.summary(budget)
+
+        lines = ["{} frames, budget {:.2f} ms:".format(min(self.n_frames, self.capacity), budget)]
+
+        for stim_type in sorted(summary):
+            stim_summary = summary[stim_type]
+
+            lines.append("    {}: {} frames, {} over budget".format(stim_type, stim_summary["frames"], stim_summary["over budget"]))
+
+            for name in ["update", "render", "swap", "update + render"]:
+                lines.append("        {}: {}".format(name, ", ".join([ "p{} {:.2f} ms".format(percentile, value) for percentile, value in zip(PERCENTILES, stim_summary[name]) ])))
+
+        return lines
+
+    def save(self, path, budget):
+        # save the durations of every kept frame as a CSV file, followed by the summary
+        indices, first_frame = self.frame_indices()
+
+        print("FrameTimings: Saving {} frames in {}.".format(len(indices), path))
+
+        with open(path, "w") as output_file:
+            output_file.write("frame,stim type,update (ms),render (ms),swap (ms)\n")
+
+            for i in range(len(indices)):
+                index = indices[i]
+
+                output_file.write("{},{},{:.4f},{:.4f},{:.4f}\n".format(first_frame + i, self.stim_types[self.stim_type_codes[index]],
+                                  self.update_durations[index], self.render_durations[index], self.swap_durations[index]))
+
+            output_file.write("\n")
+
+            for line in self.format_summary(budget):
+                output_file.write("# {}\n".format(line))
+
+class SwapMonitor():
+    '''
+    Detects frames that weren't presented on time from the timestamps
+    (ms) of buffer swaps.
+
+    With vsync, consecutive swaps are one refresh period apart. If the
+    interval is n periods (rounded), the frame before was left on the
+    screen for n - 1 extra refreshes: those are counted as duplicated
+    frames (a vsync miss). If it is less than half a period, two frames
+    were swapped in the same refresh & the first was never shown: that is
+    counted as a dropped frame.
+
+    Events are kept in a list of (timestamp, stim #, stim name, stim type,
+    event, # of frames, interval) tuples, which is only appended to, so it
+    can be read from another thread while the stimulation is running.
+    '''
+
+    def __init__(self, frame_rate=60):
+        self.reset(1000.0/frame_rate)
+
+    def reset(self, period):
+        # forget all swaps & events, & detect them using the given refresh period (ms)
+        self.period = period
+
+        self.last_timestamp = None
+        self.n_swaps        = 0
+
+        self.events = []
+
+        # # of dropped & duplicated frames, & the name & type, of each stim
+        self.counts = {}
+
+    def swap(self, timestamp, stim_index, stim_name, stim_type):
+        # add a swap showing the given stim
+        if self.last_timestamp is not None:
+            interval = timestamp - self.last_timestamp
+
+            n_refreshes = int(round(interval/self.period))
+
+            if n_refreshes > 1:
+                self.add_event(timestamp, stim_index, stim_name, stim_type, "duplicated", n_refreshes - 1, interval)
+            elif n_refreshes == 0:
+                self.add_event(timestamp, stim_index, stim_name, stim_type, "dropped", 1, interval)
+
+        self.last_timestamp = timestamp
+        self.n_swaps += 1
+
+    def add_event(self, timestamp, stim_index, stim_name, stim_type, event, n_frames, interval):
+        if stim_index not in self.counts:
+            self.counts[stim_index] = {"stim name": stim_name, "stim type": stim_type, "dropped": 0, "duplicated": 0}
+
+        self.counts[stim_index][event] += n_frames
+
+        self.events.append((timestamp, stim_index, stim_name, stim_type, event, n_frames, interval))
+
+    def format_counts(self):
+        # get the # of dropped & duplicated frames of each stim as lines of text
+        lines = ["{} swaps, {} frame events:".format(self.n_swaps, len(self.events))]
+
+        for stim_index in sorted(self.counts):
+            counts = self.counts[stim_index]
+
+            lines.append("    {} ({} {}): {} dropped, {} duplicated".format(stim_index, counts["stim name"], counts["stim type"], counts["dropped"], counts["duplicated"]))
+
+        return lines
+
+class SimulatedDisplay():
+    '''
+    Stand-in for a display with vsync, for testing without one.
+
+    swap() does the given amount of work (ms) & then swaps buffers,
+    returning the time at which the swap returns: the next refresh, or
+    straight away if the swap doesn't wait for it. Refreshes can be given
+    jitter, as with the timestamps of a real display.
+    '''
+
+    def __init__(self, frame_rate=60, jitter=0.0, seed=0):
+        self.period = 1000.0/frame_rate
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+        self.time = 0.0
+
+    def swap(self, duration, wait=True):
+        ready_time = self.time + duration
+
+        if wait:
+            # wait for the first refresh after the frame is ready
+            self.time = (math.floor(ready_time/self.period + 1e-9) + 1)*self.period
+        else:
+            self.time = ready_time
+
+        return self.time + self.random.uniform(-self.jitter, self.jitter)
+
+# --- HELPER FUNCTIONS --- #
+
+def percentiles(values):
+    # get the PERCENTILES of a list of values, using the nearest rank
+    if len(values) == 0:
+        return [ 0.0 for percentile in PERCENTILES ]
+
+    values = sorted(values)
+
+    return [ values[max(0, min(len(values) - 1, int(-(-percentile*len(values)//100)) - 1))] for percentile in PERCENTILES ]
+
+# --- TESTS --- #
+
+def check_frame_timings(n_frames=100000, capacity=1000):
+    # check that the buffer keeps the latest frames & summarizes them per stim type, & time recording a frame
+    import time
+
+    timings = FrameTimings(capacity)
+
+    for frame in range(n_frames):
+        timings.record_update("Grating" if frame % 2 else "Moving Dot", frame % 100/10.0)
+        timings.record_render(10.0 if frame % 10 == 0 else 1.0, 5.0)
+
+    indices, first_frame = timings.frame_indices()
+
+    assert first_frame == n_frames - capacity
+    assert [ timings.update_durations[index] for index in indices[:3] ] == [ frame % 100/10.0 for frame in range(first_frame, first_frame + 3) ]
+
+    summary = timings.summary(1000.0/60)
+
+    assert summary["Grating"]["frames"] == summary["Moving Dot"]["frames"] == capacity//2
+    assert summary["Grating"]["update"] == [4.9, 9.5, 9.9], summary["Grating"]["update"]
+    assert summary["Grating"]["over budget"] == 0
+    assert summary["Moving Dot"]["over budget"] == 3*capacity//100
+
+    assert percentiles([3, 1, 2]) == [2, 3, 3]
+
+    start_time = time.time()
+    for frame in range(n_frames):
+        timings.record_update("Grating", 1.0)
+        timings.record_render(1.0, 1.0)
+    duration = time.time() - start_time
+
+    print("\n".join(timings.format_summary(1000.0/60)))
+    print("frame timings: {:.2f} us to record a frame".format(1e6*duration/n_frames))
+
+def check_swap_monitor(n_frames=600, frames_per_stim=150):
+    # check that vsync misses & early swaps on a simulated display are counted for the stims they happen in
+    display = SimulatedDisplay(60, jitter=1.0)
+    monitor = SwapMonitor(60)
+
+    # frames that take longer than a refresh (ms), & a frame that is swapped without waiting for one
+    slow_frames = {100: 20.0, 200: 20.0, 320: 40.0}
+    early_frame = 450
+
+    for frame in range(n_frames):
+        stim_index = frame//frames_per_stim
+
+        timestamp = display.swap(slow_frames.get(frame, 5.0), wait=frame != early_frame)
+
+        monitor.swap(timestamp, stim_index, "stim {}".format(stim_index), "Grating")
+
+    print("\n".join(monitor.format_counts()))
+
+    assert [ (monitor.counts[i]["dropped"], monitor.counts[i]["duplicated"]) for i in sorted(monitor.counts) ] == [(0, 1), (0, 1), (0, 2), (1, 0)]
+    assert [ event[4] for event in monitor.events ] == ["duplicated", "duplicated", "duplicated", "dropped"]
+    assert monitor.n_swaps == n_frames
+
+if __name__ == "__main__":
+    check_frame_timings()
+    check_swap_monitor()
@@ -0,0 +1,365 @@
+'''
+Validation of params against their schemas.
+
+The types & ranges of the params of each stim type are declared in
+STIM_PARAM_FIELDS (see stim_params.py), & those of experiment & TTL
+params below. A Validator is made for each schema when this module is
+imported, & checks a dict of params (eg. the text of a dialog's textboxes,
+or params loaded from JSON) in one pass, giving an error message for each
+invalid param. validate_config() checks a whole config (stims, durations
+& TTL params) & validate_configs() checks many configs at once, eg. for
+a batch of configs migrated into a store. repaired_config() &
+with_defaults() set the params that have errors to their defaults, so a
+config with a bad param can still be loaded.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+from stim_params import STIM_PARAM_FIELDS, NUMBER, POSITIVE, NONNEGATIVE, FRACTION, to_bool
+
+# name, type & range of experiment params
+EXPERIMENT_PARAM_FIELDS = [("screen_px_width", float, POSITIVE),
+                           ("screen_cm_width", float, POSITIVE),
+                           ("dish_radius", float, POSITIVE),
+                           ("width", float, POSITIVE),
+                           ("height", float, POSITIVE),
+                           ("x_offset", float, NONNEGATIVE),
+                           ("y_offset", float, NONNEGATIVE)]
+
+# name, type & range of TTL params
+TTL_PARAM_FIELDS = [("delay", float, NONNEGATIVE),
+                    ("frequency", float, POSITIVE),
+                    ("pulse_width", float, POSITIVE),
+                    ("duration", float, POSITIVE)]
+
+# range of stim durations
+DURATION_RANGE = NONNEGATIVE
+
+# lists of the stims of a config
+CONFIG_LISTS = ["stim_list", "durations_list", "types_list", "parameters_list"]
+
+INF = float("inf")
+
+class Validator():
+    '''
+    Checks of params against a schema of (name, type, range) fields.
+    '''
+
+    def __init__(self, fields):
+        self.fields = [ (name, field_type, field_range) for name, field_type, field_range in fields ]
+
+    def errors(self, params, require_all=True):
+        # get a dict of error messages for the params that are missing or invalid (empty if all are valid);
+        # if require_all is False, missing params aren't errors, eg. when they'll be set to their defaults
+        errors = {}
+
+        for name, field_type, field_range in self.fields:
+            if name not in params:
+                if require_all:
+                    errors[name] = "missing"
+                continue
+
+            error = value_error(params[name], field_type, field_range)
+
+            if error is not None:
+                errors[name] = error
+
+        return errors
+
+# validators for each stim type, experiment params & TTL params
+STIM_VALIDATORS = dict([ (stim_type, Validator(fields)) for stim_type, fields in STIM_PARAM_FIELDS.items() ])
+
+EXPERIMENT_VALIDATOR = Validator(EXPERIMENT_PARAM_FIELDS)
+TTL_VALIDATOR        = Validator(TTL_PARAM_FIELDS)
+
+# --- HELPER FUNCTIONS --- #
+
+def value_error(value, field_type, field_range):
+    # get an error message for a value that isn't of the given type & range, or None if it is
+    if field_type is bool:
+        # bools may be saved as 1 & 0 or as strings, as they are parsed (see stim_params.to_bool())
+        try:
+            to_bool(value)
+        except ValueError:
+            return "not true or false"
+
+        return None
+
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return "not a number"
+
+    if number != number or number in (INF, -INF):
+        return "not a finite number"
+
+    if field_type is int and number != int(number):
+        return "not a whole number"
+
+    minimum, maximum, exclusive_minimum = field_range
+
+    if minimum is not None and (number < minimum or (exclusive_minimum and number == minimum)):
+        return range_message(field_range)
+
+    if maximum is not None and number > maximum:
+        return range_message(field_range)
+
+    return None
+
+def range_message(field_range):
+    # describe a range of values in an error message
+    minimum, maximum, exclusive_minimum = field_range
+
+    if maximum is None:
+        if exclusive_minimum:
+            return "must be more than {}".format(minimum)
+
+        return "must be {} or more".format(minimum)
+
+    if minimum is None:
+        return "must be {} or less".format(maximum)
+
+    return "must be between {} and {}".format(minimum, maximum)
+
+def validate_stim_params(stim_type, params, require_all=True):
+    # get errors of the params of a stim of the given type, by param name
+    if stim_type not in STIM_VALIDATORS:
+        return {"stim type": "unknown stim type '{}'".format(stim_type)}
+
+    return STIM_VALIDATORS[stim_type].errors(params, require_all)
+
+def validate_experiment_params(params, require_all=True):
+    # get errors of experiment params, by param name
+    return EXPERIMENT_VALIDATOR.errors(params, require_all)
+
+def validate_TTL_params(params, require_all=True):
+    # get errors of TTL params, by param name
+    return TTL_VALIDATOR.errors(params, require_all)
+
+def validate_duration(duration):
+    # get an error message for an invalid stim duration, or None
+    return value_error(duration, float, DURATION_RANGE)
+
+def validate_config(config_params, require_all=True):
+    # get errors of a config's params, by their path in the config: eg. ("parameters_list", 2, "l_v"),
+    # ("durations_list", 0) or ("TTL_params", "delay"); if require_all is False, missing stim & TTL params
+    # aren't errors, eg. when loading a config saved before they were added
+    errors = {}
+
+    for key in CONFIG_LISTS + ["TTL_params"]:
+        if key not in config_params:
+            errors[(key,)] = "missing"
+
+    if errors:
+        return errors
+
+    n_stims = len(config_params['stim_list'])
+
+    for key in CONFIG_LISTS[1:]:
+        if len(config_params[key]) != n_stims:
+            errors[(key,)] = "has {} items for {} stims".format(len(config_params[key]), n_stims)
+
+    if errors:
+        return errors
+
+    for i in range(n_stims):
+        error = validate_duration(config_params['durations_list'][i])
+
+        if error is not None:
+            errors[('durations_list', i)] = error
+
+        stim_type = config_params['types_list'][i]
+
+        if stim_type not in STIM_VALIDATORS:
+            errors[('types_list', i)] = "unknown stim type '{}'".format(stim_type)
+            continue
+
+        for name, error in STIM_VALIDATORS[stim_type].errors(config_params['parameters_list'][i], require_all).items():
+            errors[('parameters_list', i, name)] = error
+
+    for name, error in TTL_VALIDATOR.errors(config_params['TTL_params'], require_all).items():
+        errors[('TTL_params', name)] = error
+
+    return errors
+
+def validate_configs(configs, require_all=True):
+    # get errors of many configs, given a dict of configs' params by name, for the configs that are invalid
+    all_errors = {}
+
+    for name in configs:
+        errors = validate_config(configs[name], require_all)
+
+        if errors:
+            all_errors[name] = errors
+
+    return all_errors
+
+def with_defaults(params, errors, defaults):
+    # get a copy of params (eg. experiment or TTL params) with the params that have errors or are missing set
+    # to their defaults, given errors by param name
+    repaired = dict(defaults)
+
+    for name in params:
+        if name not in errors:
+            repaired[name] = params[name]
+
+    return repaired
+
+def repaired_config(config_params, errors, default_duration, default_TTL_params):
+    # get a copy of a config's params with the stim params that have errors removed, so that they are set to
+    # their defaults when the params are converted to their types, & durations & TTL params that have errors
+    # (or are missing) set to their defaults; configs without their lists, or whose lists don't match, can't
+    # be repaired
+    for path in errors:
+        if len(path) == 1:
+            raise ValueError("Config params can't be repaired: {} {}.".format(path[0], errors[path]))
+
+    parameters_list = [ dict(params) for params in config_params['parameters_list'] ]
+    durations_list  = list(config_params['durations_list'])
+
+    TTL_errors = {}
+
+    for path in errors:
+        if path[0] == 'parameters_list' and len(path) == 3:
+            parameters_list[path[1]].pop(path[2], None)
+        elif path[0] == 'durations_list':
+            durations_list[path[1]] = default_duration
+        elif path[0] == 'TTL_params':
+            TTL_errors[path[1]] = errors[path]
+
+    return dict(config_params, durations_list=durations_list, parameters_list=parameters_list,
+                TTL_params=with_defaults(config_params['TTL_params'], TTL_errors, default_TTL_params))
+
+def format_errors(errors):
+    # describe errors in a message, eg. "l_v must be more than 0; durations_list[1] not a number"
+    messages = []
+
+    for key in sorted(errors, key=str):
+        if isinstance(key, tuple):
+            name = "".join([ "[{}]".format(part) if isinstance(part, int) else (part if i == 0 else "." + part) for i, part in enumerate(key) ])
+        else:
+            name = key
+
+        messages.append("{} {}".format(name, errors[key]))
+
+    return "; ".join(messages)
+
+# --- TESTS --- #
+
+def check_param_validation(n_configs=2000):
+    # check that invalid params are reported by name, that valid configs have no errors & that the stim
+    # params checks match the dialog's old checks, & time validating a batch of generated configs
+    import random
+    import time
+
+    def is_number(s):
+        try:
+            float(s)
+            return True
+        except ValueError:
+            return False
+
+    looming_dot_params = {'looming_dot_init_x_pos': "0", 'looming_dot_init_y_pos': "0", 'l_v': "20", 'looming_dot_brightness': "1.0",
+                          'background_brightness': "0", 'checkered': False, 'num_squares': "10", 'expand_checkered_pattern': True}
+
+    assert validate_stim_params("Looming Dot", looming_dot_params) == {}
+
+    errors = validate_stim_params("Looming Dot", dict(looming_dot_params, l_v="0", looming_dot_brightness="1.5", looming_dot_init_x_pos="left", num_squares="2.5"))
+
+    assert errors == {'l_v': "must be more than 0", 'looming_dot_brightness': "must be between 0 and 1",
+                      'looming_dot_init_x_pos': "not a number", 'num_squares': "not a whole number"}, errors
+
+    assert validate_stim_params("Grating", {'frequency': "0.2"})['angle'] == "missing"
+    assert validate_stim_params("Looming Dot", dict(looming_dot_params, checkered="false", expand_checkered_pattern="maybe")) == {'expand_checkered_pattern': "not true or false"}
+    assert validate_stim_params("Spiral", {}) == {"stim type": "unknown stim type 'Spiral'"}
+    assert validate_TTL_params({'delay': "-1", 'frequency': "50", 'pulse_width': "1", 'duration': "nan"}) == {'delay': "must be 0 or more", 'duration': "not a finite number"}
+    assert validate_experiment_params({'screen_px_width': 1280, 'screen_cm_width': 20, 'dish_radius': 100, 'width': 0.5, 'height': 0.5, 'x_offset': 0, 'y_offset': 0}) == {}
+
+    # the same values are valid as with the dialog's checks for each range
+    old_checks = {NUMBER: is_number,
+                  POSITIVE: lambda s: is_number(s) and float(s) > 0,
+                  NONNEGATIVE: lambda s: is_number(s) and float(s) >= 0,
+                  FRACTION: lambda s: is_number(s) and 0 <= float(s) <= 1}
+
+    for field_range in old_checks:
+        for value in ["-1", "0", "0.5", "1", "2", "", "x", "1e3"]:
+            assert (value_error(value, float, field_range) is None) == old_checks[field_range](value), (field_range, value)
+
+    # generate configs, a tenth of which have an invalid param
+    generator = random.Random(0)
+
+    configs = {}
+    invalid = set()
+
+    for i in range(n_configs):
+        parameters_list = []
+        types_list = []
+
+        for j in range(5):
+            stim_type = generator.choice(sorted(STIM_PARAM_FIELDS))
+            fields = STIM_PARAM_FIELDS[stim_type]
+
+            types_list.append(stim_type)
+            parameters_list.append(dict([ (name, 1 if field_type is not bool else True) for name, field_type, field_range in fields ]))
+
+        config = {'stim_list': [ "stim {}".format(j) for j in range(5) ], 'durations_list': [5.0]*5, 'types_list': types_list,
+                  'parameters_list': parameters_list, 'TTL_params': {'delay': 10.0, 'frequency': 50.0, 'pulse_width': 1.0, 'duration': 5.0}}
+
+        if i % 10 == 0:
+            config['durations_list'][2] = -1.0
+            invalid.add("config {}".format(i))
+
+        configs["config {}".format(i)] = config
+
+    start_time = time.time()
+    all_errors = validate_configs(configs)
+    duration = time.time() - start_time
+
+    assert set(all_errors) == invalid
+    assert all_errors["config 0"] == {('durations_list', 2): "must be 0 or more"}
+    assert format_errors(all_errors["config 0"]) == "durations_list[2] must be 0 or more"
+
+    config = configs["config 1"]
+    config['types_list'][0] = "Multiple Moving Dots"
+    config['parameters_list'][0] = {'n_dots': 100, 'radius': -1, 'v_x': 5.0, 'v_y': 0.0, 'velocity_spread': 0.0, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': "x"}
+    errors = validate_config(config)
+
+    assert errors == {('parameters_list', 0, 'radius'): "must be 0 or more", ('parameters_list', 0, 'seed'): "not a number"}, errors
+    assert sorted(repaired_config(config, errors, 10.0, {})['parameters_list'][0]) == ['background_brightness', 'dot_brightness', 'n_dots', 'v_x', 'v_y', 'velocity_spread']
+    assert 'seed' in config['parameters_list'][0]
+    assert validate_config(dict(config, types_list=config['types_list'][:4])) == {('types_list',): "has 4 items for 5 stims"}
+
+    # params missing from old configs are only errors if all params are required
+    del config['parameters_list'][0]['seed']
+    del config['TTL_params']['pulse_width']
+
+    assert validate_config(config) == {('parameters_list', 0, 'radius'): "must be 0 or more", ('parameters_list', 0, 'seed'): "missing", ('TTL_params', 'pulse_width'): "missing"}
+    assert validate_config(config, require_all=False) == {('parameters_list', 0, 'radius'): "must be 0 or more"}
+    assert validate_stim_params("Grating", {'frequency': "0.2"}) != {}
+    assert validate_stim_params("Grating", {'frequency': "0.2"}, require_all=False) == {}
+
+    # invalid durations & TTL params are set to their defaults, as are missing TTL params
+    config['durations_list'][3] = "x"
+    config['TTL_params']['delay'] = -1.0
+    errors = validate_config(config, require_all=False)
+    repaired = repaired_config(config, errors, 10.0, {'delay': 10.0, 'frequency': 50.0, 'pulse_width': 1.0, 'duration': 5.0})
+
+    assert repaired['durations_list'] == [5.0, 5.0, 5.0, 10.0, 5.0] and config['durations_list'][3] == "x"
+    assert repaired['TTL_params'] == {'delay': 10.0, 'frequency': 50.0, 'pulse_width': 1.0, 'duration': 5.0}
+    assert validate_config(repaired, require_all=False) == {}
+
+    try:
+        repaired_config(dict(config, types_list=config['types_list'][:4]), {('types_list',): "has 4 items for 5 stims"}, 10.0, {})
+        assert False
+    except ValueError:
+        pass
+
+    assert with_defaults({'width': "x", 'height': 0.2, 'resolution': 64.0}, {'width': "not a number"}, {'width': 0.5, 'height': 0.5, 'x_offset': 0}) == {'width': 0.5, 'height': 0.2, 'x_offset': 0, 'resolution': 64.0}
+
+    print("param validation: {} configs of 5 stims validated in {:.1f} ms ({:.1f} us per config), {} invalid".format(n_configs, 1000*duration, 1e6*duration/n_configs, len(all_errors)))
+
+if __name__ == "__main__":
+    check_param_validation()
@@ -1,83 +1,378 @@
-'''
-Implementation of 1-dimensional Perlin noise.
-
-Adapted from https://github.com/caseman/noise.
-'''
-
-from math import floor
-
-def lerp(t, a, b):
-	return ((a) + (t) * ((b) - (a)))
-
-PERM = [
-  151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
-  36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
-  234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
-  88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
-  134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
-  230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
-  1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
-  116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
-  124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
-  47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
-  154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
-  108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
-  242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
-  239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
-  50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
-  141, 128, 195, 78, 66, 215, 61, 156, 180, 151, 160, 137, 91, 90, 15, 131,
-  13, 201, 95, 96, 53, 194, 233, 7, 225, 140, 36, 103, 30, 69, 142, 8, 99, 37,
-  240, 21, 10, 23, 190, 6, 148, 247, 120, 234, 75, 0, 26, 197, 62, 94, 252,
-  219, 203, 117, 35, 11, 32, 57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125,
-  136, 171, 168, 68, 175, 74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158,
-  231, 83, 111, 229, 122, 60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245,
-  40, 244, 102, 143, 54, 65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187,
-  208, 89, 18, 169, 200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198,
-  173, 186, 3, 64, 52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126,
-  255, 82, 85, 212, 207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223,
-  183, 170, 213, 119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167,
-  43, 172, 9, 129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185,
-  112, 104, 218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179,
-  162, 241, 81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199,
-  106, 157, 184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236,
-  205, 93, 222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156,
-  180]
-
-def grad1(hash, x):
-	g = (hash & 7) + 1.0
-	if (hash & 8):
-		g = -1
-	return (g * x)
-
-def noise1(x, repeat, base):
-	i = int(floor(x) % repeat)
-	ii = (i + 1) % repeat
-	i = (i & 255) + base
-	ii = (i & 255) + base
-
-	x -= floor(x)
-	fx = x*x*x * (x * (x * 6 - 15) + 10)
-
-	return lerp(fx, grad1(PERM[i], x), grad1(PERM[ii], x - 1)) * 0.4
-
-def pnoise1(x, octaves=1, persistence=0.5, lacunarity=2.0, repeat=1024, base=0):
-	kwlist = ["x", "octaves", "persistence", "lacunarity", "repeat", "base"]
-	
-	if octaves == 1:
-		# Single octave, return simple noise
-		return noise1(x, repeat, base)
-	elif octaves > 1:
-		freq = 1.0
-		amp = 1.0
-		max = 0.0
-		total = 0.0
-
-		for i in range(octaves):
-			total += noise1(x * freq, int(repeat * freq), base) * amp
-			max += amp
-			freq *= lacunarity
-			amp *= persistence
-		return (total / max)
-	else:
-		print("Expected octaves value > 0")
-		return NULL
\ No newline at end of file
+'''
+Implementation of 1-, 2- and 3-dimensional Perlin noise.
+
+Adapted from https://github.com/caseman/noise.
+
+pnoise1(), pnoise2() & pnoise3() give the noise at a point. The _array
+versions give it at every point of arrays of coordinates at once using
+NumPy, with results that are identical to calling the scalar versions on
+each point. Without NumPy (eg. in IronPython), they fall back to calling
+the scalar versions & return lists.
+'''
+
+from math import floor, fmod
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+
+def lerp(t, a, b):
+	return ((a) + (t) * ((b) - (a)))
+
+PERM = [
+  151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+  36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+  234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+  88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+  134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+  230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+  1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+  116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+  124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+  47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+  154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+  108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+  242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+  239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+  50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+  141, 128, 195, 78, 66, 215, 61, 156, 180, 151, 160, 137, 91, 90, 15, 131,
+  13, 201, 95, 96, 53, 194, 233, 7, 225, 140, 36, 103, 30, 69, 142, 8, 99, 37,
+  240, 21, 10, 23, 190, 6, 148, 247, 120, 234, 75, 0, 26, 197, 62, 94, 252,
+  219, 203, 117, 35, 11, 32, 57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125,
+  136, 171, 168, 68, 175, 74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158,
+  231, 83, 111, 229, 122, 60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245,
+  40, 244, 102, 143, 54, 65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187,
+  208, 89, 18, 169, 200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198,
+  173, 186, 3, 64, 52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126,
+  255, 82, 85, 212, 207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223,
+  183, 170, 213, 119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167,
+  43, 172, 9, 129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185,
+  112, 104, 218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179,
+  162, 241, 81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199,
+  106, 157, 184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236,
+  205, 93, 222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156,
+  180]
+
+def grad1(hash, x):
+	g = (hash & 7) + 1.0
+	if (hash & 8):
+		g = -1
+	return (g * x)
+
+def noise1(x, repeat, base):
+	i = int(floor(x) % repeat)
+	ii = (i + 1) % repeat
+	i = (i & 255) + base
+	ii = (i & 255) + base
+
+	x -= floor(x)
+	fx = x*x*x * (x * (x * 6 - 15) + 10)
+
+	return lerp(fx, grad1(PERM[i], x), grad1(PERM[ii], x - 1)) * 0.4
+
+def pnoise1(x, octaves=1, persistence=0.5, lacunarity=2.0, repeat=1024, base=0):
+	kwlist = ["x", "octaves", "persistence", "lacunarity", "repeat", "base"]
+	
+	if octaves == 1:
+		# Single octave, return simple noise
+		return noise1(x, repeat, base)
+	elif octaves > 1:
+		freq = 1.0
+		amp = 1.0
+		max = 0.0
+		total = 0.0
+
+		for i in range(octaves):
+			total += noise1(x * freq, int(repeat * freq), base) * amp
+			max += amp
+			freq *= lacunarity
+			amp *= persistence
+		return (total / max)
+	else:
+		print("Expected octaves value > 0")
+		return NULL
+
+# gradients of 2D & 3D noise
+GRAD3 = [
+  (1.0, 1.0, 0.0), (-1.0, 1.0, 0.0), (1.0, -1.0, 0.0), (-1.0, -1.0, 0.0),
+  (1.0, 0.0, 1.0), (-1.0, 0.0, 1.0), (1.0, 0.0, -1.0), (-1.0, 0.0, -1.0),
+  (0.0, 1.0, 1.0), (0.0, -1.0, 1.0), (0.0, 1.0, -1.0), (0.0, -1.0, -1.0),
+  (1.0, 0.0, -1.0), (-1.0, 0.0, -1.0), (0.0, -1.0, 1.0), (0.0, 1.0, 1.0)]
+
+def grad2(hash, x, y):
+	h = hash & 15
+	return x * GRAD3[h][0] + y * GRAD3[h][1]
+
+def grad3(hash, x, y, z):
+	h = hash & 15
+	return x * GRAD3[h][0] + y * GRAD3[h][1] + z * GRAD3[h][2]
+
+def fade(x):
+	return x*x*x * (x * (x * 6 - 15) + 10)
+
+def noise2(x, y, repeatx, repeaty, base):
+	i = int(floor(fmod(x, repeatx)))
+	j = int(floor(fmod(y, repeaty)))
+	ii = int(fmod(i + 1, repeatx))
+	jj = int(fmod(j + 1, repeaty))
+	i = (i & 255) + base
+	j = (j & 255) + base
+	ii = (ii & 255) + base
+	jj = (jj & 255) + base
+
+	x -= floor(x)
+	y -= floor(y)
+	fx = fade(x)
+	fy = fade(y)
+
+	A = PERM[i]
+	AA = PERM[A + j]
+	AB = PERM[A + jj]
+	B = PERM[ii]
+	BA = PERM[B + j]
+	BB = PERM[B + jj]
+
+	return lerp(fy, lerp(fx, grad2(PERM[AA], x, y), grad2(PERM[BA], x - 1, y)),
+					lerp(fx, grad2(PERM[AB], x, y - 1), grad2(PERM[BB], x - 1, y - 1)))
+
+def noise3(x, y, z, repeatx, repeaty, repeatz, base):
+	i = int(floor(fmod(x, repeatx)))
+	j = int(floor(fmod(y, repeaty)))
+	k = int(floor(fmod(z, repeatz)))
+	ii = int(fmod(i + 1, repeatx))
+	jj = int(fmod(j + 1, repeaty))
+	kk = int(fmod(k + 1, repeatz))
+	i = (i & 255) + base
+	j = (j & 255) + base
+	k = (k & 255) + base
+	ii = (ii & 255) + base
+	jj = (jj & 255) + base
+	kk = (kk & 255) + base
+
+	x -= floor(x)
+	y -= floor(y)
+	z -= floor(z)
+	fx = fade(x)
+	fy = fade(y)
+	fz = fade(z)
+
+	A = PERM[i]
+	AA = PERM[A + j]
+	AB = PERM[A + jj]
+	B = PERM[ii]
+	BA = PERM[B + j]
+	BB = PERM[B + jj]
+
+	return lerp(fz, lerp(fy, lerp(fx, grad3(PERM[AA + k], x, y, z), grad3(PERM[BA + k], x - 1, y, z)),
+							 lerp(fx, grad3(PERM[AB + k], x, y - 1, z), grad3(PERM[BB + k], x - 1, y - 1, z))),
+					lerp(fy, lerp(fx, grad3(PERM[AA + kk], x, y, z - 1), grad3(PERM[BA + kk], x - 1, y, z - 1)),
+							 lerp(fx, grad3(PERM[AB + kk], x, y - 1, z - 1), grad3(PERM[BB + kk], x - 1, y - 1, z - 1))))
+
+def pnoise2(x, y, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=0):
+	if octaves == 1:
+		# Single octave, return simple noise
+		return noise2(x, y, repeatx, repeaty, base)
+	elif octaves > 1:
+		freq = 1.0
+		amp = 1.0
+		max = 0.0
+		total = 0.0
+
+		for i in range(octaves):
+			total += noise2(x * freq, y * freq, repeatx * freq, repeaty * freq, base) * amp
+			max += amp
+			freq *= lacunarity
+			amp *= persistence
+		return (total / max)
+	else:
+		raise ValueError("Expected octaves value > 0")
+
+def pnoise3(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, repeatz=1024, base=0):
+	if octaves == 1:
+		# Single octave, return simple noise
+		return noise3(x, y, z, repeatx, repeaty, repeatz, base)
+	elif octaves > 1:
+		freq = 1.0
+		amp = 1.0
+		max = 0.0
+		total = 0.0
+
+		for i in range(octaves):
+			total += noise3(x * freq, y * freq, z * freq, int(repeatx * freq), int(repeaty * freq), int(repeatz * freq), base) * amp
+			max += amp
+			freq *= lacunarity
+			amp *= persistence
+		return (total / max)
+	else:
+		raise ValueError("Expected octaves value > 0")
+
+# --- ARRAY VERSIONS --- #
+
+# the permutation & gradients as arrays, for looking them up at many points at once
+if np is not None:
+	PERM_ARRAY  = np.array(PERM, dtype=np.intp)
+	GRAD3_ARRAY = np.array(GRAD3, dtype=np.float64)
+
+def grad1_array(hash, x):
+	return np.where(hash & 8, -1.0, (hash & 7) + 1.0) * x
+
+def grad2_array(hash, x, y):
+	h = hash & 15
+	return x * GRAD3_ARRAY[h, 0] + y * GRAD3_ARRAY[h, 1]
+
+def grad3_array(hash, x, y, z):
+	h = hash & 15
+	return x * GRAD3_ARRAY[h, 0] + y * GRAD3_ARRAY[h, 1] + z * GRAD3_ARRAY[h, 2]
+
+def noise1_array(x, repeat, base):
+	floor_x = np.floor(x)
+
+	i = (np.mod(floor_x, repeat).astype(np.intp) & 255) + base
+	ii = (i & 255) + base
+
+	x = x - floor_x
+	fx = fade(x)
+
+	return lerp(fx, grad1_array(PERM_ARRAY[i], x), grad1_array(PERM_ARRAY[ii], x - 1)) * 0.4
+
+def cell_indices(x, repeat, base):
+	# get the indices of the cells below & above the given coordinates in the permutation
+	i = np.floor(np.fmod(x, repeat)).astype(np.intp)
+	ii = np.fmod(i + 1, repeat).astype(np.intp)
+
+	return (i & 255) + base, (ii & 255) + base
+
+def noise2_array(x, y, repeatx, repeaty, base):
+	i, ii = cell_indices(x, repeatx, base)
+	j, jj = cell_indices(y, repeaty, base)
+
+	x = x - np.floor(x)
+	y = y - np.floor(y)
+	fx = fade(x)
+	fy = fade(y)
+
+	A = PERM_ARRAY[i]
+	AA = PERM_ARRAY[A + j]
+	AB = PERM_ARRAY[A + jj]
+	B = PERM_ARRAY[ii]
+	BA = PERM_ARRAY[B + j]
+	BB = PERM_ARRAY[B + jj]
+
+	return lerp(fy, lerp(fx, grad2_array(PERM_ARRAY[AA], x, y), grad2_array(PERM_ARRAY[BA], x - 1, y)),
+					lerp(fx, grad2_array(PERM_ARRAY[AB], x, y - 1), grad2_array(PERM_ARRAY[BB], x - 1, y - 1)))
+
+def noise3_array(x, y, z, repeatx, repeaty, repeatz, base):
+	i, ii = cell_indices(x, repeatx, base)
+	j, jj = cell_indices(y, repeaty, base)
+	k, kk = cell_indices(z, repeatz, base)
+
+	x = x - np.floor(x)
+	y = y - np.floor(y)
+	z = z - np.floor(z)
+	fx = fade(x)
+	fy = fade(y)
+	fz = fade(z)
+
+	A = PERM_ARRAY[i]
+	AA = PERM_ARRAY[A + j]
+	AB = PERM_ARRAY[A + jj]
+	B = PERM_ARRAY[ii]
+	BA = PERM_ARRAY[B + j]
+	BB = PERM_ARRAY[B + jj]
+
+	return lerp(fz, lerp(fy, lerp(fx, grad3_array(PERM_ARRAY[AA + k], x, y, z), grad3_array(PERM_ARRAY[BA + k], x - 1, y, z)),
+							 lerp(fx, grad3_array(PERM_ARRAY[AB + k], x, y - 1, z), grad3_array(PERM_ARRAY[BB + k], x - 1, y - 1, z))),
+					lerp(fy, lerp(fx, grad3_array(PERM_ARRAY[AA + kk], x, y, z - 1), grad3_array(PERM_ARRAY[BA + kk], x - 1, y, z - 1)),
+							 lerp(fx, grad3_array(PERM_ARRAY[AB + kk], x, y - 1, z - 1), grad3_array(PERM_ARRAY[BB + kk], x - 1, y - 1, z - 1))))
+
+def octave_sum(noise, coordinates, octaves, persistence, lacunarity):
+	# add up octaves of noise at the given coordinates, where noise(freq, coordinates) gives one octave
+	if octaves == 1:
+		return noise(1.0, coordinates)
+	elif octaves > 1:
+		freq = 1.0
+		amp = 1.0
+		max = 0.0
+		total = 0.0
+
+		for i in range(octaves):
+			total = total + noise(freq, [ c * freq for c in coordinates ]) * amp
+			max += amp
+			freq *= lacunarity
+			amp *= persistence
+		return (total / max)
+	else:
+		raise ValueError("Expected octaves value > 0")
+
+def pnoise1_array(x, octaves=1, persistence=0.5, lacunarity=2.0, repeat=1024, base=0):
+	# get pnoise1() at every point of an array
+	if np is None:
+		return [ pnoise1(xi, octaves, persistence, lacunarity, repeat, base) for xi in x ]
+
+	x = np.asarray(x, dtype=np.float64)
+
+	return octave_sum(lambda freq, c: noise1_array(c[0], int(repeat * freq), base), [x], octaves, persistence, lacunarity)
+
+def pnoise2_array(x, y, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, base=0):
+	# get pnoise2() at every point of arrays of coordinates
+	if np is None:
+		return [ pnoise2(xi, yi, octaves, persistence, lacunarity, repeatx, repeaty, base) for xi, yi in zip(x, y) ]
+
+	x, y = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64))
+
+	return octave_sum(lambda freq, c: noise2_array(c[0], c[1], repeatx * freq, repeaty * freq, base), [x, y], octaves, persistence, lacunarity)
+
+def pnoise3_array(x, y, z, octaves=1, persistence=0.5, lacunarity=2.0, repeatx=1024, repeaty=1024, repeatz=1024, base=0):
+	# get pnoise3() at every point of arrays of coordinates
+	if np is None:
+		return [ pnoise3(xi, yi, zi, octaves, persistence, lacunarity, repeatx, repeaty, repeatz, base) for xi, yi, zi in zip(x, y, z) ]
+
+	x, y, z = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), np.asarray(z, dtype=np.float64))
+
+	return octave_sum(lambda freq, c: noise3_array(c[0], c[1], c[2], int(repeatx * freq), int(repeaty * freq), int(repeatz * freq), base), [x, y, z], octaves, persistence, lacunarity)
+
+# --- TESTS --- #
+
+def check_noise_arrays(n_points=20000):
+	# check that the array versions give exactly the same noise as the scalar versions, & time both; without
+	# NumPy, the array versions fall back to lists, which are checked instead
+	import random
+	import time
+
+	if np is None:
+		generator = random.Random(0)
+
+		x = [ generator.uniform(-300, 300) for i in range(n_points) ]
+		y = [ generator.uniform(-300, 300) for i in range(n_points) ]
+		z = [ generator.uniform(-300, 300) for i in range(n_points) ]
+	else:
+		random_state = np.random.RandomState(0)
+
+		x = random_state.uniform(-300, 300, n_points)
+		y = random_state.uniform(-300, 300, n_points)
+		z = random_state.uniform(-300, 300, n_points)
+
+	tests = [("pnoise1", lambda: [ pnoise1(x[i], 4, 0.5, 2.0, 64) for i in range(n_points) ], lambda: pnoise1_array(x, 4, 0.5, 2.0, 64)),
+			 ("pnoise1 (1 octave)", lambda: [ pnoise1(x[i]) for i in range(n_points) ], lambda: pnoise1_array(x)),
+			 ("pnoise2", lambda: [ pnoise2(x[i], y[i], 3, 0.6, 1.9, 32, 256) for i in range(n_points) ], lambda: pnoise2_array(x, y, 3, 0.6, 1.9, 32, 256)),
+			 ("pnoise3", lambda: [ pnoise3(x[i], y[i], z[i], 3) for i in range(n_points) ], lambda: pnoise3_array(x, y, z, 3))]
+
+	for name, scalar, vectorized in tests:
+		start_time = time.time()
+		scalar_noise = scalar()
+		scalar_time = time.time() - start_time
+
+		start_time = time.time()
+		array_noise = vectorized()
+		array_time = time.time() - start_time
+
+		if np is None:
+			assert array_noise == scalar_noise, name
+		else:
+			assert np.array_equal(np.array(scalar_noise), array_noise), name
+
+		print("{}: {} points, scalar {:.1f} ms, {} {:.1f} ms ({:.0f}x)".format(name, n_points, 1000*scalar_time, "array" if np is not None else "list", 1000*array_time, scalar_time/array_time))
+
+if __name__ == "__main__":
+	check_noise_arrays()
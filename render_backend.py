@@ -0,0 +1,280 @@
+'''
+Rendering backends for the stimuli.
+
+The stims don't make any OpenGL calls themselves; they draw through a
+backend that provides a small set of primitives (quads, circles & texture
+uploads). The OpenTK backend (in stim_window.py) submits these as vertex
+buffers, while the recording backend below just counts them, so that the
+cost of rendering a stim can be checked without a GPU.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+def quad(x_0, y_0, x_1, y_1, s_0=0.0, t_0=0.0, s_1=1.0, t_1=1.0):
+    # get the interleaved x, y, s, t vertices of a rectangle
+    return (x_1, y_1, s_1, t_1,
+            x_0, y_1, s_0, t_1,
+            x_0, y_0, s_0, t_0,
+            x_1, y_0, s_1, t_0)
+
+# quad covering the whole viewport
+BACKGROUND_QUAD = quad(-1, -1, 1, 1)
+
+class RenderBackend():
+    '''
+    Interface that the stims draw through.
+
+    Coordinates are normalized device coordinates (-1 to 1) after
+    reset_transform(), or pixels after set_ortho(). Vertices are given as
+    flat, interleaved x, y, s, t sequences, and colors as (r, g, b) tuples
+    in the range 0 to 1.
+    '''
+
+    # type of the texel sequences that textures are created from
+    texel_type = bytearray
+
+    # --- FRAMES --- #
+
+    def begin_frame(self, width, height):
+        # start drawing a frame (into the frame buffer)
+        raise NotImplementedError
+
+    def end_frame(self, x, y, width, height, warp_mesh=None):
+        # draw the frame buffer into the given viewport, wrapped around a cylinder if a warp mesh is given
+        raise NotImplementedError
+
+    # --- TRANSFORMS --- #
+
+    def reset_transform(self):
+        # draw in normalized device coordinates
+        raise NotImplementedError
+
+    def set_ortho(self, width, height):
+        # draw in pixel coordinates, from (0, 0) to (width, height)
+        raise NotImplementedError
+
+    def push_transform(self, x=0, y=0, angle=0, scale_x=1, scale_y=1):
+        # translate, rotate (degrees) & scale everything drawn until pop_transform() is called
+        raise NotImplementedError
+
+    def pop_transform(self):
+        # undo the last push_transform()
+        raise NotImplementedError
+
+    # --- TEXTURES --- #
+
+    def create_texture(self, width, height, texels=None, rgba=False):
+        # get a texture with the given size (filled with the given texels, if any)
+        raise NotImplementedError
+
+    def update_texture(self, texture, texels, width, height=1, first_texel=0, rgba=False):
+        # upload texels to a texture, starting from the given texel of the sequence
+        raise NotImplementedError
+
+    def release_texture(self, texture):
+        # return a texture that is no longer needed
+        raise NotImplementedError
+
+    def release_all_textures(self):
+        # return all textures that are still in use
+        raise NotImplementedError
+
+    def n_live_textures(self):
+        # get the number of textures in use
+        raise NotImplementedError
+
+    # --- DOTS --- #
+
+    def create_dots(self, vertices, stride):
+        # get a buffer holding a field of moving dots, from their interleaved x, y, v_x, v_y, radius &
+        # brightness (see DotField in dot_field.py)
+        raise NotImplementedError
+
+    def release_dots(self, dots):
+        # delete a buffer of dots that is no longer needed
+        raise NotImplementedError
+
+    # --- DRAWING --- #
+
+    def draw_quads(self, vertices, color=(1.0, 1.0, 1.0), texture=None, texture_offset=0):
+        # draw a batch of quads (4 vertices each), optionally textured & with the texture shifted along s
+        raise NotImplementedError
+
+    def draw_circles(self, n_vertices, circles, texture=None, texture_transform=None):
+        # draw a batch of filled (x, y, radius_x, radius_y, color) circles with the given number of vertices,
+        # optionally textured, with the unit circle's texture coordinates scaled & shifted by a
+        # (scale_s, scale_t, offset_s, offset_t) texture transform
+        raise NotImplementedError
+
+    def draw_dots(self, dots, t, bounds, first=0, count=None):
+        # draw the dots in a buffer (or count of them, starting from the first one) in a single call, as circles
+        # at their positions at time t (ms) wrapped into (x_0, y_0, x_1, y_1) bounds
+        raise NotImplementedError
+
+    def draw_frame(self, x, y, width, height, texels=None):
+        # clear the screen & draw a prerendered frame (width*height RGB texels, bottom row first) straight
+        # into the given viewport; if no texels are given, the last frame is drawn again
+        raise NotImplementedError
+
+    def fill(self, color):
+        # fill the viewport with a color
+        self.reset_transform()
+        self.draw_quads(BACKGROUND_QUAD, color)
+
+class RecordingBackend(RenderBackend):
+    '''
+    Backend that only counts what is drawn.
+
+    Draw calls, vertices, state changes (transforms, texture binds & color
+    changes) and texture uploads are counted, so that the cost of rendering
+    a stim can be checked without a GPU.
+    '''
+
+    def __init__(self):
+        self.live_textures = set()
+        self.next_texture  = 1
+
+        self.live_dots = {} # number of dots in each buffer
+
+        self.reset()
+
+    def reset(self):
+        # reset the counters
+        self.frames          = 0
+        self.draw_calls      = 0
+        self.vertices        = 0
+        self.state_changes   = 0
+        self.texture_uploads = 0
+        self.texels_uploaded = 0
+        self.textures_created = 0
+
+        self.texture = None
+        self.color   = None
+
+    def counts(self):
+        # get the counters as a dict
+        return {"frames": self.frames,
+                "draw calls": self.draw_calls,
+                "vertices": self.vertices,
+                "state changes": self.state_changes,
+                "texture uploads": self.texture_uploads,
+                "texels uploaded": self.texels_uploaded,
+                "textures created": self.textures_created}
+
+    def begin_frame(self, width, height):
+        self.frames += 1
+
+    def end_frame(self, x, y, width, height, warp_mesh=None):
+        self.bind_texture("frame buffer")
+        self.draw_calls += 1
+        self.vertices += 4 if warp_mesh is None else warp_mesh.n_vertices
+
+    def reset_transform(self):
+        self.state_changes += 1
+
+    def set_ortho(self, width, height):
+        self.state_changes += 1
+
+    def push_transform(self, x=0, y=0, angle=0, scale_x=1, scale_y=1):
+        self.state_changes += 1
+
+    def pop_transform(self):
+        self.state_changes += 1
+
+    def create_texture(self, width, height, texels=None, rgba=False):
+        texture = self.next_texture
+        self.next_texture += 1
+
+        self.live_textures.add(texture)
+        self.textures_created += 1
+
+        if texels is not None:
+            self.update_texture(texture, texels, width, height, rgba=rgba)
+
+        return texture
+
+    def update_texture(self, texture, texels, width, height=1, first_texel=0, rgba=False):
+        assert texture in self.live_textures
+        assert len(texels) >= (first_texel + width*height)*(4 if rgba else 3)
+
+        self.texture_uploads += 1
+        self.texels_uploaded += width*height
+
+    def release_texture(self, texture):
+        self.live_textures.discard(texture)
+
+    def release_all_textures(self):
+        self.live_textures.clear()
+
+    def n_live_textures(self):
+        return len(self.live_textures)
+
+    def create_dots(self, vertices, stride):
+        dots = self.next_texture
+        self.next_texture += 1
+
+        self.live_dots[dots] = len(vertices)//stride
+
+        return dots
+
+    def release_dots(self, dots):
+        self.live_dots.pop(dots, None)
+
+    def bind_texture(self, texture):
+        if texture != self.texture:
+            self.texture = texture
+            self.state_changes += 1
+
+    def set_color(self, color):
+        if color != self.color:
+            self.color = color
+            self.state_changes += 1
+
+    def draw_quads(self, vertices, color=(1.0, 1.0, 1.0), texture=None, texture_offset=0):
+        assert len(vertices) % 16 == 0
+
+        self.bind_texture(texture)
+        self.set_color(color)
+
+        if texture_offset != 0:
+            self.state_changes += 2
+
+        self.draw_calls += 1
+        self.vertices += len(vertices)//4
+
+    def draw_dots(self, dots, t, bounds, first=0, count=None):
+        assert dots in self.live_dots
+
+        if count is None:
+            count = self.live_dots[dots] - first
+
+        self.bind_texture(None)
+
+        self.draw_calls += 1
+        self.vertices += count
+
+    def draw_frame(self, x, y, width, height, texels=None):
+        if texels is not None:
+            assert len(texels) == width*height*3
+
+            self.texture_uploads += 1
+            self.texels_uploaded += width*height
+
+        self.bind_texture("frame")
+        self.draw_calls += 1
+        self.vertices += 4
+
+    def draw_circles(self, n_vertices, circles, texture=None, texture_transform=None):
+        self.bind_texture(texture)
+
+        if texture_transform is not None:
+            self.state_changes += 2
+
+        for x, y, radius_x, radius_y, color in circles:
+            self.set_color(color)
+
+            self.draw_calls += 1
+            self.vertices += n_vertices
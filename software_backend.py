@@ -0,0 +1,841 @@
+'''
+Software rendering backend for the stimuli.
+
+Rasterizes the primitives that the stims draw with into NumPy arrays, so
+that stims can be rendered (and checked & benchmarked) on machines
+without OpenTK or a GPU. As with the OpenTK backend, stims are drawn into
+a frame buffer, which is then drawn into the viewport on the screen,
+optionally wrapped around the dish.
+
+Any config can be rendered offline with OfflineStimWindow, which sets up
+the stims the same way as StimWindow, and prerendered into a frame file
+for StimWindow to play back with prerender_config():
+
+    python software_backend.py <experiment folder> <config name>
+
+This module needs NumPy, so it only runs under CPython.
+'''
+
+from __future__ import division
+
+import numpy as np
+
+import os
+import sys
+
+from render_backend import RenderBackend
+from stim_geometry import warp_mesh
+from stims import STIM_CLASSES
+from stim_params import as_stim_params
+from frame_file import FrameFileWriter, frame_file_path
+from dot_field import dot_positions
+from frame_clock import FrameClock
+from config_store import open_config_store
+
+class SoftwareBackend(RenderBackend):
+    '''
+    Backend that rasterizes into NumPy arrays.
+
+    The frame buffer & screen are (height, width, 3) float arrays with
+    values from 0 to 1, stored with the bottom row first as in OpenGL.
+    Pixels are drawn if their centers are inside a shape, and textures are
+    sampled with linear filtering & repeat wrapping. Circles are drawn as
+    exact circles, which are within a pixel of the tessellated ones.
+
+    Once the viewport has been set with set_viewport(), only the part of
+    the frame buffer that's shown in it is drawn, and it's drawn into the
+    viewport with a remap table that's computed once. Gray textures are
+    sampled by luminance rather than per channel.
+    '''
+
+    def __init__(self, display_width, display_height):
+        self.display_width  = display_width
+        self.display_height = display_height
+
+        self.frame_buffer = np.zeros((display_height, display_width, 3), np.float32)
+        self.screen       = np.zeros((display_height, display_width, 3), np.float32)
+
+        self.textures     = {}
+        self.next_texture = 1
+
+        # gray textures' luminances, as (height, width, 1) arrays
+        self.luminances = {}
+
+        # interleaved vertices of the dot buffers, & the # of values per dot
+        self.dots = {}
+
+        # last prerendered frame drawn
+        self.frame_image = None
+
+        # image being drawn into
+        self.target = self.frame_buffer
+
+        # remap of the frame buffer onto the viewport, the bounds of the frame buffer that are drawn
+        # (None for all of it) & the remap last drawn onto the screen
+        self.remap  = None
+        self.clip   = None
+        self.shown  = None
+
+        self.matrix_stack = []
+        self.reset_transform()
+
+    def frame(self):
+        # get the screen as an 8-bit RGB image with the top row first
+        return (self.screen[::-1]*255.0 + 0.5).astype(np.uint8)
+
+    def texels(self, x, y, width, height):
+        # get the RGB texels of the given viewport, with the bottom row first (as uploaded to textures)
+        return (self.screen[y:y + height, x:x + width]*255.0 + 0.5).astype(np.uint8).tobytes()
+
+    # --- FRAMES --- #
+
+    def set_viewport(self, x, y, width, height, warp_mesh=None):
+        # set the viewport that the following frames are drawn into, so that only the part of the
+        # frame buffer that's shown in it is drawn
+        self.remap = ViewportRemap(x, y, width, height, warp_mesh, self.display_width, self.display_height)
+        self.clip  = self.remap.bounds
+
+    def begin_frame(self, width, height):
+        # the screen is only cleared when the viewport changes (see end_frame())
+        self.target = self.frame_buffer
+
+    def end_frame(self, x, y, width, height, warp_mesh=None):
+        remap = self.remap
+
+        if remap is None or remap.key != (x, y, width, height, warp_mesh):
+            # the viewport wasn't set, so draw all of the frame buffer from now on
+            remap = self.remap = ViewportRemap(x, y, width, height, warp_mesh, self.display_width, self.display_height)
+            self.clip = None
+
+        if remap is not self.shown:
+            # pixels outside of the viewport (or of the warped strip in it) are never drawn
+            self.screen[:] = 0
+            self.shown = remap
+
+        if remap.screen_bounds is None:
+            return
+
+        x_0, x_1, y_0, y_1 = remap.screen_bounds
+
+        self.screen[y_0:y_1, x_0:x_1][:, remap.columns] = remap.ss.take(remap.ts.take(self.frame_buffer, 0), 1)
+
+    # --- TRANSFORMS --- #
+
+    def reset_transform(self):
+        self.matrix = np.identity(3)
+
+    def set_ortho(self, width, height):
+        self.matrix = np.array([[2/width, 0, -1],
+                                [0, 2/height, -1],
+                                [0, 0, 1]])
+
+    def push_transform(self, x=0, y=0, angle=0, scale_x=1, scale_y=1):
+        self.matrix_stack.append(self.matrix)
+
+        c = np.cos(np.radians(angle))
+        s = np.sin(np.radians(angle))
+
+        self.matrix = np.dot(self.matrix, np.array([[c*scale_x, -s*scale_y, x],
+                                                    [s*scale_x,  c*scale_y, y],
+                                                    [0, 0, 1]]))
+
+    def pop_transform(self):
+        self.matrix = self.matrix_stack.pop()
+
+    def pixel_matrix(self):
+        # get the matrix that maps the current coordinates to pixels in the target
+        height, width = self.target.shape[:2]
+
+        return np.dot(np.array([[width/2, 0, width/2],
+                                [0, height/2, height/2],
+                                [0, 0, 1]]), self.matrix)
+
+    # --- TEXTURES --- #
+
+    def create_texture(self, width, height, texels=None, rgba=False):
+        texture = self.next_texture
+        self.next_texture += 1
+
+        self.textures[texture]   = np.zeros((height, width, 3), np.float32)
+        self.luminances[texture] = np.zeros((height, width, 1), np.float32)
+
+        if texels is not None:
+            self.update_texture(texture, texels, width, height, rgba=rgba)
+
+        return texture
+
+    def update_texture(self, texture, texels, width, height=1, first_texel=0, rgba=False):
+        n_channels = 4 if rgba else 3
+
+        texels = np.frombuffer(bytes(texels), np.uint8)[first_texel*n_channels:(first_texel + width*height)*n_channels]
+        texels = texels.reshape(height, width, n_channels)[:, :, :3]/np.float32(255.0)
+
+        self.textures[texture][:height, :width] = texels
+
+        # textures stay gray as long as every update is gray
+        if self.luminances.get(texture) is not None:
+            if np.array_equal(texels[:, :, :1], texels[:, :, 1:2]) and np.array_equal(texels[:, :, :1], texels[:, :, 2:]):
+                self.luminances[texture][:height, :width] = texels[:, :, :1]
+            else:
+                self.luminances[texture] = None
+
+    def texture_image(self, texture):
+        # get the luminance of a gray texture, or the RGB texels of a colored one
+        luminance = self.luminances.get(texture)
+
+        if luminance is not None:
+            return luminance
+
+        return self.textures[texture]
+
+    def release_texture(self, texture):
+        self.textures.pop(texture, None)
+        self.luminances.pop(texture, None)
+
+    def release_all_textures(self):
+        self.textures   = {}
+        self.luminances = {}
+
+    def n_live_textures(self):
+        return len(self.textures)
+
+    # --- DRAWING --- #
+
+    def draw_quads(self, vertices, color=(1.0, 1.0, 1.0), texture=None, texture_offset=0):
+        matrix = self.pixel_matrix()
+
+        for quad in np.asarray(vertices, np.float64).reshape(-1, 4, 4):
+            # quads are parallelograms, so pixels can be mapped to (u, v) coordinates across
+            # the quad (0 to 1 inside it) from the third corner & the edges leaving it
+            corners = np.dot(matrix[:2, :2], quad[:, :2].T).T + matrix[:2, 2]
+            origin  = corners[2]
+            inverse = np.linalg.inv(np.array([corners[3] - origin, corners[1] - origin]).T)
+
+            if texture is None:
+                shade = lambda u, v: color
+            else:
+                # texture coordinates are linear in u & v
+                image = self.texture_image(texture)
+                s, t = quad[2, 2:]
+                d_s_u, d_t_u = quad[3, 2:] - quad[2, 2:]
+                d_s_v, d_t_v = quad[1, 2:] - quad[2, 2:]
+
+                def shade(u, v):
+                    if d_s_v == 0 and d_t_u == 0 and np.ndim(u) == 2 and np.shape(u)[0] == 1 and np.shape(v)[1] == 1:
+                        # s only depends on the column & t on the row
+                        return sample_separable(image, s + u[0]*d_s_u + texture_offset, t + v[:, 0]*d_t_v)
+
+                    if image.shape[0] == 1:
+                        # every row of the texture is the same
+                        return sample(image, s + u*d_s_u + v*d_s_v + texture_offset, None)
+
+                    return sample(image, s + u*d_s_u + v*d_s_v + texture_offset, t + u*d_t_u + v*d_t_v)
+
+            self.fill_region(corners, origin, inverse, lambda u, v: (u >= 0) & (u < 1) & (v >= 0) & (v < 1), shade, rectangular=True)
+
+    def draw_frame(self, x, y, width, height, texels=None):
+        if texels is not None:
+            self.frame_image = np.frombuffer(bytes(texels), np.uint8).reshape(height, width, 3)/255.0
+
+        image = self.frame_image
+
+        self.screen[:] = 0
+        self.shown = None
+
+        x_0, x_1 = max(x, 0), min(x + width, self.display_width)
+        y_0, y_1 = max(y, 0), min(y + height, self.display_height)
+
+        self.screen[y_0:y_1, x_0:x_1] = image[y_0 - y:y_1 - y, x_0 - x:x_1 - x]
+
+    def draw_circles(self, n_vertices, circles, texture=None, texture_transform=None):
+        matrix = self.pixel_matrix()
+
+        if texture is not None:
+            image = self.texture_image(texture)
+            scale_s, scale_t, offset_s, offset_t = texture_transform or (1, 1, 0, 0)
+
+        for x, y, radius_x, radius_y, color in circles:
+            # map pixels to coordinates on the unit circle
+            circle_matrix = np.dot(matrix, np.array([[radius_x, 0, x],
+                                                     [0, radius_y, y],
+                                                     [0, 0, 1]]))
+
+            corners = np.dot(circle_matrix[:2, :2], [[-1, 1, 1, -1], [-1, -1, 1, 1]]).T + circle_matrix[:2, 2]
+            origin  = circle_matrix[:2, 2]
+            inverse = np.linalg.inv(circle_matrix[:2, :2])
+
+            if texture is None:
+                shade = lambda u, v, color=color: color
+            else:
+                shade = lambda u, v: sample(image, scale_s*(0.5 + 0.5*u) + offset_s, scale_t*(0.5 + 0.5*v) + offset_t)
+
+            self.fill_region(corners, origin, inverse, lambda u, v: u*u + v*v <= 1, shade)
+
+    def create_dots(self, vertices, stride):
+        dots = self.next_texture
+        self.next_texture += 1
+
+        self.dots[dots] = (np.array(vertices, np.float32), stride)
+
+        return dots
+
+    def release_dots(self, dots):
+        self.dots.pop(dots, None)
+
+    def draw_dots(self, dots, t, bounds, first=0, count=None):
+        vertices, stride = self.dots[dots]
+
+        x, y = dot_positions(vertices, stride, t, bounds, first, count)
+
+        radii        = vertices.reshape(-1, stride)[first:first + len(x), 4]
+        brightnesses = vertices.reshape(-1, stride)[first:first + len(x), 5]
+
+        if len(x) == 0:
+            return
+
+        height, width = self.target.shape[:2]
+
+        # centers & radii of the dots in pixels (dots are circles on the screen, & aren't rotated)
+        matrix = self.pixel_matrix()
+
+        center_x = matrix[0, 0]*x + matrix[0, 1]*y + matrix[0, 2]
+        center_y = matrix[1, 0]*x + matrix[1, 1]*y + matrix[1, 2]
+
+        radius_x = np.abs(matrix[0, 0])*radii
+        radius_y = np.abs(matrix[1, 1])*radii*width/height
+
+        # only draw the dots that overlap the part of the target that's drawn
+        x_0, x_1, y_0, y_1 = self.draw_bounds()
+
+        visible = np.flatnonzero((center_x + radius_x >= x_0) & (center_x - radius_x < x_1) & (center_y + radius_y >= y_0) & (center_y - radius_y < y_1))
+
+        if len(visible) == 0:
+            return
+
+        center_x, center_y, radius_x, radius_y = center_x[visible], center_y[visible], radius_x[visible], radius_y[visible]
+        brightnesses = brightnesses[visible]
+
+        # rasterize all of the dots at once, over the pixels in a square around each one
+        extent  = int(np.ceil(max(radius_x.max(), radius_y.max()))) + 1
+        offsets = np.arange(-extent, extent + 1)
+
+        columns = (np.floor(center_x).astype(int)[:, np.newaxis] + offsets)[:, np.newaxis, :]
+        rows    = (np.floor(center_y).astype(int)[:, np.newaxis] + offsets)[:, :, np.newaxis]
+
+        u = (columns + 0.5 - center_x[:, np.newaxis, np.newaxis])/radius_x[:, np.newaxis, np.newaxis]
+        v = (rows + 0.5 - center_y[:, np.newaxis, np.newaxis])/radius_y[:, np.newaxis, np.newaxis]
+
+        inside = (u*u + v*v <= 1) & (columns >= x_0) & (columns < x_1) & (rows >= y_0) & (rows < y_1)
+
+        dot_indices = np.broadcast_to(np.arange(len(visible))[:, np.newaxis, np.newaxis], inside.shape)[inside]
+
+        # look pixels up by their index in the flattened target
+        pixels = (rows*width + columns)[inside]
+
+        self.target.reshape(-1, 3)[pixels] = brightnesses[dot_indices, np.newaxis]
+
+    def draw_bounds(self):
+        # get the bounds (x_0, x_1, y_0, y_1) of the part of the target that's drawn, which for the frame
+        # buffer is only the part that's shown once the viewport has been set
+        if self.clip is not None and self.target is self.frame_buffer:
+            return self.clip
+
+        height, width = self.target.shape[:2]
+
+        return (0, width, 0, height)
+
+    def fill_region(self, corners, origin, inverse, inside, shade, rectangular=False):
+        # shade the pixels within the bounds of the given corners whose (u, v) coordinates are inside
+        # the (convex) shape, where (u, v) = inverse.(p - origin) for pixel centers p
+        bounds = self.draw_bounds()
+
+        x_0 = int(max(np.floor(corners[:, 0].min() + 0.5), bounds[0]))
+        x_1 = int(min(np.floor(corners[:, 0].max() + 0.5), bounds[1]))
+        y_0 = int(max(np.floor(corners[:, 1].min() + 0.5), bounds[2]))
+        y_1 = int(min(np.floor(corners[:, 1].max() + 0.5), bounds[3]))
+
+        if x_1 <= x_0 or y_1 <= y_0:
+            return
+
+        xs = (np.arange(x_0, x_1) + 0.5 - origin[0]).astype(np.float32)
+        ys = (np.arange(y_0, y_1) + 0.5 - origin[1]).astype(np.float32)
+
+        region = self.target[y_0:y_1, x_0:x_1]
+
+        if inverse[0, 1] == 0 and inverse[1, 0] == 0:
+            # axis-aligned, so u only depends on x & v only on y
+            us = inverse[0, 0]*xs
+            vs = inverse[1, 1]*ys
+
+            if rectangular:
+                # only shade the (contiguous) columns & rows inside the quad
+                columns = np.flatnonzero(inside(us, 0.5))
+                rows    = np.flatnonzero(inside(0.5, vs))
+
+                if len(columns) > 0 and len(rows) > 0:
+                    c_0, c_1 = columns[0], columns[-1] + 1
+                    r_0, r_1 = rows[0], rows[-1] + 1
+
+                    region[r_0:r_1, c_0:c_1] = shade(us[np.newaxis, c_0:c_1], vs[r_0:r_1, np.newaxis])
+
+                return
+
+            u = np.broadcast_to(us[np.newaxis, :], region.shape[:2])
+            v = np.broadcast_to(vs[:, np.newaxis], region.shape[:2])
+        else:
+            # map every pixel of the region at once
+            u = np.float32(inverse[0, 0])*xs[np.newaxis, :] + np.float32(inverse[0, 1])*ys[:, np.newaxis]
+            v = np.float32(inverse[1, 0])*xs[np.newaxis, :] + np.float32(inverse[1, 1])*ys[:, np.newaxis]
+
+        # as shapes are convex, the region is inside the shape if its corners are
+        corners = ([0, 0, -1, -1], [0, -1, 0, -1])
+
+        if inside(u[corners], v[corners]).all():
+            region[:] = shade(u, v)
+            return
+
+        mask = inside(u, v)
+
+        region[mask] = shade(u[mask], v[mask])
+
+# --- HELPER FUNCTIONS --- #
+
+def sample(image, s, t):
+    # sample a texture at the given texture coordinates, with linear filtering & repeat wrapping
+    # (t isn't needed for textures with one row)
+    height, width, n_channels = image.shape
+
+    x_0, x_1, f_x = texel_weights(s, width)
+
+    # look texels up by their index in the flattened texture, which is much faster than 2D indexing
+    if n_channels == 1:
+        texels = image.reshape(-1)
+    else:
+        texels = image.reshape(-1, n_channels)
+        f_x = f_x[..., np.newaxis]
+
+    if height == 1:
+        result = np.take(texels, x_0, axis=0)
+        result += (np.take(texels, x_1, axis=0) - result)*f_x
+    else:
+        y_0, y_1, f_y = texel_weights(t, height)
+        y_0 *= width
+        y_1 *= width
+
+        if n_channels > 1:
+            f_y = f_y[..., np.newaxis]
+
+        result = np.take(texels, y_0 + x_0, axis=0)
+        result += (np.take(texels, y_0 + x_1, axis=0) - result)*f_x
+
+        top = np.take(texels, y_1 + x_0, axis=0)
+        top += (np.take(texels, y_1 + x_1, axis=0) - top)*f_x
+
+        result += (top - result)*f_y
+
+    if n_channels == 1:
+        return result[..., np.newaxis]
+
+    return result
+
+def sample_separable(image, ss, ts):
+    # sample a texture on the grid of the given column & row texture coordinates
+    height, width = image.shape[:2]
+
+    x_0, x_1, f_x = texel_weights(ss, width)
+    f_x = f_x[:, np.newaxis]
+
+    if height == 1:
+        # every row is the same
+        left = np.take(image[0], x_0, axis=0)
+        return np.broadcast_to(left + (np.take(image[0], x_1, axis=0) - left)*f_x, (len(ts), len(ss), 3))
+
+    y_0, y_1, f_y = texel_weights(ts, height)
+    f_y = f_y[:, np.newaxis, np.newaxis]
+
+    # interpolate between the rows, then between the columns
+    bottom = np.take(image, y_0, axis=0)
+    rows = bottom + (np.take(image, y_1, axis=0) - bottom)*f_y
+
+    left = np.take(rows, x_0, axis=1)
+    return left + (np.take(rows, x_1, axis=1) - left)*f_x
+
+def texel_weights(s, size):
+    # get the texels on either side of the given texture coordinates & the weight of the second one
+    x = np.asarray(s, np.float32)*np.float32(size) - np.float32(0.5)
+    x_0 = np.floor(x)
+    f_x = x - x_0
+
+    x_0 = x_0.astype(np.intp)
+    x_0 %= size
+
+    x_1 = x_0 + 1
+    x_1[x_1 == size] = 0
+
+    return x_0, x_1, f_x
+
+class TexelLookup():
+    '''
+    Texels that fixed texture coordinates along one axis fall between, &
+    their weights, for sampling an image along that axis repeatedly.
+
+    Coordinates that fall on whole, consecutive texels are looked up as a
+    slice, without interpolating.
+    '''
+
+    def __init__(self, coordinates, size):
+        # find the texels in double precision, so that whole texels are exact
+        x = np.asarray(coordinates, np.float64)*size - 0.5
+
+        first   = np.floor(x + 1e-6)
+        weights = x - first
+        weights[weights < 1e-6] = 0
+
+        self.first   = first.astype(np.intp) % size
+        self.second  = (self.first + 1) % size
+        self.weights = weights.astype(np.float32)[:, np.newaxis]
+        self.window  = None
+
+        if not weights.any():
+            self.weights = None
+
+            if len(x) > 1 and np.all(np.diff(self.first) == 1):
+                self.window = slice(self.first[0], self.first[-1] + 1)
+
+        # bounds of the texels that are read
+        if self.weights is None:
+            used = self.first
+        else:
+            used = np.concatenate([self.first, self.second[weights > 0]])
+
+        self.bounds = (int(used.min()), int(used.max()) + 1) if len(used) > 0 else (0, 0)
+
+    def take(self, image, axis):
+        # sample an image (of 3 dimensions) at the coordinates along the given axis
+        if self.window is not None:
+            return image[self.window] if axis == 0 else image[:, self.window]
+
+        result = np.take(image, self.first, axis=axis)
+
+        if self.weights is not None:
+            weights = self.weights[:, :, np.newaxis] if axis == 0 else self.weights
+
+            result += (np.take(image, self.second, axis=axis) - result)*weights
+
+        return result
+
+class ViewportRemap():
+    '''
+    Mapping of the screen's pixels in a viewport to the frame buffer,
+    which is the same every frame, so that the frame buffer can be drawn
+    into the viewport by looking its rows & then its columns up.
+    '''
+
+    def __init__(self, x, y, width, height, warp_mesh, display_width, display_height):
+        self.key = (x, y, width, height, warp_mesh)
+
+        # clip the viewport to the screen
+        x_0, x_1 = max(x, 0), min(x + width, display_width)
+        y_0, y_1 = max(y, 0), min(y + height, display_height)
+
+        self.screen_bounds = None
+        self.bounds        = (0, 0, 0, 0)
+
+        if x_1 <= x_0 or y_1 <= y_0:
+            return
+
+        # pixel centers, relative to the center of the viewport
+        xs = np.arange(x_0, x_1) + 0.5 - x - width/2
+        ys = np.arange(y_0, y_1) + 0.5 - y - height/2
+
+        # the middle half of the frame buffer is stretched over the viewport
+        ts = 0.25 + 0.5*(ys + height/2)/height
+
+        if warp_mesh is None:
+            ss = 0.25 + 0.5*(xs + width/2)/width
+            columns = slice(None)
+        else:
+            # every column of the quad strip has a single s coordinate, so s can be
+            # interpolated between the columns' x coordinates
+            vertices = np.asarray(warp_mesh.vertices).reshape(-1, 2, warp_mesh.stride)[:, 0]
+
+            inside = np.flatnonzero((xs >= vertices[0, 0]) & (xs < vertices[-1, 0]))
+            columns = slice(inside[0], inside[-1] + 1) if len(inside) > 0 else slice(0, 0)
+
+            ss = np.interp(xs[columns], vertices[:, 0], vertices[:, 2])
+
+        self.screen_bounds = (x_0, x_1, y_0, y_1)
+        self.columns       = columns
+
+        self.ss = TexelLookup(ss, display_width)
+        self.ts = TexelLookup(ts, display_height)
+
+        # part of the frame buffer that's shown
+        self.bounds = self.ss.bounds + self.ts.bounds
+
+class OfflineStimWindow():
+    '''
+    Renders a config offline with the software backend.
+
+    Stim params are computed from the experiment params in the same way as
+    in StimWindow, and every stim is shown for its duration, with one frame
+    per refresh.
+    '''
+
+    def __init__(self, experiment_params, config_params, display_width=1280, display_height=800, backend=None):
+        self.experiment_params = experiment_params
+        self.config_params     = config_params
+
+        self.display_width  = display_width
+        self.display_height = display_height
+
+        if backend is None:
+            backend = SoftwareBackend(display_width, display_height)
+
+        self.backend = backend
+
+        # clock whose refresh period the stims use to number their frames
+        self.clock = FrameClock(60)
+
+        self.stim = None
+
+        self.update_params()
+
+    def update_params(self):
+        self.distance = self.experiment_params['dish_radius']
+        self.resolution = self.display_width/self.experiment_params['screen_cm_width']
+        self.px_width = int(self.experiment_params['width']*self.display_width)
+        self.px_height = int(self.experiment_params['height']*self.display_height)
+        self.x_offset = int((self.experiment_params['x_offset'])*(self.display_width - self.px_width))
+        self.y_offset = int((1.0 - self.experiment_params['y_offset'])*(self.display_height - self.px_height))
+        self.durations_list = self.config_params['durations_list']
+        self.n_stim = len(self.durations_list)
+        self.warp_perspective = self.experiment_params['warp_perspective']
+        self.dish_radius = self.experiment_params['dish_radius']
+
+        self.n_cylinder_segments = 100
+        self.warp_mesh = warp_mesh(self.dish_radius*self.resolution, self.px_width, self.px_height, self.n_cylinder_segments)
+
+        # only the part of the frame buffer that's shown needs to be drawn
+        if isinstance(self.backend, SoftwareBackend):
+            self.backend.set_viewport(self.x_offset, self.y_offset, self.px_width, self.px_height, self.warp_mesh if self.warp_perspective else None)
+
+    def switch_to_stim(self, index):
+        # end the current stim & create the stim at the given index
+        if self.stim is not None:
+            self.stim.end_func()
+
+        self.backend.release_all_textures()
+
+        self.stim_index = index
+        self.stim_type  = self.config_params['types_list'][index]
+        self.stim_name  = self.config_params['stim_list'][index]
+        self.duration   = self.config_params['durations_list'][index]
+        self.params     = as_stim_params(self.stim_type, self.config_params['parameters_list'][index])
+
+        self.stim = STIM_CLASSES[self.stim_type](self)
+
+    def current_stim_state(self):
+        keys_list = ["stim #", "stim name", "stim type"]
+
+        stim_dict = {"stim #": self.stim_index,
+                     "stim name": self.stim_name,
+                     "stim type": self.stim_type}
+
+        stim_dict_2, keys_list_2 = self.stim.current_state()
+
+        if stim_dict_2 is not None:
+            stim_dict.update(stim_dict_2)
+
+        if keys_list_2 is not None:
+            keys_list = keys_list + keys_list_2
+
+        return stim_dict, keys_list
+
+    def render_frame(self):
+        # render the current state of the stim to the screen (delays leave the last frame on the screen)
+        if self.stim_type != "Delay":
+            self.backend.begin_frame(self.display_width, self.display_height)
+
+            self.stim.render_func()
+
+            if self.warp_perspective:
+                self.backend.end_frame(self.x_offset, self.y_offset, self.px_width, self.px_height, self.warp_mesh)
+            else:
+                self.backend.end_frame(self.x_offset, self.y_offset, self.px_width, self.px_height)
+
+    def frames(self, frame_rate=60):
+        # render every frame of the config, yielding the index of the stim & of the frame within it;
+        # as in StimWindow, each stim starts on the first frame after the previous one has ended
+        period = 1000.0/frame_rate # ms
+
+        self.clock = FrameClock(frame_rate)
+
+        for index in range(self.n_stim):
+            self.switch_to_stim(index)
+
+            self.stim.start_func()
+
+            frame = 0
+            t = 0
+
+            while t < self.stim.duration:
+                if frame > 0:
+                    self.stim.update_func(t)
+
+                self.render_frame()
+
+                yield index, frame
+
+                frame += 1
+                t = frame*period
+
+        if self.stim is not None:
+            self.stim.end_func()
+
+def prerender_config(experiment_params, config_params, path, frame_rate=60, display_width=1280, display_height=800):
+    # render every frame of a config into a frame file, along with the state of the stim on each frame
+    stim_window = OfflineStimWindow(experiment_params, config_params, display_width, display_height)
+
+    writer = FrameFileWriter(path, stim_window.px_width, stim_window.px_height, stim_window.x_offset, stim_window.y_offset, frame_rate)
+
+    for index, frame in stim_window.frames(frame_rate):
+        stim_state, keys = stim_window.current_stim_state()
+
+        writer.write(stim_window.backend.texels(stim_window.x_offset, stim_window.y_offset, stim_window.px_width, stim_window.px_height), stim_state, keys)
+
+    writer.close()
+
+def load_params(experiment_folder, config_name):
+    # load the experiment & config params saved by the controller, converting them to floats where possible
+    experiment_folder = os.path.abspath(experiment_folder)
+
+    store = open_config_store(os.path.dirname(experiment_folder))
+
+    experiment_params = store.load_experiment_params(os.path.basename(experiment_folder))
+    config_params     = store.load_config_params(os.path.basename(experiment_folder), config_name)
+
+    store.close()
+
+    for key in experiment_params:
+        try:
+            experiment_params[key] = float(experiment_params[key])
+        except:
+            pass
+
+    config_folder = os.path.join(experiment_folder, config_name)
+
+    config_params['durations_list'] = [ float(duration) for duration in config_params['durations_list'] ]
+
+    for params in config_params['parameters_list']:
+        for key in params:
+            try:
+                params[key] = float(params[key])
+            except:
+                pass
+
+    return experiment_params, config_params, config_folder
+
+# --- BENCHMARKS --- #
+
+def benchmark_stims(n_frames=30, display_width=1280, display_height=800):
+    import time
+
+    experiment_params = {'screen_cm_width': 20, 'width': 0.5, 'height': 0.5, 'x_offset': 0, 'y_offset': 0, 'dish_radius': 100, 'warp_perspective': True}
+
+    grating_params = {'frequency': 0.2, 'init_phase': 0.0, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0}
+    rotated_grating_params = dict(grating_params, angle=30)
+    optomotor_grating_params = dict(grating_params, merging_pos=0.25)
+    looming_dot_params = {'looming_dot_init_x_pos': 0, 'looming_dot_init_y_pos': 0, 'l_v': 20, 'looming_dot_brightness': 1.0, 'background_brightness': 0, 'checkered': False, 'num_squares': 10, 'expand_checkered_pattern': True}
+    checkered_params = dict(looming_dot_params, checkered=True)
+    moving_dot_params = {'radius': 10.0, 'moving_dot_init_x_pos': 0.0, 'moving_dot_init_y_pos': 0.0, 'v_x': 1.0, 'v_y': 0.0, 'moving_dot_brightness': 1.0, 'background_brightness': 0}
+
+    stims = [("Looming Dot", looming_dot_params),
+             ("Looming Dot", checkered_params),
+             ("Moving Dot", moving_dot_params),
+             ("Grating", grating_params),
+             ("Grating", rotated_grating_params),
+             ("Optomotor Grating", optomotor_grating_params),
+             ("Broadband Grating", grating_params),
+             ("Perlin Noise", {'frequency': 0.5, 'octaves': 3, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0, 'seed': 0}),
+             ("Multiple Moving Dots", {'n_dots': 5000, 'radius': 2.0, 'v_x': 5.0, 'v_y': 0.0, 'velocity_spread': 1.0, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': 0}),
+             ("Random Dot Kinematogram", {'density': 50, 'radius': 2.0, 'velocity': 5.0, 'angle': 0, 'coherence': 0.5, 'lifetime': 100, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': 0}),
+             ("White Flash", {'brightness': 1.0})]
+
+    print("{}x{} frames:".format(display_width, display_height))
+
+    for stim_type, params in stims:
+        config_params = {'stim_list': [stim_type], 'durations_list': [n_frames/60.0], 'types_list': [stim_type], 'parameters_list': [params]}
+
+        stim_window = OfflineStimWindow(experiment_params, config_params, display_width, display_height)
+
+        start = time.time()
+        n = 0
+        for index, frame in stim_window.frames():
+            n += 1
+        frame_time = (time.time() - start)*1000.0/n
+
+        name = stim_type
+        if params.get('checkered'):
+            name += " (checkered)"
+        if params.get('angle'):
+            name += " (rotated)"
+
+        print("{:30s} {:8.2f} ms/frame, mean luminance {:.3f}".format(name, frame_time, stim_window.backend.screen.mean()))
+
+def check_frame_file():
+    # prerender a config & check that playing the frame file back gives the same frames & states as rendering it
+    import shutil
+    import tempfile
+
+    from frame_file import open_frame_file
+
+    experiment_params = {'screen_cm_width': 20, 'width': 0.5, 'height': 0.5, 'x_offset': 0.5, 'y_offset': 0.5, 'dish_radius': 10, 'warp_perspective': True}
+    config_params = {'stim_list': ['Grating', 'Delay', 'Flash'],
+                     'durations_list': [0.25, 0.1, 0.1],
+                     'types_list': ['Grating', 'Delay', 'White Flash'],
+                     'parameters_list': [{'frequency': 0.2, 'init_phase': 0.0, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 30}, {}, {'brightness': 0.5}]}
+
+    folder = tempfile.mkdtemp()
+
+    try:
+        path = os.path.join(folder, "frames.dat")
+
+        prerender_config(experiment_params, config_params, path, display_width=320, display_height=200)
+
+        frame_file = open_frame_file(path, width=160, height=100)
+
+        # frame files saved before their params aren't used
+        assert open_frame_file(path, params_time=os.path.getmtime(path) + 1) is None
+
+        stim_window = OfflineStimWindow(experiment_params, config_params, 320, 200)
+        backend = SoftwareBackend(320, 200)
+
+        n_frames = 0
+        for index, frame in stim_window.frames():
+            backend.draw_frame(frame_file.x_offset, frame_file.y_offset, frame_file.width, frame_file.height, frame_file.read_frame(n_frames))
+
+            assert np.array_equal(backend.frame(), stim_window.backend.frame()), n_frames
+            assert frame_file.state(n_frames) == stim_window.current_stim_state(), n_frames
+
+            n_frames += 1
+
+        assert frame_file.n_frames == n_frames
+
+        print("frame file: {} frames ({} distinct) played back identically".format(frame_file.n_frames, frame_file.n_blocks))
+    finally:
+        shutil.rmtree(folder)
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3:
+        # prerender a config into its folder
+        experiment_params, config_params, config_folder = load_params(sys.argv[1], sys.argv[2])
+
+        # config folders are only created when something is saved in them
+        if not os.path.exists(config_folder):
+            os.makedirs(config_folder)
+
+        prerender_config(experiment_params, config_params, frame_file_path(config_folder))
+    else:
+        check_frame_file()
+        benchmark_stims()
@@ -0,0 +1,292 @@
+'''
+Geometry for the stimuli.
+
+Vertex tables are computed once and cached, so that drawing a shape only
+scales & translates a table that has already been built instead of
+evaluating sines & cosines for every vertex every frame.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+import math
+import bisect
+
+try:
+    # numpy is used for warping arrays where available (it isn't in IronPython)
+    import numpy as np
+except ImportError:
+    np = None
+
+_unit_circles = {}
+
+def unit_circle(n_vertices):
+    # get the cached unit circle with the given number of vertices, creating it if necessary
+    circle = _unit_circles.get(n_vertices)
+
+    if circle is None:
+        circle = UnitCircle(n_vertices)
+        _unit_circles[n_vertices] = circle
+
+    return circle
+
+class UnitCircle():
+    '''
+    Vertices of a circle of radius 1 centered at the origin.
+
+    The vertices go clockwise from the top of the circle, with the first
+    vertex repeated at the end, and are stored as an interleaved
+    x, y, s, t table (s & t map the circle onto a texture's unit square).
+    '''
+
+    # number of values stored for each vertex
+    stride = 4
+
+    def __init__(self, n_vertices):
+        self.n_vertices = n_vertices
+
+        if n_vertices == 1:
+            angles = [ 2*math.pi ]
+        else:
+            angles = [ 2*math.pi*i/(n_vertices - 1) for i in range(n_vertices) ]
+
+        self.xs = [ math.sin(angle) for angle in angles ]
+        self.ys = [ math.cos(angle) for angle in angles ]
+
+        self.vertices = []
+        for x, y in zip(self.xs, self.ys):
+            self.vertices += [ x, y, 0.5 + 0.5*x, 0.5 + 0.5*y ]
+
+# tessellation levels (number of segments) available for circles
+CIRCLE_SEGMENTS = [ 2**i for i in range(3, 11) ]
+
+# maximum distance (px) between a circle's edge & the polygon it is drawn as
+MAX_EDGE_ERROR = 1.0
+
+def circle_edge_error(radius, n_segments):
+    # get the maximum distance (px) between a circle & a regular polygon inscribed in it
+    return radius*(1 - math.cos(math.pi/n_segments))
+
+def circle_segments(radius, max_error=MAX_EDGE_ERROR):
+    # get the smallest tessellation level that keeps the edge error of a circle with the given radius (px) below max_error
+    for n_segments in CIRCLE_SEGMENTS:
+        if circle_edge_error(abs(radius), n_segments) <= max_error:
+            return n_segments
+
+    return CIRCLE_SEGMENTS[-1]
+
+def adaptive_unit_circle(radius, max_error=MAX_EDGE_ERROR):
+    # get the cached unit circle to use for a circle with the given radius (px)
+    return unit_circle(circle_segments(radius, max_error) + 1)
+
+def precompute_circles():
+    # build the unit circles for every tessellation level
+    for n_segments in CIRCLE_SEGMENTS:
+        unit_circle(n_segments + 1)
+
+_warp_meshes = {}
+
+def warp_mesh(dish_radius, px_width, px_height, n_segments):
+    # get the cached warp mesh for the given dish radius (px) & viewport size, creating it if necessary
+    key = (dish_radius, px_width, px_height, n_segments)
+
+    mesh = _warp_meshes.get(key)
+
+    if mesh is None:
+        _warp_meshes.clear()
+
+        mesh = WarpMesh(dish_radius, px_width, px_height, n_segments)
+        _warp_meshes[key] = mesh
+
+    return mesh
+
+class WarpMesh():
+    '''
+    Quad strip that wraps the stimulus around a cylinder.
+
+    The middle of the frame buffer is mapped onto the cylinder's visible
+    half, seen from above, so that its x coordinates are compressed towards
+    the edges of the dish. Vertices are stored as an interleaved x, y, s, t
+    table, in the same layout as the unit circles.
+    '''
+
+    # number of values stored for each vertex
+    stride = 4
+
+    def __init__(self, dish_radius, px_width, px_height, n_segments):
+        self.n_vertices = 2*(n_segments + 1)
+
+        # length of the arc covering the visible half of the dish
+        dish_arc = dish_radius*math.pi/4
+
+        self.vertices = []
+
+        for i in range(n_segments + 1):
+            theta = (i/n_segments)*math.pi - (math.pi/2.0)
+
+            x = dish_radius*math.sin(theta)
+            s = (px_width/2 - dish_arc + (i/n_segments)*2*dish_arc)/px_width
+
+            self.vertices += [ x, -px_height/2, s, 0.25,
+                               x,  px_height/2, s, 0.75 ]
+
+def warp(x, r1, r3):
+    # warp a position between screen & dish space
+    return 1/r3*math.copysign(1, x)*(-math.sqrt(x**2 * ((r3**2)*(r1-r3)**2 - (r1**2-r3**2)*x**2)) + abs(x)*r1*(r1-r3))/((r1-r3)**2+x**2)
+
+def warp_limit(r1, r3):
+    # get the largest |x| that warp() is defined for
+    return r3*(r1-r3)/math.sqrt(r1**2-r3**2)
+
+def warp_array(xs, r1, r3):
+    # warp a sequence of positions at once; numpy arrays give a numpy array, anything else gives a list
+    # constants of warp(), computed in the same order so that the results match it exactly
+    e = r1-r3
+    a = e**2
+    b = (r3**2)*a
+    c = r1**2-r3**2
+    inverse_r3 = 1/r3
+
+    if np is not None and isinstance(xs, np.ndarray):
+        x_2 = xs**2
+        return inverse_r3*np.copysign(1, xs)*(-np.sqrt(x_2*(b - c*x_2)) + np.abs(xs)*r1*e)/(a + x_2)
+
+    sqrt = math.sqrt
+    copysign = math.copysign
+
+    return [ inverse_r3*copysign(1, x)*(-sqrt(x**2*(b - c*x**2)) + abs(x)*r1*e)/(a + x**2) for x in xs ]
+
+_inverse_warps = {}
+
+def inverse_warp(r1, r3, n_samples=4096):
+    # get the cached inverse warp lookup table for the given radii, creating it if necessary
+    key = (r1, r3, n_samples)
+
+    table = _inverse_warps.get(key)
+
+    if table is None:
+        if len(_inverse_warps) >= 32:
+            _inverse_warps.clear()
+
+        table = InverseWarp(r1, r3, n_samples)
+        _inverse_warps[key] = table
+
+    return table
+
+class InverseWarp():
+    '''
+    Lookup table for the inverse of warp().
+
+    warp() is odd & increasing over the range it is defined for, so its
+    inverse is tabulated once (by bisection) at evenly spaced warped
+    positions from 0 to warp(limit), and positions are unwarped by linear
+    interpolation in the table. Warped positions beyond the table are
+    clamped to its ends.
+    '''
+
+    def __init__(self, r1, r3, n_samples=4096):
+        self.r1 = r1
+        self.r3 = r3
+        self.n_samples = n_samples
+
+        self.x_max = warp_limit(r1, r3)
+        self.y_max = warp(self.x_max, r1, r3)
+
+        self.step = self.y_max/(n_samples - 1)
+
+        self.xs = [ self.bisect(i*self.step) for i in range(n_samples) ]
+        self.xs[-1] = self.x_max
+
+    def bisect(self, y, n_iterations=64):
+        # find the (positive) position that warps to y
+        low, high = 0.0, self.x_max
+
+        for i in range(n_iterations):
+            mid = (low + high)/2
+
+            if warp(mid, self.r1, self.r3) < y:
+                low = mid
+            else:
+                high = mid
+
+        return (low + high)/2
+
+    def __call__(self, ys):
+        # unwarp a sequence of positions at once; numpy arrays give a numpy array, anything else gives a list
+        if np is not None and isinstance(ys, np.ndarray):
+            return np.copysign(np.interp(np.abs(ys), np.arange(self.n_samples)*self.step, self.xs), ys)
+
+        return [ self.unwarp(y) for y in ys ]
+
+    def unwarp(self, y):
+        # unwarp a single position
+        u = min(abs(y)/self.step, self.n_samples - 1)
+        i = min(int(u), self.n_samples - 2)
+
+        x = self.xs[i] + (u - i)*(self.xs[i+1] - self.xs[i])
+
+        return math.copysign(x, y)
+
+# --- TESTS --- #
+
+def check_circle_tessellation(max_radius=4*1280*2, n_radii=2000):
+    # check the edge deviation of the adaptive circles across the radius range
+    worst_error = 0
+    worst_radius = None
+
+    radius = 0.5
+    step = (max_radius/radius)**(1/n_radii)
+
+    while radius <= max_radius:
+        circle = adaptive_unit_circle(radius)
+
+        # the largest deviation is halfway between two neighboring vertices
+        for i in range(circle.n_vertices - 1):
+            mid_x = radius*(circle.xs[i] + circle.xs[i+1])/2
+            mid_y = radius*(circle.ys[i] + circle.ys[i+1])/2
+            error = radius - math.sqrt(mid_x**2 + mid_y**2)
+
+            if error > worst_error:
+                worst_error, worst_radius = error, radius
+
+        # only radii that the finest level can't handle may exceed the maximum error
+        if circle.n_vertices - 1 < CIRCLE_SEGMENTS[-1]:
+            assert circle_edge_error(radius, circle.n_vertices - 1) <= MAX_EDGE_ERROR + 1e-9, radius
+
+        radius *= step
+
+    print("circles: max edge deviation {:.4f} px (radius {:.1f} px), up to {:d} px".format(worst_error, worst_radius, max_radius))
+
+    assert worst_error <= MAX_EDGE_ERROR + 1e-9
+
+def check_warp(r1=10.0, r3=3.0, n_points=10001):
+    # compare the vectorized & inverse warps with the scalar warp()
+    x_max = warp_limit(r1, r3)
+    xs = [ x_max*(2*i/(n_points - 1) - 1) for i in range(n_points) ]
+
+    scalar = [ warp(x, r1, r3) for x in xs ]
+
+    error = max([ abs(a - b) for a, b in zip(warp_array(xs, r1, r3), scalar) ])
+    print("warp: max difference between warp_array() & warp() {:.3g}".format(error))
+    assert error == 0
+
+    if np is not None:
+        error = np.max(np.abs(warp_array(np.array(xs), r1, r3) - np.array(scalar)))
+        print("warp: max difference between warp_array() on numpy arrays & warp() {:.3g}".format(error))
+        assert error <= 1e-12*x_max
+
+    table = inverse_warp(r1, r3)
+
+    error = max([ abs(a - b) for a, b in zip(table(scalar), xs) ])
+    print("warp: max round trip error of the inverse lookup table {:.3g} (limit {:.3g})".format(error, x_max))
+    assert error <= 1e-4*x_max
+
+    if np is not None:
+        error = np.max(np.abs(table(np.array(scalar)) - np.array(xs)))
+        assert error <= 1e-4*x_max
+
+if __name__ == "__main__":
+    check_circle_tessellation()
+    check_warp()
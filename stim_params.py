@@ -0,0 +1,497 @@
+'''
+Typed stim params.
+
+The params of each stim type are held in a StimParams object, whose class
+declares the type & range of each param (in STIM_PARAM_FIELDS) and has a
+slot for each one, so that params are stored compactly & read as
+attributes (params.l_v) by the stims. The classes of each stim type are
+in STIM_PARAMS_CLASSES, with the DEFAULT_*_PARAMS below as defaults.
+Config params are converted to & from JSON with config_params_from_json()
+& config_params_to_json(), & plain dicts of params (eg. in checks, or in
+configs loaded without the controller) with as_stim_params().
+
+StimParams objects can also be read & written like dicts (params['l_v']),
+as the dialogs & the controller do.
+
+Converting params from JSON checks the type of every param, so it is
+slower than copying a dict of floats (see check_stim_params()); it is
+only done when a config is loaded, & the controller caches loaded
+configs (see ConfigCache in config_store.py).
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+# ranges of params: minimum, maximum & whether the minimum is excluded (None means unbounded)
+NUMBER      = (None, None, False)
+POSITIVE    = (0, None, True)
+NONNEGATIVE = (0, None, False)
+FRACTION    = (0, 1, False)
+
+# name, type & range of the params of each stim type
+STIM_PARAM_FIELDS = {"Looming Dot": [("looming_dot_init_x_pos", float, NUMBER),
+                                     ("looming_dot_init_y_pos", float, NUMBER),
+                                     ("l_v", float, POSITIVE),
+                                     ("looming_dot_brightness", float, FRACTION),
+                                     ("background_brightness", float, FRACTION),
+                                     ("checkered", bool, NUMBER),
+                                     ("num_squares", int, POSITIVE),
+                                     ("expand_checkered_pattern", bool, NUMBER)],
+                     "Moving Dot": [("radius", float, NONNEGATIVE),
+                                    ("moving_dot_init_x_pos", float, NUMBER),
+                                    ("moving_dot_init_y_pos", float, NUMBER),
+                                    ("v_x", float, NUMBER),
+                                    ("v_y", float, NUMBER),
+                                    ("moving_dot_brightness", float, FRACTION),
+                                    ("background_brightness", float, FRACTION)],
+                     "Combined Dots": [("radius", float, NONNEGATIVE),
+                                       ("moving_dot_init_x_pos", float, NUMBER),
+                                       ("moving_dot_init_y_pos", float, NUMBER),
+                                       ("v_x", float, NUMBER),
+                                       ("v_y", float, NUMBER),
+                                       ("moving_dot_brightness", float, FRACTION),
+                                       ("looming_dot_init_x_pos", float, NUMBER),
+                                       ("looming_dot_init_y_pos", float, NUMBER),
+                                       ("l_v", float, POSITIVE),
+                                       ("looming_dot_brightness", float, FRACTION),
+                                       ("background_brightness", float, FRACTION)],
+                     "Optomotor Grating": [("frequency", float, POSITIVE),
+                                           ("merging_pos", float, NONNEGATIVE),
+                                           ("init_phase", float, NUMBER),
+                                           ("velocity", float, NUMBER),
+                                           ("contrast", float, FRACTION),
+                                           ("brightness", float, FRACTION),
+                                           ("angle", float, NUMBER)],
+                     "Grating": [("frequency", float, POSITIVE),
+                                 ("init_phase", float, NUMBER),
+                                 ("velocity", float, NUMBER),
+                                 ("contrast", float, FRACTION),
+                                 ("brightness", float, FRACTION),
+                                 ("angle", float, NUMBER)],
+                     "Broadband Grating": [("frequency", float, POSITIVE),
+                                           ("init_phase", float, NUMBER),
+                                           ("velocity", float, NUMBER),
+                                           ("contrast", float, FRACTION),
+                                           ("brightness", float, FRACTION),
+                                           ("angle", float, NUMBER)],
+                     "Perlin Noise": [("frequency", float, POSITIVE),
+                                      ("octaves", int, POSITIVE),
+                                      ("velocity", float, NUMBER),
+                                      ("contrast", float, FRACTION),
+                                      ("brightness", float, FRACTION),
+                                      ("angle", float, NUMBER),
+                                      ("seed", int, NONNEGATIVE)],
+                     "Multiple Moving Dots": [("n_dots", int, POSITIVE),
+                                              ("radius", float, NONNEGATIVE),
+                                              ("v_x", float, NUMBER),
+                                              ("v_y", float, NUMBER),
+                                              ("velocity_spread", float, NONNEGATIVE),
+                                              ("dot_brightness", float, FRACTION),
+                                              ("background_brightness", float, FRACTION),
+                                              ("seed", int, NONNEGATIVE)],
+                     "Random Dot Kinematogram": [("density", float, POSITIVE),
+                                                 ("radius", float, NONNEGATIVE),
+                                                 ("velocity", float, NUMBER),
+                                                 ("angle", float, NUMBER),
+                                                 ("coherence", float, FRACTION),
+                                                 ("lifetime", float, POSITIVE),
+                                                 ("dot_brightness", float, FRACTION),
+                                                 ("background_brightness", float, FRACTION),
+                                                 ("seed", int, NONNEGATIVE)],
+                     "White Flash": [("brightness", float, FRACTION)],
+                     "Black Flash": [],
+                     "Delay": []}
+
+# set default params for loooming dot stim
+DEFAULT_LOOMING_DOT_PARAMS = {'looming_dot_init_x_pos': 0,
+                              'looming_dot_init_y_pos': 0,
+                              'l_v': 20,                   ## edited from 150 to 20
+                              'looming_dot_brightness': 1.0,
+                              'background_brightness': 0,
+                              'checkered': False,
+                              'num_squares': 10,
+                              'expand_checkered_pattern': True}
+
+# set default params for moving dot stim
+DEFAULT_MOVING_DOT_PARAMS = {'radius': 10.0,
+                             'moving_dot_init_x_pos': 0.0,
+                             'moving_dot_init_y_pos': 0.0,
+                             'v_x': 1.0,
+                             'v_y': 0.0,
+                             'moving_dot_brightness': 1.0,
+                             'background_brightness': 0}
+
+# set default params for combined dots stim
+DEFAULT_COMBINED_DOTS_PARAMS = {'radius': 10.0,
+                                'moving_dot_init_x_pos': 0.0,
+                                'looming_dot_init_x_pos': 0.0,
+                                'moving_dot_init_y_pos': 0.0,
+                                'looming_dot_init_y_pos': 0.0,
+                                'v_x': 0.01,
+                                'v_y': 0.0,
+                                'l_v': 20,
+                                'moving_dot_brightness': 1.0,
+                                'looming_dot_brightness': 1.0,
+                                'background_brightness': 0}
+
+# set default params for OMR stim
+#can I use init_phase for phase? does x just signify distance from converging line?
+DEFAULT_OPTOMOTOR_GRATING_PARAMS = {'frequency': 0.2,
+                          'init_phase': 0.0,
+                          'merging_pos': 0.0, 
+                          'velocity': 5,
+                          'contrast': 1.0,
+                          'brightness': 1.0,
+                          'angle': 0,}
+
+# set default params for grating stim
+DEFAULT_GRATING_PARAMS = {'frequency': 0.2,
+                          'init_phase': 0.0,
+                          'velocity': 5,
+                          'contrast': 1.0,
+                          'brightness': 1.0,
+                          'angle': 0}
+
+# set default params for broadband grating stim
+DEFAULT_BROADBAND_GRATING_PARAMS = {'frequency': 0.2,
+                                    'init_phase': 0.0,
+                                    'velocity': 5,
+                                    'contrast': 1.0,
+                                    'brightness': 1.0,
+                                    'angle': 0}
+
+# set default params for perlin noise stim
+DEFAULT_NOISE_PARAMS = {'frequency': 0.5,
+                        'octaves': 3,
+                        'velocity': 5,
+                        'contrast': 1.0,
+                        'brightness': 1.0,
+                        'angle': 0,
+                        'seed': 0}
+
+# set default params for multiple moving dots stim
+DEFAULT_MULTIPLE_MOVING_DOTS_PARAMS = {'n_dots': 1000,
+                                       'radius': 3.0,
+                                       'v_x': 5.0,
+                                       'v_y': 0.0,
+                                       'velocity_spread': 0.0,
+                                       'dot_brightness': 1.0,
+                                       'background_brightness': 0,
+                                       'seed': 0}
+
+# set default params for random dot kinematogram stim
+DEFAULT_RANDOM_DOT_KINEMATOGRAM_PARAMS = {'density': 1.0,    # dots/deg^2
+                                          'radius': 3.0,
+                                          'velocity': 5.0,
+                                          'angle': 0,
+                                          'coherence': 0.5,
+                                          'lifetime': 200,   # ms
+                                          'dot_brightness': 1.0,
+                                          'background_brightness': 0,
+                                          'seed': 0}
+
+# set default params for white flash stim
+DEFAULT_WHITE_FLASH_PARAMS = {'brightness': 1.0}
+
+##!!Set default params for OKR
+
+# set default params of each stim type
+DEFAULT_STIM_PARAMS = {"Looming Dot": DEFAULT_LOOMING_DOT_PARAMS,
+                       "Moving Dot": DEFAULT_MOVING_DOT_PARAMS,
+                       "Combined Dots": DEFAULT_COMBINED_DOTS_PARAMS,
+                       "Optomotor Grating": DEFAULT_OPTOMOTOR_GRATING_PARAMS,
+                       "Grating": DEFAULT_GRATING_PARAMS,
+                       "Broadband Grating": DEFAULT_BROADBAND_GRATING_PARAMS,
+                       "Perlin Noise": DEFAULT_NOISE_PARAMS,
+                       "Multiple Moving Dots": DEFAULT_MULTIPLE_MOVING_DOTS_PARAMS,
+                       "Random Dot Kinematogram": DEFAULT_RANDOM_DOT_KINEMATOGRAM_PARAMS,
+                       "White Flash": DEFAULT_WHITE_FLASH_PARAMS,
+                       "Black Flash": {},
+                       "Delay": {}}
+
+class StimParams(object):
+    '''
+    Params of a stim, with a slot for each one.
+
+    Subclasses are made for each stim type by stim_params_classes(), with
+    the stim type, the names, types & ranges of the params (fields) & their
+    defaults. Params that aren't given are set to their defaults.
+    '''
+
+    __slots__ = ()
+
+    stim_type  = None
+    fields     = ()
+    names      = ()
+    defaults   = {}
+    converters = ()
+
+    def __init__(self, **values):
+        for name, field_type, convert, default in self.converters:
+            setattr(self, name, convert(values[name]) if name in values else default)
+
+    @classmethod
+    def from_json(cls, values):
+        # get params from a dict (eg. loaded from JSON, or the text of textboxes), converting them to their
+        # types; params that are missing or can't be converted are set to their defaults
+        params = cls.__new__(cls)
+
+        for name, field_type, convert, default in cls.converters:
+            try:
+                value = values[name]
+
+                # values loaded from JSON usually have their types already
+                if value.__class__ is not field_type:
+                    value = convert(value)
+
+                setattr(params, name, value)
+            except (KeyError, TypeError, ValueError, OverflowError):
+                setattr(params, name, default)
+
+        return params
+
+    def to_json(self):
+        # get the params as a dict that can be saved as JSON
+        return dict([ (name, getattr(self, name)) for name in self.names ])
+
+    def copy(self):
+        params = self.__class__.__new__(self.__class__)
+
+        for name in self.names:
+            setattr(params, name, getattr(self, name))
+
+        return params
+
+    # --- DICT ACCESS --- #
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
+
+    def __setitem__(self, name, value):
+        if name not in self.names:
+            raise KeyError(name)
+
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, name, default=None):
+        if name in self.names:
+            return getattr(self, name)
+
+        return default
+
+    def keys(self):
+        return list(self.names)
+
+    def values(self):
+        return [ getattr(self, name) for name in self.names ]
+
+    def items(self):
+        return [ (name, getattr(self, name)) for name in self.names ]
+
+    def __eq__(self, other):
+        if isinstance(other, StimParams):
+            other = other.to_json()
+
+        return self.to_json() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, ", ".join([ "{}={!r}".format(name, getattr(self, name)) for name in self.names ]))
+
+# --- HELPER FUNCTIONS --- #
+
+def to_int(value):
+    # convert a param to an int, accepting whole floats & strings of them (eg. "3.0"), but not 2.5
+    number = float(value)
+
+    if number != int(number):
+        raise ValueError("{!r} isn't a whole number".format(value))
+
+    return int(number)
+
+def to_bool(value):
+    # convert a param to a bool, accepting True & False, 1 & 0 & strings of them ("true", "False", "1", etc.)
+    if value is True or value is False:
+        return value
+
+    if hasattr(value, "lower"):
+        text = value.strip().lower()
+
+        if text in ("true", "1"):
+            return True
+        if text in ("false", "0"):
+            return False
+    elif value == 1 or value == 0:
+        return value == 1
+
+    raise ValueError("{!r} isn't true or false".format(value))
+
+# functions converting params to each type
+CONVERTERS = {float: float, int: to_int, bool: to_bool}
+
+def stim_params_classes(defaults):
+    # make a StimParams class for each stim type, given the default params of each stim type
+    classes = {}
+
+    for stim_type in STIM_PARAM_FIELDS:
+        fields = STIM_PARAM_FIELDS[stim_type]
+        names  = tuple([ field[0] for field in fields ])
+
+        stim_defaults = defaults.get(stim_type, {})
+
+        for name in names:
+            if name not in stim_defaults:
+                raise ValueError("No default for the '{}' param of {} stims.".format(name, stim_type))
+
+        # the type of each param, the function converting a param to it, & its default
+        converters = tuple([ (name, field_type, CONVERTERS[field_type], CONVERTERS[field_type](stim_defaults[name])) for name, field_type, field_range in fields ])
+
+        class_name = str(stim_type.replace(" ", "") + "Params")
+
+        classes[stim_type] = type(class_name, (StimParams,), {'__slots__': names,
+                                                              'stim_type': stim_type,
+                                                              'fields': tuple(fields),
+                                                              'names': names,
+                                                              'defaults': dict(stim_defaults),
+                                                              'converters': converters})
+
+    return classes
+
+# create classes of typed params for each stim type, with the default params
+STIM_PARAMS_CLASSES = stim_params_classes(DEFAULT_STIM_PARAMS)
+
+def stim_params_from_json(stim_type, values, classes):
+    # get the params of a stim of the given type from a dict; stims of unknown types keep the dict
+    if stim_type not in classes:
+        return dict(values)
+
+    return classes[stim_type].from_json(values)
+
+def as_stim_params(stim_type, params):
+    # get params that a stim can read as attributes, converting a dict of params if necessary
+    if isinstance(params, StimParams):
+        return params
+
+    return stim_params_from_json(stim_type, params, STIM_PARAMS_CLASSES)
+
+def config_params_from_json(config_params, classes):
+    # get config params loaded from JSON with typed stim params & durations & TTL params converted to floats
+    return {'stim_list': list(config_params['stim_list']),
+            'durations_list': [ float(duration) for duration in config_params['durations_list'] ],
+            'types_list': list(config_params['types_list']),
+            'parameters_list': [ stim_params_from_json(stim_type, params, classes) for stim_type, params in zip(config_params['types_list'], config_params['parameters_list']) ],
+            'TTL_params': dict([ (key, float(value)) for key, value in config_params['TTL_params'].items() ])}
+
+def config_params_to_json(config_params):
+    # get config params as a dict that can be saved as JSON
+    json_params = dict(config_params)
+
+    json_params['parameters_list'] = [ params.to_json() if isinstance(params, StimParams) else dict(params) for params in config_params['parameters_list'] ]
+
+    return json_params
+
+# --- TESTS --- #
+
+def check_stim_params(n_configs=1000):
+    # check that params are converted to their types, fall back to their defaults & round-trip through
+    # JSON, & compare the size & conversion time of typed params with dicts of floats
+    import json
+    import sys
+    import time
+
+    defaults = {"Looming Dot": {'looming_dot_init_x_pos': 0, 'looming_dot_init_y_pos': 0, 'l_v': 20, 'looming_dot_brightness': 1.0, 'background_brightness': 0,
+                                'checkered': False, 'num_squares': 10, 'expand_checkered_pattern': True},
+                "Grating": {'frequency': 0.2, 'init_phase': 0.0, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0}}
+
+    # every field needs a default
+    try:
+        stim_params_classes(defaults)
+        assert False
+    except ValueError:
+        pass
+
+    for stim_type in STIM_PARAM_FIELDS:
+        if stim_type not in defaults:
+            defaults[stim_type] = dict([ (field[0], 0) for field in STIM_PARAM_FIELDS[stim_type] ])
+
+    classes = stim_params_classes(defaults)
+
+    LoomingDotParams = classes["Looming Dot"]
+
+    params = LoomingDotParams.from_json({'l_v': "40", 'num_squares': 12.0, 'checkered': True, 'looming_dot_brightness': "bright", 'unknown': 1})
+
+    assert params.l_v == 40.0 and type(params.l_v) is float
+    assert params.num_squares == 12 and type(params.num_squares) is int
+    assert params.checkered is True
+    assert params.looming_dot_brightness == 1.0
+    assert params['expand_checkered_pattern'] is True and 'unknown' not in params
+
+    # bools are parsed rather than tested for truth, & ints must be whole
+    assert [ to_bool(value) for value in (True, False, 1, 0, 1.0, "true", "False", "1", "0") ] == [True, False, True, False, True, True, False, True, False]
+
+    params_2 = LoomingDotParams.from_json({'checkered': "False", 'expand_checkered_pattern': "maybe", 'num_squares': 2.5})
+
+    assert params_2.checkered is False and params_2.expand_checkered_pattern is True
+    assert params_2.num_squares == 10
+
+    assert not hasattr(params, '__dict__')
+
+    # params round-trip through JSON
+    assert LoomingDotParams.from_json(json.loads(json.dumps(params.to_json()))) == params
+
+    copied = params.copy()
+    copied['l_v'] = 10.0
+    assert params.l_v == 40.0
+
+    grating_json = {'frequency': 0.1, 'init_phase': 0.0, 'velocity': 5.0, 'contrast': 1.0, 'brightness': 1.0, 'angle': 30.0}
+
+    config_json = {'stim_list': ["loom", "grating", "delay"], 'types_list': ["Looming Dot", "Grating", "Delay"], 'durations_list': [2, 5, 1],
+                   'parameters_list': [params.to_json(), grating_json, {}], 'TTL_params': {'delay': 10, 'frequency': 50}}
+
+    config_params = config_params_from_json(config_json, classes)
+
+    assert config_params['parameters_list'][1].angle == 30.0
+    assert config_params['durations_list'] == [2.0, 5.0, 1.0]
+    assert json.loads(json.dumps(config_params_to_json(config_params))) == dict(config_json, durations_list=[2.0, 5.0, 1.0], TTL_params={'delay': 10.0, 'frequency': 50.0})
+
+    # compare with converting every param to a float, as the controller did
+    looming_dot_json = params.to_json()
+
+    start_time = time.time()
+    for i in range(n_configs):
+        for stim_type, values in [("Looming Dot", looming_dot_json), ("Grating", grating_json)]:
+            converted = dict(defaults[stim_type])
+            for key in values:
+                try:
+                    converted[key] = float(values[key])
+                except:
+                    pass
+    dict_duration = time.time() - start_time
+
+    start_time = time.time()
+    for i in range(n_configs):
+        LoomingDotParams.from_json(looming_dot_json)
+        classes["Grating"].from_json(grating_json)
+    typed_duration = time.time() - start_time
+
+    print("stim params: {} bytes per looming dot params object, {} bytes for a dict; {:.1f} us to convert a config's params with dicts, {:.1f} us typed".format(
+          sys.getsizeof(params), sys.getsizeof(params.to_json()), 1e6*dict_duration/n_configs, 1e6*typed_duration/n_configs))
+
+if __name__ == "__main__":
+    check_stim_params()
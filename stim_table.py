@@ -0,0 +1,366 @@
+'''
+Compiled per-frame stim tables.
+
+A config is compiled for a refresh rate into a table with a row for every
+frame, holding the stim & the params that change over time (phase, dot
+position, looming dot radius & the seed & time or frame of dot fields) in
+columns. The stims compute these from
+the time since their start (see frame_clock.py), so the table is built by
+evaluating each stim at the time of each of its frames. Looking up the
+state of the stim on a frame is then a read of one row, and the table can
+be saved as the exact record of what was shown.
+
+Params that a stim doesn't have are stored as NaN.
+
+Configs are compiled in the background by a TableCompiler whenever their
+params change, so the table is usually ready when the stimulation starts.
+The stims' dot fields & schedules are cached (see dot_field.py), so the
+stims the stim window sets up reuse the ones computed for the table, &
+compiling never draws, so no textures (eg. of noise) are made for it.
+
+This module doesn't depend on OpenTK, so it can be imported (and tested)
+headlessly.
+'''
+
+from __future__ import division
+
+import array
+import threading
+
+from stims import STIM_CLASSES
+from stim_params import as_stim_params
+from render_backend import RecordingBackend
+from frame_clock import FrameClock
+
+# columns of params that change over time, & the keys of current_state() that are stored in them
+COLUMNS = ["phase", "x", "y", "radius", "seed", "t", "stim frame"]
+
+COLUMN_KEYS = {"phase": "phase",
+               "x": "x",
+               "y": "y",
+               "radius": "radius",
+               "seed": "seed",
+               "t": "t",
+               "frame": "stim frame",
+               "moving dot x": "x",
+               "moving dot y": "y",
+               "looming dot radius": "radius"}
+
+NAN = float("nan")
+
+class StimTable():
+    '''
+    Per-frame states of the stims in a config, in columns.
+
+    Frames are numbered from the start of the config, with each stim
+    starting on the frame after the last frame of the previous one, as in
+    StimWindow. Stim i covers the frames from start_frames[i] to
+    start_frames[i] + n_frames[i] - 1 (every stim has at least one frame).
+    '''
+
+    def __init__(self, frame_rate):
+        self.frame_rate = frame_rate
+        self.period     = 1000.0/frame_rate # ms
+
+        # per-stim info
+        self.stim_names   = []
+        self.stim_types   = []
+        self.stim_keys    = []
+        self.start_frames = []
+        self.n_frames     = []
+
+        # per-frame columns
+        self.stim_index = array.array('i')
+        self.columns    = dict([ (column, array.array('d')) for column in COLUMNS ])
+
+    def add_stim(self, stim_name, stim_type, keys, states):
+        # add a stim with the given current_state() keys & the current_state() dicts on each of its frames
+        self.stim_names.append(stim_name)
+        self.stim_types.append(stim_type)
+        self.stim_keys.append(list(keys))
+        self.start_frames.append(len(self.stim_index))
+        self.n_frames.append(len(states))
+
+        index = len(self.stim_names) - 1
+
+        for state in states:
+            self.stim_index.append(index)
+
+            for column in COLUMNS:
+                self.columns[column].append(NAN)
+
+            for key in keys:
+                column = COLUMN_KEYS.get(key)
+
+                if column is not None:
+                    self.columns[column][-1] = state[key]
+
+    def total_frames(self):
+        return len(self.stim_index)
+
+    def time(self, frame):
+        # get the time since the start of a stim of the given frame within it (ms)
+        return frame*self.period
+
+    def row(self, stim_index, frame):
+        # get the row of the given frame within a stim, clamped to the stim's last frame
+        return self.start_frames[stim_index] + max(0, min(frame, self.n_frames[stim_index] - 1))
+
+    def state(self, stim_index, frame):
+        # get the state dict & keys of a stim on the given frame within it, as given by current_stim_state()
+        row = self.row(stim_index, frame)
+        keys = self.stim_keys[stim_index]
+
+        stim_dict = {"stim #": stim_index,
+                     "stim name": self.stim_names[stim_index],
+                     "stim type": self.stim_types[stim_index]}
+
+        for key in keys:
+            column = COLUMN_KEYS.get(key)
+
+            if column is not None:
+                stim_dict[key] = self.columns[column][row]
+
+        return stim_dict, ["stim #", "stim name", "stim type"] + keys
+
+    def save(self, path):
+        # save the table as a CSV file, with a row for every frame
+        print("StimTable: Saving {} frames in {}.".format(self.total_frames(), path))
+
+        with open(path, "w") as output_file:
+            output_file.write("frame,time (ms),stim #,stim name,stim type,{}\n".format(",".join(COLUMNS)))
+
+            for row in range(self.total_frames()):
+                index = self.stim_index[row]
+
+                values = [ format_value(self.columns[column][row]) for column in COLUMNS ]
+
+                output_file.write("{},{},{},{},{},{}\n".format(row, format_value(self.time(row - self.start_frames[index])), index, self.stim_names[index], self.stim_types[index], ",".join(values)))
+
+class _CompileWindow():
+    '''
+    Stand-in for StimWindow that stims are created in to be compiled.
+    '''
+
+    # attributes of the stim window that the stims use
+    attributes = ["display_width", "display_height", "px_width", "px_height", "distance", "resolution", "dish_radius", "warp_perspective"]
+
+    def __init__(self, stim_window):
+        for attribute in self.attributes:
+            setattr(self, attribute, getattr(stim_window, attribute))
+
+        self.backend = RecordingBackend()
+
+def compile_config(stim_window, config_params, frame_rate=60):
+    # compile a config into a table of the states of its stims on every frame, with stims set up for
+    # the given stim window's geometry
+    table = StimTable(frame_rate)
+
+    window = _CompileWindow(stim_window)
+    window.clock = FrameClock(frame_rate)
+
+    for index in range(len(config_params['stim_list'])):
+        window.stim_index = index
+        window.stim_name  = config_params['stim_list'][index]
+        window.stim_type  = config_params['types_list'][index]
+        window.duration   = config_params['durations_list'][index]
+        window.params     = as_stim_params(window.stim_type, config_params['parameters_list'][index])
+
+        stim = STIM_CLASSES[window.stim_type](window)
+        stim.start_func()
+
+        # the stim is shown until the first frame at or after the end of its duration (as in StimWindow)
+        n_frames = 1
+        while table.time(n_frames) < stim.duration:
+            n_frames += 1
+
+        states = []
+
+        for frame in range(n_frames):
+            if frame > 0:
+                stim.update_func(table.time(frame))
+
+            states.append(stim.current_state()[0])
+
+        keys = stim.current_state()[1] or []
+
+        stim.end_func()
+
+        table.add_stim(window.stim_name, window.stim_type, keys, states)
+
+    return table
+
+class TableCompiler():
+    '''
+    Compiles configs into StimTables in a background thread.
+
+    request() is called whenever the params change & only compiles the
+    latest request; table() waits for it to be compiled, & compiles the
+    config again straight away if it was requested at a different refresh
+    rate (eg. one measured by a stimulation since).
+    '''
+
+    def __init__(self):
+        self.condition = threading.Condition()
+
+        # latest request waiting to be compiled, as (#, window, config params, frame rate), & the # of requests
+        self.pending     = None
+        self.n_requested = 0
+
+        # latest compiled request, as (#, window, config params, frame rate, table)
+        self.compiled = (0, None, None, None, None)
+
+        self.running = True
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def request(self, stim_window, config_params, frame_rate):
+        # compile a config's params (which mustn't be changed afterwards) for the given stim window's geometry
+        window = _CompileWindow(stim_window)
+
+        with self.condition:
+            self.n_requested += 1
+            self.pending = (self.n_requested, window, config_params, frame_rate)
+
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+
+                if not self.running:
+                    return
+
+                number, window, config_params, frame_rate = self.pending
+                self.pending = None
+
+            try:
+                table = compile_config(window, config_params, frame_rate)
+            except Exception as error:
+                print("TableCompiler: Could not compile the config: {}.".format(error))
+                table = None
+
+            with self.condition:
+                self.compiled = (number, window, config_params, frame_rate, table)
+
+                self.condition.notify_all()
+
+    def table(self, frame_rate):
+        # get the table of the latest request, compiled at the given frame rate, or None if nothing was requested
+        with self.condition:
+            while self.compiled[0] < self.n_requested:
+                self.condition.wait()
+
+            number, window, config_params, table_rate, table = self.compiled
+
+        if number == 0:
+            return None
+
+        if table_rate != frame_rate:
+            print("TableCompiler: Compiling config at {:.3f} Hz.".format(frame_rate))
+
+            table = compile_config(window, config_params, frame_rate)
+
+            with self.condition:
+                if self.compiled[0] == number:
+                    self.compiled = (number, window, config_params, frame_rate, table)
+
+        return table
+
+    def close(self):
+        # stop the thread, after any config being compiled
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+        self.thread.join()
+
+# --- HELPER FUNCTIONS --- #
+
+def format_value(value):
+    # format a number for a CSV file, leaving NaNs empty
+    if value != value:
+        return ""
+
+    return repr(value)
+
+# --- TESTS --- #
+
+def check_stim_table(frame_rate=60):
+    # check that the state looked up in a compiled table matches the state of a stim updated on every
+    # frame, & time the lookup against updating the stim & getting its state
+    import time
+
+    from stims import _HeadlessStimWindow
+
+    grating_params = {'frequency': 0.2, 'init_phase': 10.0, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0}
+    moving_dot_params = {'radius': 10.0, 'moving_dot_init_x_pos': 0.0, 'moving_dot_init_y_pos': 0.0, 'v_x': 1.0, 'v_y': 2.0, 'moving_dot_brightness': 1.0, 'background_brightness': 0}
+    looming_dot_params = {'looming_dot_init_x_pos': 0, 'looming_dot_init_y_pos': 0, 'l_v': 20, 'looming_dot_brightness': 1.0, 'background_brightness': 0, 'checkered': False, 'num_squares': 10, 'expand_checkered_pattern': True}
+
+    random_dot_kinematogram_params = {'density': 20, 'radius': 2.0, 'velocity': 5.0, 'angle': 0, 'coherence': 0.8, 'lifetime': 200, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': 2}
+
+    config_params = {'stim_list': ["loom", "dot", "grating", "rdk", "delay"],
+                     'types_list': ["Looming Dot", "Moving Dot", "Grating", "Random Dot Kinematogram", "Delay"],
+                     'durations_list': [2, 3.5, 5, 2, 1],
+                     'parameters_list': [looming_dot_params, moving_dot_params, grating_params, random_dot_kinematogram_params, {}]}
+
+    stim_window = _HeadlessStimWindow(RecordingBackend(), "Delay", {})
+
+    table = compile_config(stim_window, config_params, frame_rate)
+
+    assert table.n_frames == [120, 210, 300, 120, 60], table.n_frames
+
+    live_time   = 0
+    lookup_time = 0
+
+    for index in range(len(config_params['stim_list'])):
+        window = _HeadlessStimWindow(RecordingBackend(), config_params['types_list'][index], config_params['parameters_list'][index], duration=config_params['durations_list'][index])
+        window.stim_index = index
+        window.stim_name  = config_params['stim_list'][index]
+
+        stim = STIM_CLASSES[window.stim_type](window)
+        stim.start_func()
+
+        for frame in range(table.n_frames[index]):
+            start_time = time.time()
+            if frame > 0:
+                stim.update_func(table.time(frame))
+            state, keys = stim.current_state()
+            live_time += time.time() - start_time
+
+            start_time = time.time()
+            table_state, table_keys = table.state(index, frame)
+            lookup_time += time.time() - start_time
+
+            if keys is not None:
+                state = dict(state, **{"stim #": index, "stim name": window.stim_name, "stim type": window.stim_type})
+
+                assert table_state == state, (index, frame)
+                assert table_keys == ["stim #", "stim name", "stim type"] + keys
+
+    print("stim table: {} frames match the live states; lookup {:.1f} us/frame, update & state {:.1f} us/frame".format(table.total_frames(), 1e6*lookup_time/table.total_frames(), 1e6*live_time/table.total_frames()))
+
+    # the background compiler gives the table of the latest request, & compiles it again at a new frame rate
+    compiler = TableCompiler()
+
+    assert compiler.table(frame_rate) is None
+
+    start_time = time.time()
+    compiler.request(stim_window, dict(config_params, durations_list=[1, 1, 1, 1, 1]), frame_rate)
+    compiler.request(stim_window, config_params, frame_rate)
+    request_time = time.time() - start_time
+
+    assert compiler.table(frame_rate).n_frames == table.n_frames
+    assert compiler.table(frame_rate/2).n_frames == [60, 105, 150, 60, 30]
+
+    compiler.close()
+    assert not compiler.thread.is_alive()
+
+    print("table compiler: {:.3f} ms to request a table".format(1000*request_time))
+
+if __name__ == "__main__":
+    check_stim_table()
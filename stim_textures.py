@@ -0,0 +1,508 @@
+'''
+Texture generators for the stimuli.
+
+Textures are computed once per parameter set and cached, so that a running
+stimulus only looks up texels that have already been generated instead of
+rebuilding them pixel by pixel every frame. Each cache keeps the
+MAX_CACHED_TEXTURES most recently used parameter sets. The caches are
+shared by the stim window & the thread that compiles stim tables (see
+stim_table.py), so they are locked.
+
+This module doesn't depend on OpenTK, so it can be imported (and
+benchmarked) headlessly.
+'''
+
+from __future__ import division
+
+import os
+import math
+import threading
+
+from collections import OrderedDict
+
+from perlin_noise import pnoise3, pnoise3_array, np
+
+# number of sub-texel phase offsets precomputed for grating profiles
+GRATING_SUB_STEPS = 4
+
+# maximum number of cached parameter sets per cache
+MAX_CACHED_TEXTURES = 32
+
+class TextureCache():
+    '''
+    Cache of textures (or profiles) by their params, which forgets the
+    least recently used one when it is full.
+    '''
+
+    def __init__(self, capacity=MAX_CACHED_TEXTURES):
+        self.capacity = capacity
+        self.items    = OrderedDict()
+
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        # get a cached value (None if it isn't cached), marking it as the most recently used
+        with self.lock:
+            value = self.items.pop(key, None)
+
+            if value is not None:
+                self.items[key] = value
+
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.items.pop(key, None)
+            self.items[key] = value
+
+            while len(self.items) > self.capacity:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+_grating_profiles = TextureCache()
+
+def grating_profile(frequency, contrast, brightness, width, span, sub_steps=GRATING_SUB_STEPS, row_type=bytearray):
+    # get the cached grating profile for this set of params, creating it if necessary
+    key = (frequency, contrast, brightness, width, span, sub_steps, row_type)
+
+    profile = _grating_profiles.get(key)
+
+    if profile is None:
+        profile = GratingProfile(frequency, contrast, brightness, width, span, sub_steps, row_type)
+        _grating_profiles.put(key, profile)
+
+    return profile
+
+class GratingProfile():
+    '''
+    Luminance profile of a sine grating.
+
+    The profile is computed once over one period plus the texture width,
+    for each of `sub_steps` sub-texel offsets, so the texels for any phase
+    are a contiguous slice of one of these RGB rows, starting at the texel
+    given by index() (as with BroadbandProfile). The phase is quantized to
+    1/sub_steps of a texel.
+    '''
+
+    def __init__(self, frequency, contrast, brightness, width, span, sub_steps=GRATING_SUB_STEPS, row_type=bytearray):
+        self.frequency = frequency # cycles/px
+        self.width     = width # texels
+        self.sub_steps = sub_steps
+
+        # distance between texels (px)
+        self.texel_spacing = span/width
+
+        # period of the grating (texels)
+        self.period = 1.0/(frequency*self.texel_spacing)
+
+        # texels per row, covering any offset within a period
+        n_texels = int(math.ceil(self.period)) + width + 1
+
+        scale = brightness*255.0/2.0
+
+        self.rows = []
+
+        for s in range(sub_steps):
+            if np is not None:
+                x = np.arange(n_texels) + s/sub_steps
+                luminances = bytearray(np.round((contrast*np.sin(2*math.pi*x/self.period) + 1.0)*scale).astype(np.uint8).tobytes())
+            else:
+                luminances = bytearray([ int(round((contrast*math.sin(2*math.pi*(x + s/sub_steps)/self.period) + 1.0)*scale)) for x in range(n_texels) ])
+
+            texels = bytearray(3*n_texels)
+            texels[0::3] = luminances
+            texels[1::3] = luminances
+            texels[2::3] = luminances
+
+            self.rows.append(row_type(texels))
+
+    def index(self, phase):
+        # get the row & first texel of the profile shifted by the given phase (px)
+        o = (-phase/self.texel_spacing) % self.period
+        step = int(round(o*self.sub_steps))
+
+        return step % self.sub_steps, step // self.sub_steps
+
+# number of texels used for a single period of a scrolling grating
+GRATING_PERIOD_TEXELS = 256
+
+_grating_periods = TextureCache()
+
+def grating_period(contrast, brightness, n_texels=GRATING_PERIOD_TEXELS, row_type=bytearray):
+    # get the RGB texels for one period of a sine grating, starting at phase 0.
+    # With a repeating texture, a grating of any frequency & phase can be drawn
+    # from these texels by scaling & shifting the texture coordinates.
+    key = (contrast, brightness, n_texels, row_type)
+
+    row = _grating_periods.get(key)
+
+    if row is None:
+        scale = brightness*255.0/2.0
+
+        # sample at texel centers, so that texture coordinate s maps to phase 2*pi*s
+        luminances = bytearray([ int(round((contrast*math.sin(2*math.pi*(x + 0.5)/n_texels) + 1.0)*scale)) for x in range(n_texels) ])
+
+        texels = bytearray(3*n_texels)
+        texels[0::3] = luminances
+        texels[1::3] = luminances
+        texels[2::3] = luminances
+
+        row = row_type(texels)
+        _grating_periods.put(key, row)
+
+    return row
+
+# number of sub-texel offsets precomputed for broadband gratings
+BROADBAND_SUB_STEPS = 4
+
+_broadband_profiles = TextureCache()
+
+def broadband_profile(frequency, contrast, brightness, period, width, sub_steps=BROADBAND_SUB_STEPS, row_type=bytearray):
+    # get the cached broadband grating profile for this set of params, creating it if necessary
+    key = (frequency, contrast, brightness, period, width, sub_steps, row_type)
+
+    profile = _broadband_profiles.get(key)
+
+    if profile is None:
+        profile = BroadbandProfile(frequency, contrast, brightness, period, width, sub_steps, row_type)
+        _broadband_profiles.put(key, profile)
+
+    return profile
+
+class BroadbandProfile():
+    '''
+    Lookup table for a broadband grating.
+
+    The profile repeats every `period` texels, so it is computed once over
+    one period plus the texture width, for each of `sub_steps` sub-texel
+    offsets. The texels for any offset are then a contiguous slice of one of
+    these RGBA rows, starting at the texel given by index().
+    '''
+
+    def __init__(self, frequency, contrast, brightness, period, width, sub_steps=BROADBAND_SUB_STEPS, row_type=bytearray):
+        self.frequency = frequency # cycles/px
+        self.period    = period # texels
+        self.width     = width # texels
+        self.sub_steps = sub_steps
+
+        scale = contrast*brightness*255.0/2.0
+
+        self.rows = []
+
+        for s in range(sub_steps):
+            luminances = bytearray([ int((self.profile(x + s/sub_steps) + 1.0)*scale) for x in range(period + width) ])
+
+            texels = bytearray(b'\xff')*(4*(period + width))
+            texels[0::4] = luminances
+            texels[1::4] = luminances
+            texels[2::4] = luminances
+
+            self.rows.append(row_type(texels))
+
+    def profile(self, x):
+        # value of the profile (-1 to 1) at the given position (texels)
+        u = (x % self.period)*2
+        return math.sin((0.2*self.frequency*math.sin(self.frequency*u) + self.frequency)*u*2*math.pi)
+
+    def index(self, offset):
+        # get the row & first texel of the profile shifted by the given offset (texels)
+        o = (-offset % self.period)*self.sub_steps
+        step = int(round(o)) % (self.period*self.sub_steps)
+
+        return step % self.sub_steps, step // self.sub_steps
+
+_checkerboards = TextureCache()
+
+def checkerboard(texture_size, brightness, row_type=bytearray):
+    # get the cached RGBA texels for a 2x2 checkerboard, creating them if necessary
+    key = (texture_size, brightness, row_type)
+
+    texels = _checkerboards.get(key)
+
+    if texels is None:
+        w = int(brightness*255.0)
+
+        # which half of the texture each row/column is in
+        halves = [ int(i // (texture_size/2)) % 2 for i in range(texture_size) ]
+
+        # luminances of the rows in either half, which are the inverse of each other
+        rows = [ bytearray([ w if (half == 0) ^ (y_half == 1) else 0 for y_half in halves ]) for half in (0, 1) ]
+
+        luminances = bytearray().join([ rows[half] for half in halves ])
+
+        texels = bytearray(b'\xff')*(4*texture_size*texture_size)
+        texels[0::4] = luminances
+        texels[1::4] = luminances
+        texels[2::4] = luminances
+
+        texels = row_type(texels)
+        _checkerboards.put(key, texels)
+
+    return texels
+
+# size (texels) of noise textures, & the number of noise lattice cells across them
+NOISE_TEXTURE_SIZE = 256
+NOISE_CELLS = 8
+
+# folder that noise fields are cached in, as they are slow to compute without NumPy
+NOISE_CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "noise cache")
+
+_noise_fields   = TextureCache()
+_noise_textures = TextureCache()
+
+def noise_field(seed, octaves, cells=NOISE_CELLS, size=NOISE_TEXTURE_SIZE, cache_folder=NOISE_CACHE_FOLDER):
+    # get the levels (0 - 255) of a size x size Perlin noise field with the given # of lattice cells across it,
+    # which tiles seamlessly. Fields are cached in memory & on disk, so each one is only computed once.
+    key = (seed, octaves, cells, size)
+
+    field = _noise_fields.get(key)
+
+    if field is None:
+        path = os.path.join(cache_folder, "noise {} {} {} {}.dat".format(seed, octaves, cells, size)) if cache_folder is not None else None
+
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as input_file:
+                field = bytearray(input_file.read())
+
+            if len(field) != size*size:
+                print("noise_field: {} has the wrong size; recomputing it.".format(path))
+                field = None
+
+        if field is None:
+            field = compute_noise_field(seed, octaves, cells, size)
+
+            if path is not None:
+                save_noise_field(field, path)
+
+        _noise_fields.put(key, field)
+
+    return field
+
+def compute_noise_field(seed, octaves, cells, size):
+    # sample a slice of 3D noise (different for each seed) at the centers of the texels, scaled to fill 0 - 255.
+    # The slice tiles since the noise repeats every `cells` cells in x & y.
+    coordinates = [ (i + 0.5)*cells/size for i in range(size) ]
+    z = seed + 0.5
+
+    if np is not None:
+        x, y = np.meshgrid(coordinates, coordinates)
+
+        noise = pnoise3_array(x, y, z, octaves, repeatx=cells, repeaty=cells).ravel().tolist()
+    else:
+        noise = [ pnoise3(x, y, z, octaves, repeatx=cells, repeaty=cells) for y in coordinates for x in coordinates ]
+
+    peak = max([ abs(value) for value in noise ]) or 1.0
+
+    return bytearray([ int(round((value/peak + 1.0)*127.5)) for value in noise ])
+
+def save_noise_field(field, path):
+    # save a noise field to the cache, writing it to a temporary file first so that it is never left half-written
+    try:
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with open(path + ".tmp", "wb") as output_file:
+            output_file.write(bytes(field))
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        os.rename(path + ".tmp", path)
+    except (IOError, OSError) as error:
+        print("noise_field: Could not cache {}: {}.".format(path, error))
+
+def noise_texture(seed, octaves, contrast, brightness, cells=NOISE_CELLS, size=NOISE_TEXTURE_SIZE, row_type=bytearray):
+    # get the cached RGB texels of a noise field with the given contrast & brightness, creating them if necessary
+    key = (seed, octaves, contrast, brightness, cells, size, row_type)
+
+    texels = _noise_textures.get(key)
+
+    if texels is None:
+        # map the levels of the field to luminances with a lookup table
+        table = bytearray([ int(round((contrast*(level/127.5 - 1.0) + 1.0)*brightness*255.0/2.0)) for level in range(256) ])
+
+        luminances = noise_field(seed, octaves, cells, size).translate(bytes(table))
+
+        texels = bytearray(3*size*size)
+        texels[0::3] = luminances
+        texels[1::3] = luminances
+        texels[2::3] = luminances
+
+        texels = row_type(texels)
+        _noise_textures.put(key, texels)
+
+    return texels
+
+# --- BENCHMARKS --- #
+
+def _legacy_grating(frequency, contrast, brightness, width, span, phase):
+    # per-pixel grating generation, as previously done by GratingStim every frame
+    grating = [0]*(3*width)
+    for x in range(width):
+        x_2 = (x/width)*span
+        w = int(round((contrast*math.sin(frequency*x_2*2*math.pi - phase*frequency*2*math.pi) + 1.0)*brightness*255.0/2.0))
+        grating[3*x]   = w
+        grating[3*x+1] = w
+        grating[3*x+2] = w
+    return grating
+
+def benchmark_grating(n_frames=600, widths=(160, 320, 640, 1280)):
+    import time
+
+    frequency = 0.0018 # cycles/px
+    velocity  = 0.05   # px/ms
+
+    print("width  per-pixel (ms/frame)  cached (ms/frame)")
+
+    for width in widths:
+        span = 4*width
+
+        start = time.time()
+        for i in range(n_frames):
+            _legacy_grating(frequency, 1.0, 1.0, width, span, i*velocity*1000/60.0)
+        legacy_time = (time.time() - start)*1000.0/n_frames
+
+        profile = grating_profile(frequency, 1.0, 1.0, width, span)
+
+        start = time.time()
+        for i in range(n_frames):
+            row, first_texel = profile.index(i*velocity*1000/60.0)
+            profile.rows[row][3*first_texel:3*(first_texel + width)]
+        cached_time = (time.time() - start)*1000.0/n_frames
+
+        # the slices match the per-pixel gratings, to within the phase quantization (1/sub_steps texel)
+        tolerance = 1 + 255.0*math.pi/(profile.period*profile.sub_steps)
+
+        for phase in [0.0, 123.4, -5000.0]:
+            row, first_texel = profile.index(phase)
+            texels = profile.rows[row][3*first_texel:3*(first_texel + width)]
+
+            assert max([ abs(a - b) for a, b in zip(texels, _legacy_grating(frequency, 1.0, 1.0, width, span, phase)) ]) <= tolerance, (width, phase)
+
+        print("{:5d}  {:20.4f}  {:17.4f}".format(width, legacy_time, cached_time))
+
+def _legacy_broadband(frequency, contrast, brightness, display_width, px_width, offset):
+    # per-frame profile generation, as previously done by BroadbandGratingStim every frame
+    profile = [ math.sin((0.2*frequency*math.sin(frequency*((x - offset) % display_width*2)) + frequency)*((x - offset) % display_width*2)*2*math.pi) for x in range(4*display_width*2) ]
+    grating = [0]*(2*display_width*2*4)
+    for x in range(2*px_width):
+        w = int(contrast*(profile[x] + 1.0)*brightness*255.0/2.0)
+        grating[4*x]   = w
+        grating[4*x+1] = w
+        grating[4*x+2] = w
+        grating[4*x+3] = 255
+    return grating
+
+def benchmark_broadband(n_frames=60, display_width=1280, px_width=640):
+    import time
+
+    frequency = 0.0036 # cycles/px
+    velocity  = 0.1    # px/ms
+
+    start = time.time()
+    for i in range(n_frames):
+        _legacy_broadband(frequency, 1.0, 1.0, display_width, px_width, i*velocity*1000/60.0)
+    legacy_time = (time.time() - start)*1000.0/n_frames
+
+    start = time.time()
+    profile = broadband_profile(frequency, 1.0, 1.0, display_width, 2*display_width)
+    build_time = (time.time() - start)*1000.0
+
+    start = time.time()
+    for i in range(n_frames):
+        row, first_texel = profile.index(i*velocity*1000/60.0)
+        profile.rows[row]
+    lookup_time = (time.time() - start)*1000.0/n_frames
+
+    print("broadband: per-frame generation {:.3f} ms/frame, lookup table {:.4f} ms/frame (built once in {:.1f} ms)".format(legacy_time, lookup_time, build_time))
+
+def _legacy_checkerboard(texture_size, brightness):
+    # nested-loop checkerboard generation, as previously done by LoomingDot for every new stim
+    grating = [0]*(texture_size*texture_size*4)
+    for x in range(texture_size):
+        for y in range(texture_size):
+            if ((x // (texture_size/2)) % 2 == 0) ^ ((y // (texture_size/2)) % 2 == 1):
+                w = brightness*255.0
+            else:
+                w = 0
+            grating[texture_size*4*x + 4*y] = int(w)
+            grating[texture_size*4*x + 4*y+1] = int(w)
+            grating[texture_size*4*x + 4*y+2] = int(w)
+            grating[texture_size*4*x + 4*y+3] = 255
+    return grating
+
+def benchmark_checkerboard(n_trials=50, texture_size=100, brightness=1.0):
+    import time
+
+    # time spent generating the texture when switching to each checkered looming dot stim
+    start = time.time()
+    for i in range(n_trials):
+        legacy = _legacy_checkerboard(texture_size, brightness)
+    legacy_time = (time.time() - start)*1000.0/n_trials
+
+    _checkerboards.clear()
+
+    start = time.time()
+    for i in range(n_trials):
+        cached = checkerboard(texture_size, brightness)
+    cached_time = (time.time() - start)*1000.0/n_trials
+
+    assert list(cached) == legacy
+
+    print("checkerboard: stim switch to first frame {:.3f} ms/stim per-texel, {:.4f} ms/stim cached ({} trials)".format(legacy_time, cached_time, n_trials))
+
+def benchmark_noise(seed=0, octaves=3):
+    import time
+    import shutil
+    import tempfile
+
+    cache_folder = tempfile.mkdtemp()
+
+    try:
+        # time computing the noise field, then loading it from the disk & memory caches
+        _noise_fields.clear()
+
+        start = time.time()
+        computed = noise_field(seed, octaves, cache_folder=cache_folder)
+        compute_time = (time.time() - start)*1000.0
+
+        _noise_fields.clear()
+
+        start = time.time()
+        loaded = noise_field(seed, octaves, cache_folder=cache_folder)
+        load_time = (time.time() - start)*1000.0
+
+        start = time.time()
+        noise_field(seed, octaves, cache_folder=cache_folder)
+        memory_time = (time.time() - start)*1000.0
+
+        assert loaded == computed
+        assert noise_field(seed + 1, octaves, cache_folder=None) != computed
+
+        # the field tiles: opposite edges are as close as neighbouring texels
+        size = NOISE_TEXTURE_SIZE
+        edge_step     = max([ abs(computed[y*size] - computed[y*size + size - 1]) for y in range(size) ])
+        interior_step = max([ abs(computed[y*size + x] - computed[y*size + x + 1]) for y in range(size) for x in range(size - 1) ])
+        assert edge_step <= interior_step
+
+        start = time.time()
+        texels = noise_texture(seed, octaves, 0.5, 1.0)
+        texture_time = (time.time() - start)*1000.0
+
+        assert len(texels) == 3*size*size
+    finally:
+        shutil.rmtree(cache_folder)
+
+    print("noise: field computed in {:.1f} ms, loaded from disk in {:.2f} ms, from memory in {:.4f} ms; texture in {:.2f} ms".format(compute_time, load_time, memory_time, texture_time))
+
+if __name__ == "__main__":
+    benchmark_grating()
+    benchmark_broadband()
+    benchmark_checkerboard()
+    benchmark_noise()
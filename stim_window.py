@@ -1,1404 +1,1122 @@
-from __future__ import division
-
-import clr
-clr.AddReferenceToFile("OpenTK.dll")
-clr.AddReference("System.Drawing")
-
-import math
-import random
-import time
-import array
-
-from System import Array, Byte, Int32, IO
-from System.Drawing import Bitmap, Rectangle, Color
-
-from OpenTK import *
-from OpenTK.Graphics import *
-from OpenTK.Graphics.OpenGL import *
-from OpenTK.Input import *
-
-import threading
-
-from perlin_noise import pnoise1
-
-def warp(x, r1, r3):
-    # print("ho", x)
-    # print("hi", (1.0/r3)*math.copysign(1, x)*(-math.sqrt(x**2*((r3**2)*(r1-r3)**2 - (r1**2-r3**2)*(x**2))) + abs(x)*r1*(r1-r3))/((r1-r3)**2+x**2))
-    return 1/r3*math.copysign(1, x)*(-math.sqrt(x**2 * ((r3**2)*(r1-r3)**2 - (r1**2-r3**2)*x**2)) + abs(x)*r1*(r1-r3))/((r1-r3)**2+x**2)
-
-class StimWindow(GameWindow):
-    def __new__(self, controller, window_name="Stimulus", display_index=1):
-        self.controller = controller
-
-        print("Display index: {}.".format(display_index))
-
-        if display_index == 1:
-            # try to use a second display (projector)
-            display = DisplayDevice.GetDisplay(DisplayIndex.Second)
-        else:
-            display = None
-
-        if display == None:
-            # fall back to the primary display (monitor)
-            self.display_width = 1280
-            self.display_height = 800
-            window_flag = GameWindowFlags.Default
-
-            display = DisplayDevice.GetDisplay(DisplayIndex.Default)
-        else:
-            self.display_width = 1280
-            self.display_height = 800
-            window_flag = GameWindowFlags.Fullscreen
-
-            # set resolution, bits/pixel, refresh rate
-            display.ChangeResolution(self.display_width, self.display_height, 8, 60)
-
-        return GameWindow.__new__(self, self.display_width,
-                                        self.display_height,
-                                        GraphicsMode(8, 24, 0, 0), #  bits/pixel, depth bits, stencil bits, FSAA samples
-                                        window_name,
-                                        window_flag,
-                                        display)
-
-    def OnLoad(self, e):
-        GameWindow.OnLoad(self, e)
-
-        self.stim = None
-
-        # set target frequency
-        self.TargetUpdateFrequency = 60
-        self.TargetRenderFrequency = 60
-
-        # update display width and height
-        self.display_width  = self.ClientRectangle.Width
-        self.display_height = self.ClientRectangle.Height
-
-        # set window's background color
-        GL.ClearColor(0, 0, 0, 1)
-
-        self.create_frame_buffer()
-
-        # initialize time variable
-        self.t = 0
-
-        # initialize started bool
-        self.started = False
-
-        self.reset_stim = False
-
-        # update stim params
-        self.update_params()
-
-        self.switch_to_stim(0)
-
-    def create_frame_buffer(self):
-        print("Creating frame buffer.")
-
-        GL.Clear(ClearBufferMask.ColorBufferBit | ClearBufferMask.DepthBufferBit)
-
-        texture = Array.CreateInstance(Byte, Array[int]([self.display_width, self.display_height, 3]))
-
-        self.texture = GL.GenTexture()
-        GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-        GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, self.display_width, self.display_height, 0, PixelFormat.Rgb, PixelType.UnsignedByte, texture)
-
-        GL.TexEnv( TextureEnvTarget.TextureEnv, TextureEnvParameter.TextureEnvMode,  int(TextureEnvMode.Replace) )
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapS, int(TextureWrapMode.Repeat))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapT, int(TextureWrapMode.Repeat))
-
-        self.frame_buffer = GL.GenFramebuffer()
-        GL.BindFramebuffer(FramebufferTarget.Framebuffer, self.frame_buffer)
-        GL.FramebufferTexture2D(FramebufferTarget.Framebuffer, FramebufferAttachment.ColorAttachment0, TextureTarget.Texture2D, self.texture, 0)
-
-        GL.BindTexture(TextureTarget.Texture2D, 0)
-
-    def update_params(self):
-        print("StimWindow: Updating params.")
-
-        # stop running stim & initialize time variable
-        self.controller.running_stim = False
-        self.t = 0
-
-        self.distance = self.controller.experiment_params['dish_radius']
-        self.resolution = self.display_width/self.controller.experiment_params['screen_cm_width']
-        self.px_width = int(self.controller.experiment_params['width']*self.ClientRectangle.Width)
-        self.px_height = int(self.controller.experiment_params['height']*self.ClientRectangle.Height)
-        self.x_offset = int((self.controller.experiment_params['x_offset'])*(self.ClientRectangle.Width - self.px_width))
-        self.y_offset = int((1.0 - self.controller.experiment_params['y_offset'])*(self.ClientRectangle.Height - self.px_height))
-        self.durations_list = self.controller.config_params['durations_list']
-        self.t_total = sum(self.durations_list)
-        self.n_stim = len(self.durations_list)
-        self.warp_perspective = self.controller.experiment_params['warp_perspective']
-        self.dish_radius = self.controller.experiment_params['dish_radius']
-
-        # warping parameters
-        self.n_cylinder_segments = 100
-        dish_radius = self.dish_radius*self.resolution
-        print("dish radius", dish_radius)
-        self.thetas = [ (i/float(self.n_cylinder_segments))*math.pi - (math.pi/2.0) for i in range(1, self.n_cylinder_segments) ]
-        self.vertex_xs = [ (dish_radius*math.sin(theta)) for theta in self.thetas ]
-
-        # reset stim
-        if self.stim is not None:
-            self.reset_stim = True
-
-    def change_param(self, param_dimension, change_in_param):
-        if self.stim_type == "Grating":
-            self.stim.change_velocity(change_in_param)
-        ##!! change param for self.stim_type to OKR or use grating
-        elif self.stim_type == "Moving Dot":
-            if param_dimension == "x":
-                self.stim.change_v_x(change_in_param)
-            elif param_dimension == "y":
-                self.stim.change_v_y(change_in_param)
-
-    def switch_to_stim(self, index):
-        self.stim_index = index
-
-        self.get_stim_params(self.stim_index)
-
-        print(self.params)
-
-        print("StimWindow: Switching to {} stim.".format(self.stim_type))
-
-        self.create_stim()
-
-    def get_stim_params(self, index):
-        self.stim_type = self.controller.config_params['types_list'][index]
-        self.stim_name = self.controller.config_params['stim_list'][index]
-        self.duration = self.controller.config_params['durations_list'][index]
-        self.params = self.controller.config_params['parameters_list'][index]
-
-    def current_stim_state(self):
-        keys_list = ["stim #", "stim name", "stim type"]
-
-        stim_dict = {"stim #": self.stim_index,
-                     "stim name": self.stim_name,
-                     "stim type": self.stim_type}
-
-        stim_dict_2, keys_list_2 = self.stim.current_state()
-
-        if stim_dict_2 is not None:
-            stim_dict.update(stim_dict_2)
-
-        if keys_list_2 is not None:
-            keys_list += keys_list_2
-
-        return stim_dict, keys_list
-
-    def create_stim(self):
-        # run stim's end func
-        if self.stim != None:
-            self.stim.end_func()
-            
-        if self.n_stim > 0:
-            if self.stim_type == "Looming Dot":
-                self.stim = LoomingDotStim(self)
-            elif self.stim_type == "Moving Dot":
-                self.stim = MovingDotStim(self)
-            elif self.stim_type == "Grating":
-                self.stim = GratingStim(self)
-            elif self.stim_type == "Delay":
-                self.stim = DelayStim(self)
-            elif self.stim_type == "Black Flash":
-                self.stim = BlackFlashStim(self)
-            elif self.stim_type == "White Flash":
-                self.stim = WhiteFlashStim(self)
-            elif self.stim_type == "Combined Dots":
-                self.stim = CombinedDotStim(self)
-            elif self.stim_type == "Optomotor Grating":    ##!! add a stim type for OKR
-                self.stim = OptomotorGratingStim(self)
-            elif self.stim_type == "BroadbandGrating":
-                self.stim = BroadbandGratingStim(self)
-        else:
-            self.stim = None
-
-    def OnUpdateFrame(self, e):
-        GameWindow.OnUpdateFrame(self, e)
-
-        if self.stim != None:
-            if self.reset_stim:
-                # reset stim
-                self.switch_to_stim(0)
-
-                self.reset_stim = False
-
-            if self.controller:
-                if self.controller.running_stim:
-                    # stim sequence is running
-                    if self.controller.begin_stim == True:
-                        # beginning of stim sequence
-                        print("StimWindow: Begin signal received.")
-
-                        # reset begin stim bool
-                        self.controller.begin_stim = False
-
-                        # reset started bool
-                        self.started = False
-
-                        # reset stim
-                        self.switch_to_stim(0)
-
-                    if self.started == False:
-                        # beginning of a new stim
-                        print("StimWindow: Starting stim.")
-
-                        # update started bool
-                        self.started = True
-
-                        # reset time variable
-                        self.t = 0
-
-                        # run stim's start function
-                        if self.stim != None:
-                            self.stim.start_func()
-                    else:
-                        # stim has started
-                        if self.t < self.stim.duration:
-                            # get time since last frame
-                            elapsed_time = e.Time*1000.0
-
-                            # update time variable
-                            self.t += elapsed_time
-
-                            # run stim's update function
-                            if self.stim != None:
-                                self.stim.update_func(elapsed_time)
-                        else:
-                            # stim's duration has finished
-
-                            if self.stim_index != self.n_stim - 1:
-                                # we haven't reached the end of the sequence; switch to the next stim
-                                self.switch_to_stim(self.stim_index + 1)
-
-                                # reset started bool to trigger the start of the next stim
-                                self.started = False
-                            else:
-                                # we've reached the end; stop the stim sequence
-                                self.controller.param_window.start_stop_stim(None, None)
-                else:
-                    # # stim sequence is not running; reset stim if necessary
-                    # if self.stim_index != 0:
-                    #     self.switch_to_stim(0)
-                    pass
-
-    def OnRenderFrame(self, e):
-        if self.stim != None:
-            if self.stim_type != "Delay":
-                if self.t < self.stim.duration:
-                    # stim has started
-                    self.MakeCurrent()
-
-                    # clear buffers
-                    GL.Clear(ClearBufferMask.ColorBufferBit | ClearBufferMask.DepthBufferBit)
-
-                    if self.frame_buffer is not None:
-                        GL.BindFramebuffer(FramebufferTarget.Framebuffer, self.frame_buffer)
-
-                    GL.Viewport(0, 0, self.display_width, self.display_height)
-
-                    # run stim's render function
-                    if self.stim != None:
-                        self.stim.render_func()
-
-                    GL.BindFramebuffer(FramebufferTarget.Framebuffer, 0)
-
-                    # set the viewport
-                    GL.Viewport(self.x_offset, self.y_offset, self.px_width, self.px_height)
-
-                    GL.LoadIdentity()
-
-                    GL.MatrixMode(MatrixMode.Projection)
-                    GL.Ortho(0.0, self.px_width, 0.0, self.px_height, -1.0, 1.0)
-
-                    GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-                    # enable texture mode
-                    GL.Enable(EnableCap.Texture2D)
-
-                    GL.Translate(self.px_width/2, self.px_height/2, 0)
-
-                    if self.warp_perspective:
-                        GL.Begin(BeginMode.QuadStrip)
-
-                        dish_radius = self.dish_radius*self.resolution
-                        dish_arc = dish_radius*math.pi/4
-
-                        x = (self.px_width/2 - dish_arc)/self.px_width
-
-                        GL.TexCoord2(x, 0.25)
-                        GL.Vertex2(-dish_radius, -self.px_height/2)
-                        GL.TexCoord2(x, 0.75)
-                        GL.Vertex2(-dish_radius, self.px_height/2)
-
-                        for i in range(1, self.n_cylinder_segments):
-                            tc = i/float(self.n_cylinder_segments)
-
-                            theta = self.thetas[i-1]
-                            vertex_x = self.vertex_xs[i-1]
-
-                            x = (self.px_width/2 - dish_arc + tc*2*dish_arc)/self.px_width
-
-                            GL.TexCoord2(x, 0.25)
-                            GL.Vertex2(vertex_x, -self.px_height/2)
-                            GL.TexCoord2(x, 0.75)
-                            GL.Vertex2(vertex_x, self.px_height/2)
-
-                        x = 1.0 - (self.px_width/2 - dish_arc)/self.px_width
-
-                        GL.TexCoord2(x, 0.25)
-                        GL.Vertex2(dish_radius, -self.px_height/2)
-                        GL.TexCoord2(x, 0.75)
-                        GL.Vertex2(dish_radius, self.px_height/2)
-
-                        GL.End()
-                    else:
-                        GL.Begin(BeginMode.Quads)
-                        GL.TexCoord2(0.75, 0.75)
-                        GL.Vertex2(self.px_width/2, self.px_height/2)
-                        GL.TexCoord2(0.25, 0.75)
-                        GL.Vertex2(-self.px_width/2, self.px_height/2)
-                        GL.TexCoord2(0.25, 0.25)
-                        GL.Vertex2(-self.px_width/2, -self.px_height/2)
-                        GL.TexCoord2(0.75, 0.25)
-                        GL.Vertex2(self.px_width/2, -self.px_height/2)
-                        GL.End()
-
-                    # disable texture mode
-                    GL.Disable(EnableCap.Texture2D)
-
-                    # swap buffers
-                    self.SwapBuffers()
-
-class LoomingDot():
-    def __init__(self, stim):
-        self.stim = stim
-
-    def update_params(self, distance, resolution, params, window_width, window_height):
-        self.redraw = False
-
-        self.resolution = resolution # px/cm
-        self.distance   = distance # cm
-        self.window_width = window_width
-        self.window_height = window_height
-        self.max_radius = self.window_width*4 
-
-        self.x        = math.tan(math.radians(params['looming_dot_init_x_pos']))*self.distance*self.resolution/(self.window_width/2)
-        self.y        = math.tan(math.radians(params['looming_dot_init_y_pos']))*self.distance*self.resolution/(self.window_height/2)
-        self.l_v      = params['l_v']
-        self.brightness = params['looming_dot_brightness']
-        self.contrast = 1
-
-        self.A = self.distance*self.resolution*-self.l_v 
-
-        self.radius_init = 1 # initial radius
-        self.radius = self.radius_init
-
-        self.angle = 0
-        self.phase = 0
-        self.frequency = 0.01
-
-        self.texture = None
-
-        self.checkered = params['checkered']
-        self.texture_size = 100
-
-        self.num_squares = params['num_squares']
-        self.expand_checkered_pattern = params['expand_checkered_pattern']
-
-        self.redraw = True
-
-    def create_grating(self):
-        # generate the grating texture
-        for x in range(self.texture_size):
-            for y in range(self.texture_size):
-                if ((x // (self.texture_size/2)) % 2 == 0) ^ ((y // (self.texture_size/2)) % 2 == 1):
-                    w = self.brightness*255.0
-                else:
-                    w = 0
-                self.grating[self.texture_size*4*x + 4*y] = Byte(w)
-                self.grating[self.texture_size*4*x + 4*y+1] = Byte(w)
-                self.grating[self.texture_size*4*x + 4*y+2] = Byte(w)
-                self.grating[self.texture_size*4*x + 4*y+3] = Byte(255)
-
-    def create_texture(self):
-        if self.texture is None:
-            # create the texture
-            self.texture = GL.GenTexture()
-
-        # generate the texture
-        self.grating = Array.CreateInstance(Byte, self.texture_size * self.texture_size * 4)
-        self.create_grating()
-
-        GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-        # GL.TexEnv( TextureEnvTarget.TextureEnv, TextureEnvParameter.TextureEnvMode,  int(TextureEnvMode.Modulate) )
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapS, int(TextureWrapMode.Repeat))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapT, int(TextureWrapMode.Repeat))
-
-        GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, self.texture_size, self.texture_size, 0, PixelFormat.Rgba, PixelType.UnsignedByte, self.grating)
-
-        GL.BindTexture(TextureTarget.Texture2D, 0)
-    def update_func(self, time):
-        if time < 0:
-            # update radius
-            self.radius = self.A/time
-        else:
-            self.radius = self.max_radius
-
-    def draw_circle(self, n_vertices, radius):
-        radius = min(2*(self.window_width/2.0), max(-2*(self.window_width/2.0), radius))
-        radius_x = radius/(self.window_width/2.0)
-        radius_y = radius/(self.window_height/2.0)
-
-        if not self.checkered:
-            GL.Begin(BeginMode.Polygon)
-            for angle in linspace(0, 2*math.pi, n_vertices):
-                GL.Vertex2(radius_x*math.sin(angle), radius_y*math.cos(angle))
-            GL.End()
-        else:
-            GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-            GL.Enable(EnableCap.Texture2D)
-
-            GL.Begin(BeginMode.Polygon)
-            for angle in linspace(0, 2*math.pi, n_vertices):
-                if self.expand_checkered_pattern:
-                    GL.TexCoord2((self.num_squares/2)*(0.5+0.5*math.sin(angle)), (self.num_squares/2)*(0.5+0.5*math.cos(angle)))
-                else:
-                    GL.TexCoord2((self.num_squares/2)*(radius_y/radius_x)*(0.5+0.5*radius_x*math.sin(angle)), (self.num_squares/2)*(0.5+0.5*radius_y*math.cos(angle)))
-                GL.Vertex2(radius_x*math.sin(angle), radius_y*math.cos(angle))
-            GL.End()
-
-            GL.Disable(EnableCap.Texture2D)
-
-            GL.BindTexture(TextureTarget.Texture2D, 0)
-
-    def end_func(self):
-        if self.checkered:
-            GL.DeleteTextures(1, self.texture)
-        pass
-
-    def render_func(self):
-        if self.redraw:
-            # redraw the texture
-            self.create_texture()
-
-            # reset redraw bool
-            self.redraw = False
-
-        GL.PushMatrix()
-
-        # set dot position
-        GL.Translate(self.x, self.y, 0)
-
-        # set dot color
-        GL.Color3(self.brightness, self.brightness, self.brightness)
-
-        # draw the dot
-        self.draw_circle(30, self.radius)
-
-        GL.PopMatrix()
-
-class LoomingDotStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-        self.looming_dot = LoomingDot(self)
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-    def update_params(self, distance, resolution, duration, params):
-        print("LoomingDotStim: Updating parameters.")
-
-        self.duration   = duration*1000.0 # ms
-
-        self.looming_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
-
-        # if a duration of 0 is given, calculate required duration for approaching dot to reach the screen
-        if self.duration == 0:
-            self.duration = -self.looming_dot.A/self.looming_dot.radius # ms
-
-        print(self.duration)
-
-        self.t_init = -self.duration
-        self.t = self.t_init
-
-        self.background_brightness = params['background_brightness']
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):    ## Keeps track of time for LoomingDot
-        # update t
-        self.t += elapsed_time
-
-        self.looming_dot.update_func(self.t)
-
-    def end_func(self):
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type,
-                "radius": self.looming_dot.radius}, ["radius"]
-
-    def render_func(self):
-        GL.LoadIdentity()
-
-        # draw in the viewport background
-        GL.Begin(BeginMode.Quads)
-        GL.Color3(self.background_brightness, self.background_brightness, self.background_brightness) 
-        GL.Vertex2(-1, -1)
-        GL.Vertex2(-1, 1)
-        GL.Vertex2(1, 1)
-        GL.Vertex2(1, -1)
-        GL.End()
-
-        self.looming_dot.render_func()
-
-class MovingDot():     
-    def __init__(self,stim):
-        self.stim = stim
-
-    def update_params(self, distance, resolution, params, window_width, window_height): 
-        self.resolution = resolution # px/cm   ## What does this and self.distance do?
-        self.distance = distance # cm
-        self.window_width = window_width
-        self.window_height = window_height
-
-        self.radius   = params['radius'] # px
-        self.x_init   = math.tan(math.radians(params['moving_dot_init_x_pos']))*self.distance*self.resolution/(self.window_width/2) # rel units
-        self.y_init   = math.tan(math.radians(params['moving_dot_init_y_pos']))*self.distance*self.resolution/(self.window_height/2) # rel units
-        self.x = self.x_init
-        self.y = self.y_init
-
-        self.v_x = math.tan(math.radians(params['v_x']))*self.distance*self.resolution/((self.window_width/2)*1000.0)
-        self.v_y = math.tan(math.radians(params['v_y']))*self.distance*self.resolution/((self.window_height/2)*1000.0)
-
-        print(self.v_x, self.v_y)
-
-        self.brightness = params['moving_dot_brightness']
-
-        self.radius_x = self.radius/(self.window_width/2.0)
-        self.radius_y = self.radius/(self.window_height/2.0)
-
-    def update_func(self, elapsed_time):
-        self.x += self.v_x*elapsed_time
-        self.y += self.v_y*elapsed_time
-        
-    def draw_circle(self, n_vertices):
-        GL.Begin(BeginMode.Polygon)
-
-        # set dot color
-        GL.Color3(self.brightness, self.brightness, self.brightness)
-
-        for angle in linspace(0, 2*math.pi, n_vertices):
-            GL.Vertex2(self.radius_x*math.sin(angle), self.radius_y*math.cos(angle))
-        GL.End()
-
-    def change_v_x(self, change_in_v_x):
-        self.v_x = change_in_v_x*self.max_v_init
-
-    def change_v_y(self, change_in_v_y):
-        self.v_y += change_in_v_y*self.max_v_init
-
-    def render_func(self):
-        # set dot position
-        GL.Translate(self.x, self.y, 0)
-
-        # draw the dot
-        self.draw_circle(30)
-
-class MovingDotStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        self.moving_dot = MovingDot(self)
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-    def update_params(self, distance, resolution, duration, params):
-        print("MovingDotStim: Updating parameters.")
-
-        self.duration = duration*1000.0 # ms
-
-        self.moving_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
-
-        ## if a duration of 0 is given, calculates duration for moving dot to move across screen
-        if self.duration == 0:
-            if self.moving_dot.v_x != 0:
-                if self.moving_dot.v_x > 0:
-                    self.duration = (1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
-                else:
-                    self.duration = (-1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
-            else:
-                if self.moving_dot.v_y > 0:
-                    self.duration = (1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
-                else:
-                    self.duration = (-1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
-        
-        self.t_init = -self.duration # ms
-        self.t = self.t_init
-
-        self.background_brightness = params['background_brightness']
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        # update t
-        self.t += elapsed_time
-
-        self.moving_dot.update_func(elapsed_time)
-
-    def end_func(self):
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type,
-                "x": self.moving_dot.x,
-                "y": self.moving_dot.y}, ["x", "y"]
-
-    def render_func(self):
-        GL.LoadIdentity()
-
-        # draw in the viewport background
-        GL.Begin(BeginMode.Quads)
-
-        GL.Color3(self.background_brightness, self.background_brightness, self.background_brightness)
-        
-        GL.Vertex2(-1, -1)
-        GL.Vertex2(-1, 1)
-        GL.Vertex2(1, 1)
-        GL.Vertex2(1, -1)
-
-        GL.End()
-
-        self.moving_dot.render_func()
-
-class CombinedDotStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        self.moving_dot = MovingDot(self)
-        self.looming_dot = LoomingDot(self)
-
-        # get parameters    ## I only need one get params because there is only one window
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-        
-    def update_params(self, distance, resolution, duration, params):
-        print("CombinedDotStim: Updating parameters.")
-
-        self.duration = duration*1000.0 # ms
-
-        ## if a duration of 0 is given, calculates duration for moving dot to move across screen
-        if self.duration == 0:
-            if self.moving_dot.v_x != 0:
-                if self.moving_dot.v_x > 0:
-                    self.duration = (1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
-                else:
-                    self.duration = (-1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
-            else:
-                if self.moving_dot.v_y > 0:
-                    self.duration = (1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
-                else:
-                    self.duration = (-1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
-
-        self.background_brightness = params['background_brightness']
-
-        print(self.duration)
-
-        self.moving_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
-        self.looming_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
-        
-        self.t_init = -self.duration # ms
-        self.t = self.t_init
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        # update t
-        self.t += elapsed_time
-
-        self.looming_dot.update_func(self.t)
-        self.moving_dot.update_func(elapsed_time)
-
-    def end_func(self):
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type,
-                "looming dot radius": self.looming_dot.radius,
-                "moving dot x": self.moving_dot.x,
-                "moving dot y": self.moving_dot.y}, ["looming dot radius", "moving dot x", "moving dot y"]
-
-    def render_func(self):
-        GL.LoadIdentity()
-
-        # draw in the viewport background
-        GL.Begin(BeginMode.Quads)
-        GL.Color3(self.background_brightness, self.background_brightness, self.background_brightness)
-        GL.Vertex2(-1, -1)
-        GL.Vertex2(-1, 1)
-        GL.Vertex2(1, 1)
-        GL.Vertex2(1, -1)
-        GL.End()
-
-        self.looming_dot.render_func()
-        self.moving_dot.render_func()
-
-class GratingStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-        self.texture = None
-
-        self.create_texture()
-
-    def update_params(self, distance, resolution, duration, params):
-        print("GratingStim: Updating parameters.")
-
-        self.redraw = False
-
-        self.resolution = resolution # px/cm
-        self.distance = distance # cm
-        self.duration = duration*1000.0 # ms
-
-        self.rad_width = math.atan2(self.stim_window.display_width/2.0, self.distance*self.resolution)*2
-        self.frequency = params['frequency']*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width) # rad/px
-        self.init_phase = params['init_phase']*(math.pi/180.0)*self.stim_window.display_width/self.rad_width
-        self.velocity_init = params['velocity']*(math.pi/180.0)*self.stim_window.display_width/self.rad_width/1000.0
-        self.velocity = self.velocity_init
-        self.contrast = params['contrast']
-        self.brightness = params['brightness']
-        self.angle = params['angle']
-        
-        self.velocity *= math.cos(self.angle*math.pi/180.0)
-        self.velocity_init *= math.cos(self.angle*math.pi/180.0)
-
-        self.t_init = -self.duration*1000.0 # ms
-        self.t = self.t_init
-
-        self.phase = self.init_phase
-
-        self.texture_width = int(self.stim_window.display_width/2)
-
-        # set redraw bool
-        self.redraw = True
-
-    def create_grating(self):
-        print("Creating grating.")
-        self.grating = Array.CreateInstance(Byte, Array[int]([self.texture_width, 3]))
-
-        # generate the grating texture
-        for x in range(self.texture_width):
-            x_2 = (x/self.texture_width)*(2*self.stim_window.display_width)
-            w = int(round((self.contrast*math.sin(self.frequency*x_2*2*math.pi - self.phase*self.frequency*2*math.pi) + 1.0)*self.brightness*255.0/2.0))
-            self.grating[x, 0] = Byte(w)
-            self.grating[x, 1] = Byte(w)
-            self.grating[x, 2] = Byte(w)
-
-    def create_texture(self):
-        # generate the texture
-        self.create_grating()
-
-        # create the texture
-        if self.texture is None:
-            print("Creating texture.")
-            self.texture = GL.GenTexture()
-
-            GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
-            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
-            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapS, int(TextureWrapMode.Repeat))
-            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapT, int(TextureWrapMode.Repeat))
-
-            GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, self.texture_width, 1, 0, PixelFormat.Rgb, PixelType.UnsignedByte, self.grating)
-        else:
-            print("Updating texture.")
-            GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-            GL.TexSubImage2D(TextureTarget.Texture2D, 0, 0, 0, self.texture_width, 1, PixelFormat.Rgb, PixelType.UnsignedByte, self.grating)
-
-        GL.BindTexture(TextureTarget.Texture2D, 0)
-
-    def change_velocity(self, change_in_velocity):
-        self.velocity = change_in_velocity*self.velocity_init
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        # update phase
-        self.phase += self.velocity*elapsed_time
-        self.t += elapsed_time
-
-        # set redraw bool
-        self.redraw = True
-
-    def end_func(self):
-        print("Ending.")
-
-        GL.DeleteTextures(1, self.texture)
-
-        print("Ended.")
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type,
-                "phase": self.phase}, ["phase"]
-
-    def render_func(self):
-        if self.redraw:
-            # redraw the texture
-            self.create_texture()
-
-            # reset redraw bool
-            self.redraw = False
-
-        GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-        GL.LoadIdentity()
-
-        GL.MatrixMode(MatrixMode.Projection)
-        GL.Ortho(0.0, self.stim_window.px_width, 0.0, self.stim_window.px_height, -1.0, 1.0)
-
-        GL.Enable(EnableCap.Texture2D)
-
-        GL.PushMatrix()
-        GL.Translate(self.stim_window.px_width/2, self.stim_window.px_height/2, 0)
-        GL.Rotate(self.angle, 0, 0, 1)
-        GL.Scale(self.stim_window.display_width/self.stim_window.px_width, self.stim_window.display_width/self.stim_window.px_height, 1)
-
-        # draw texture quad
-        GL.Begin(BeginMode.Quads)
-        GL.TexCoord2(1.0, 1.0)
-        GL.Vertex2(self.stim_window.px_width/2, self.stim_window.px_height/2)
-        GL.TexCoord2(0, 1.0)
-        GL.Vertex2(-self.stim_window.px_width/2, self.stim_window.px_height/2)
-        GL.TexCoord2(0, 0)
-        GL.Vertex2(-self.stim_window.px_width/2, -self.stim_window.px_height/2)
-        GL.TexCoord2(1.0, 0)
-        GL.Vertex2(self.stim_window.px_width/2, -self.stim_window.px_height/2)
-        GL.End()
-
-        GL.PopMatrix()
-
-        # disable texture mode
-        GL.Disable(EnableCap.Texture2D)
-
-        GL.BindTexture(TextureTarget.Texture2D, 0)
-
-##!!Need class OKR
-class OptomotorGratingStim():
-    #taken from GratingStim in swim_window.py
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-        self.texture = None
-
-        self.create_texture()
-
-    def update_params(self, distance, resolution, duration, params):
-        print("OptomotorStim: Updating parameters.")
-
-        self.redraw = False
-
-        self.resolution = resolution # px/cm
-        self.distance = distance # cm
-        self.duration = duration*1000.0 # ms
-
-        self.rad_width = math.atan2(self.stim_window.display_width/2.0, self.distance*self.resolution)*2
-        self.frequency = params['frequency']*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width) # rad/px
-        self.init_phase = params['init_phase']*(math.pi/180.0)*self.stim_window.display_width/self.rad_width
-        self.velocity_init = params['velocity']*(math.pi/180.0)*self.stim_window.display_width/self.rad_width/1000.0
-        self.velocity = self.velocity_init
-        self.contrast = params['contrast']
-        self.brightness = params['brightness']
-        self.angle = params['angle']
-        self.merging_pos = int(params['merging_pos']*2*self.stim_window.display_width)
-        self.merging_pos_deg = self.merging_pos*self.rad_width/self.stim_window.display_width
-
-        print(self.merging_pos)
-
-        print(self.stim_window.display_width)
-        print("merging", self.merging_pos)
-
-        self.t_init = -self.duration*1000.0 # ms
-        self.t = self.t_init
-
-        self.phase = self.init_phase
-
-        self.texture_width = int(self.stim_window.display_width/2)
-
-        # set redraw bool
-        self.redraw = True
-
-    def create_grating(self):
-        # generate the grating texture
-        for x in range(self.texture_width):
-            x_2 = (x/self.texture_width)*(2*self.stim_window.display_width)
-            if x_2 >= self.merging_pos:
-                w = (0.5*self.contrast*math.sin((2*self.merging_pos - x_2)*2*math.pi*self.frequency - self.phase*self.frequency*2*math.pi + self.merging_pos_deg*self.frequency*2*math.pi) + 0.5)*self.brightness*255
-            else:
-                w = (0.5*self.contrast*math.sin(x_2*2*math.pi*self.frequency - self.phase*self.frequency*2*math.pi + self.merging_pos_deg*self.frequency*2*math.pi) + 0.5)*self.brightness*255
-
-            self.grating[x, 0] = Byte(w)
-            self.grating[x, 1] = Byte(w)
-            self.grating[x, 2] = Byte(w)
-
-    def create_texture(self):
-        if self.texture is None:
-            # create the texture
-            self.texture = GL.GenTexture()
-
-        # generate the texture
-        self.grating = Array.CreateInstance(Byte, Array[int]([self.texture_width, 3]))
-        self.create_grating()
-
-        GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapS, int(TextureWrapMode.Repeat))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapT, int(TextureWrapMode.Repeat))
-
-        GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, self.texture_width, 1, 0, PixelFormat.Rgb, PixelType.UnsignedByte, self.grating)
-
-        GL.BindTexture(TextureTarget.Texture2D, 0)
-
-    def change_velocity(self, change_in_velocity):
-        self.velocity = change_in_velocity*self.velocity_init
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        # update phase
-        self.phase += self.velocity*elapsed_time
-        self.t += elapsed_time
-
-        # set redraw bool
-        self.redraw = True
-
-    def end_func(self):
-        GL.DeleteTextures(1, self.texture)
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type,
-                "phase": self.phase}, ["phase"]
-
-    def render_func(self):
-        if self.redraw:
-            # redraw the texture
-            self.create_texture()
-
-            # reset redraw bool
-            self.redraw = False
-
-        GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-        GL.LoadIdentity()
-
-        # set projection
-        GL.MatrixMode(MatrixMode.Projection)
-        GL.Ortho(0.0, self.stim_window.px_width, 0.0, self.stim_window.px_height, -1.0, 1.0)
-
-        # enable texture mode
-        GL.Enable(EnableCap.Texture2D)
-
-        GL.PushMatrix()
-        GL.Translate(self.stim_window.px_width/2, self.stim_window.px_height/2, 0)
-        GL.Rotate(self.angle, 0, 0, 1)
-        GL.Scale(self.stim_window.display_width/self.stim_window.px_width, self.stim_window.display_width/self.stim_window.px_height, 1)
-
-        # draw texture quad
-        GL.Begin(BeginMode.Quads)
-        GL.TexCoord2(1.0, 1.0)
-        GL.Vertex2(self.stim_window.px_width/2, self.stim_window.px_height/2)
-        GL.TexCoord2(0, 1.0)
-        GL.Vertex2(-self.stim_window.px_width/2, self.stim_window.px_height/2)
-        GL.TexCoord2(0, 0)
-        GL.Vertex2(-self.stim_window.px_width/2, -self.stim_window.px_height/2)
-        GL.TexCoord2(1.0, 0)
-        GL.Vertex2(self.stim_window.px_width/2, -self.stim_window.px_height/2)
-        GL.End()
-
-        GL.PopMatrix()
-
-        # disable texture mode
-        GL.Disable(EnableCap.Texture2D)
-
-        GL.BindTexture(TextureTarget.Texture2D, 0)
-
-class BroadbandGratingStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-        self.texture = None
-
-    def update_params(self, distance, resolution, duration, params):
-        print("GratingStim: Updating parameters.")
-
-        self.redraw = False
-
-        self.resolution = resolution # px/cm
-        self.distance = distance # cm
-        self.duration = duration*1000.0 # ms
-
-        self.rad_width = math.atan2(self.stim_window.display_width*2/2.0, self.distance*self.resolution)*2
-        self.frequency = params['frequency']*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width*2) # rad/px
-        self.init_phase = params['init_phase']*(math.pi/180.0)*self.stim_window.display_width*2/self.rad_width
-        self.velocity_init = params['velocity']*(math.pi/180.0)*self.stim_window.display_width*2/self.rad_width/1000.0
-        self.velocity = self.velocity_init
-        self.contrast = params['contrast']
-        self.brightness = params['brightness']
-        self.angle = params['angle']
-        self.dish_radius = self.stim_window.dish_radius
-        self.warp_perspective = self.stim_window.warp_perspective
-
-        self.t_init = -self.duration*1000.0 # ms
-        self.t = self.t_init
-
-        self.phase = self.init_phase
-
-        # set redraw bool
-        self.redraw = True
-
-    def rand_frequency(self, x):
-        return 0.2*self.frequency*math.sin(self.frequency*x) + self.frequency
-
-    def grating_profile(self, offset):
-        return [ math.sin(self.rand_frequency((x - offset) % self.stim_window.display_width*2)*((x - offset) % self.stim_window.display_width*2)*2*math.pi) for x in range(4*self.stim_window.display_width*2) ]
-
-    def create_grating(self):
-        # generate the grating texture
-        grating_profile = self.grating_profile(self.t*self.velocity)
-        for x in range(2*self.stim_window.px_width):
-            w = self.contrast*(grating_profile[x] + 1.0)*self.brightness*255.0/2.0
-            self.grating[4*x] = Byte(w)
-            self.grating[4*x+1] = Byte(w)
-            self.grating[4*x+2] = Byte(w)
-            self.grating[4*x+3] = Byte(255)
-
-    def create_texture(self):
-        if self.texture is not None:
-            GL.DeleteTextures(1, self.texture)
-
-        # generate the texture
-        self.grating = Array.CreateInstance(Byte, 2*self.stim_window.display_width*2 * 4)
-        self.create_grating()
-
-        # create the texture
-        self.texture = GL.GenTexture()
-        GL.BindTexture(TextureTarget.Texture2D, self.texture)
-
-        GL.TexEnv( TextureEnvTarget.TextureEnv, TextureEnvParameter.TextureEnvMode,  int(TextureEnvMode.Modulate) )
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
-        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
-
-        GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, self.stim_window.display_width*2, 1, 0, PixelFormat.Rgba, PixelType.UnsignedByte, self.grating)
-
-    def change_velocity(self, change_in_velocity):
-        self.velocity = change_in_velocity*self.velocity_init
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        # update phase
-        self.phase += -self.velocity*elapsed_time
-        self.t += elapsed_time
-
-        # set redraw bool
-        self.redraw = True
-
-    def end_func(self):
-        GL.DeleteTextures(1, self.texture)
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type,
-                "phase": self.phase}, ["phase"]
-
-    def render_func(self):
-        GL.LoadIdentity()
-
-        # set projection
-        GL.MatrixMode(MatrixMode.Projection)
-        GL.Ortho(0.0, self.stim_window.px_width, 0.0, self.stim_window.px_height, -1.0, 1.0)
-
-        if self.redraw:
-            # set color
-            GL.Color4(Color.White)
-
-            # redraw the texture
-            self.create_texture()
-
-            # reset redraw bool
-            self.redraw = False
-
-        # enable texture mode
-        GL.Enable(EnableCap.Texture2D)
-
-        GL.PushMatrix()
-        GL.Translate(self.stim_window.px_width/2, self.stim_window.px_height/2, 0)
-        GL.Rotate(self.angle, 0, 0, 1)
-        GL.Scale(2*self.stim_window.display_width/self.stim_window.px_width, 2*self.stim_window.display_height/self.stim_window.px_height, 1)
-
-        # draw texture quad
-        GL.Begin(BeginMode.Quads)
-        GL.TexCoord2(1.0, 1.0)
-        GL.Vertex2(self.stim_window.px_width/2, self.stim_window.px_height/2)
-        GL.TexCoord2(0, 1.0)
-        GL.Vertex2(-self.stim_window.px_width/2, self.stim_window.px_height/2)
-        GL.TexCoord2(0, 0)
-        GL.Vertex2(-self.stim_window.px_width/2, -self.stim_window.px_height/2)
-        GL.TexCoord2(1.0, 0)
-        GL.Vertex2(self.stim_window.px_width/2, -self.stim_window.px_height/2)
-        GL.End()
-
-        GL.PopMatrix()
-
-        # disable texture mode
-        GL.Disable(EnableCap.Texture2D)
-
-class DelayStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-    def update_params(self, distance, resolution, duration, params):
-        print("DelayStim: Updating parameters.")
-
-        self.duration = duration*1000.0 # ms
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        pass
-
-    def end_func(self):
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type}, None
-
-    def render_func(self):
-        pass
-
-class BlackFlashStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-    def update_params(self, distance, resolution, duration, params):
-        print("BlackFlashStim: Updating parameters.")
-
-        self.duration = duration*1000.0 # ms
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        pass
-
-    def end_func(self):
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type}, None
-
-    def render_func(self):
-        GL.LoadIdentity()
-
-        # draw in the viewport background
-        GL.Begin(BeginMode.Quads)
-        GL.Color4(Color.Black)
-        GL.Vertex2(-1, -1)
-        GL.Vertex2(-1, 1)
-        GL.Vertex2(1, 1)
-        GL.Vertex2(1, -1)
-        GL.End()
-
-class WhiteFlashStim():
-    def __init__(self, stim_window):
-        self.stim_window = stim_window
-
-        # get parameters
-        distance = self.stim_window.distance
-        resolution = self.stim_window.resolution
-        duration = self.stim_window.duration
-        params = self.stim_window.params
-
-        self.stim_index = self.stim_window.stim_index
-        self.stim_name  = self.stim_window.stim_name
-        self.stim_type  = self.stim_window.stim_type
-
-        self.brightness = params['brightness']
-
-        # update parameters
-        self.update_params(distance, resolution, duration, params)
-
-    def update_params(self, distance, resolution, duration, params):
-        print("WhiteFlashStim: Updating parameters.")
-
-        self.duration = duration*1000.0 # ms
-
-    def start_func(self):
-        pass
-
-    def update_func(self, elapsed_time):
-        pass
-
-    def end_func(self):
-        pass
-
-    def current_state(self):
-        return {"stim #": self.stim_index,
-                "stim name": self.stim_name,
-                "stim type": self.stim_type}, None
-
-    def render_func(self):
-        GL.LoadIdentity()
-
-        # draw in the viewport background
-        GL.Begin(BeginMode.Quads)
-        GL.Color3(self.brightness, self.brightness, self.brightness)
-        GL.Vertex2(-1, -1)
-        GL.Vertex2(-1, 1)
-        GL.Vertex2(1, 1)
-        GL.Vertex2(1, -1)
-        GL.End()
-
-
-# --- HELPER FUNCTIONS --- #
-
-# generate a linspace
-def linspace(start, stop, n):
-    if n == 1:
-        yield stop
-        return
-    h = (stop - start) / (n - 1)
-    for i in range(n):
-        yield start + h * i
+from __future__ import division
+
+import clr
+clr.AddReferenceToFile("OpenTK.dll")
+clr.AddReference("System.Drawing")
+clr.AddReference("System.Core")
+
+from System import Array, Byte, Int32, IntPtr, Single, IO
+from System.Drawing import Bitmap, Rectangle, Color
+from System.IO.MemoryMappedFiles import MemoryMappedFile, MemoryMappedFileAccess
+from System.Diagnostics import Stopwatch
+
+from OpenTK import *
+from OpenTK.Graphics import *
+from OpenTK.Graphics.OpenGL import *
+from OpenTK.Input import *
+
+import threading
+
+from stim_geometry import unit_circle, warp_mesh, UnitCircle
+from render_backend import RenderBackend, quad
+from stims import STIM_CLASSES
+from stim_params import as_stim_params
+from frame_file import frame_file_path, open_frame_file
+from frame_clock import FrameClock
+from frame_timing import FrameTimings, SwapMonitor
+
+class StimWindow(GameWindow):
+    def __new__(self, controller, window_name="Stimulus", display_index=1):
+        self.controller = controller
+
+        print("Display index: {}.".format(display_index))
+
+        if display_index == 1:
+            # try to use a second display (projector)
+            display = DisplayDevice.GetDisplay(DisplayIndex.Second)
+        else:
+            display = None
+
+        if display == None:
+            # fall back to the primary display (monitor)
+            self.display_width = 1280
+            self.display_height = 800
+            window_flag = GameWindowFlags.Default
+
+            display = DisplayDevice.GetDisplay(DisplayIndex.Default)
+        else:
+            self.display_width = 1280
+            self.display_height = 800
+            window_flag = GameWindowFlags.Fullscreen
+
+            # set resolution, bits/pixel, refresh rate
+            display.ChangeResolution(self.display_width, self.display_height, 8, 60)
+
+        return GameWindow.__new__(self, self.display_width,
+                                        self.display_height,
+                                        GraphicsMode(8, 24, 0, 0), #  bits/pixel, depth bits, stencil bits, FSAA samples
+                                        window_name,
+                                        window_flag,
+                                        display)
+
+    def OnLoad(self, e):
+        GameWindow.OnLoad(self, e)
+
+        self.stim = None
+
+        # set target frequency
+        self.TargetUpdateFrequency = 60
+        self.TargetRenderFrequency = 60
+
+        # update display width and height
+        self.display_width  = self.ClientRectangle.Width
+        self.display_height = self.ClientRectangle.Height
+
+        # set window's background color
+        GL.ClearColor(0, 0, 0, 1)
+
+        # create the backend that the stims draw through
+        self.backend = OpenTKBackend(self.display_width, self.display_height)
+
+        # initialize time variable
+        self.t = 0
+
+        # create the clock that stim time is derived from, which counts refreshes
+        self.stopwatch = Stopwatch.StartNew()
+        self.clock = FrameClock(self.TargetRenderFrequency)
+        self.stim_start_frame = 0
+
+        # durations of the update, render & swap of each frame while the stimulation is running
+        self.timings       = FrameTimings()
+        self.swap_duration = 0
+
+        # detects frames that weren't presented on time from the times of the swaps (reset by the controller)
+        self.swap_monitor = SwapMonitor(self.TargetRenderFrequency)
+
+        # compiled states of the stims on every frame, & the stim being shown with the frame it started on
+        self.stim_table = None
+        self.table_stim = (0, 0)
+
+        # whether the current stim's params have been changed live, so that it no longer matches the table
+        self.stim_diverged = False
+
+        # initialize started bool
+        self.started = False
+
+        self.reset_stim = False
+
+        # prerendered frames being played back, if any
+        self.frame_file    = None
+        self.reload_frames = False
+
+        # update stim params
+        self.update_params()
+
+        self.switch_to_stim(0)
+
+    def update_params(self):
+        print("StimWindow: Updating params.")
+
+        # stop running stim & initialize time variable
+        self.controller.running_stim = False
+        self.t = 0
+
+        self.distance = self.controller.experiment_params['dish_radius']
+        self.resolution = self.display_width/self.controller.experiment_params['screen_cm_width']
+        self.px_width = int(self.controller.experiment_params['width']*self.ClientRectangle.Width)
+        self.px_height = int(self.controller.experiment_params['height']*self.ClientRectangle.Height)
+        self.x_offset = int((self.controller.experiment_params['x_offset'])*(self.ClientRectangle.Width - self.px_width))
+        self.y_offset = int((1.0 - self.controller.experiment_params['y_offset'])*(self.ClientRectangle.Height - self.px_height))
+        self.durations_list = self.controller.config_params['durations_list']
+        self.t_total = sum(self.durations_list)
+        self.n_stim = len(self.durations_list)
+        self.warp_perspective = self.controller.experiment_params['warp_perspective']
+        self.dish_radius = self.controller.experiment_params['dish_radius']
+
+        # warping parameters
+        self.n_cylinder_segments = 100
+        dish_radius = self.dish_radius*self.resolution
+        print("dish radius", dish_radius)
+
+        # get the warp mesh, which is only rebuilt if its params have changed; the
+        # backend uploads it on the next frame, since this may not be called from
+        # the render thread
+        self.warp_mesh = warp_mesh(dish_radius, self.px_width, self.px_height, self.n_cylinder_segments)
+
+        # reset stim
+        if self.stim is not None:
+            self.reset_stim = True
+
+        # get the time at which the params were last changed here rather than on the render thread, & look for
+        # prerendered frames on the next update, since this may not be called from the render thread
+        self.params_time   = self.controller.params_modified_time()
+        self.reload_frames = True
+
+        # compile the config's table in the background, so that it's ready when the stimulation starts
+        self.controller.compile_stim_table(self)
+
+    def change_param(self, param_dimension, change_in_param):
+        # prerendered frames can't be changed
+        if self.frame_file is not None:
+            return
+
+        if self.stim_type == "Grating":
+            self.stim.change_velocity(change_in_param)
+        ##!! change param for self.stim_type to OKR or use grating
+        elif self.stim_type == "Moving Dot":
+            if param_dimension == "x":
+                self.stim.change_v_x(change_in_param)
+            elif param_dimension == "y":
+                self.stim.change_v_y(change_in_param)
+        else:
+            return
+
+        # the stim no longer matches the compiled table, so log its live state until the next stim
+        self.stim_diverged = True
+
+    def switch_to_stim(self, index):
+        self.stim_index = index
+
+        self.get_stim_params(self.stim_index)
+
+        print(self.params)
+
+        print("StimWindow: Switching to {} stim.".format(self.stim_type))
+
+        self.create_stim()
+
+    def get_stim_params(self, index):
+        self.stim_type = self.controller.config_params['types_list'][index]
+        self.stim_name = self.controller.config_params['stim_list'][index]
+        self.duration = self.controller.config_params['durations_list'][index]
+        self.params = as_stim_params(self.stim_type, self.controller.config_params['parameters_list'][index])
+
+    def current_stim_state(self):
+        if self.frame_file is not None:
+            # get the recorded state of the frame that was last displayed
+            return self.frame_file.state(self.displayed_frame)
+
+        if self.stim_table is not None and self.controller.running_stim and not self.stim_diverged:
+            # look up the state of the current frame in the compiled table
+            stim_index, start_frame = self.table_stim
+
+            return self.stim_table.state(stim_index, self.clock.frame - start_frame)
+
+        keys_list = ["stim #", "stim name", "stim type"]
+
+        stim_dict = {"stim #": self.stim_index,
+                     "stim name": self.stim_name,
+                     "stim type": self.stim_type}
+
+        stim_dict_2, keys_list_2 = self.stim.current_state()
+
+        if stim_dict_2 is not None:
+            stim_dict.update(stim_dict_2)
+
+        if keys_list_2 is not None:
+            keys_list += keys_list_2
+
+        return stim_dict, keys_list
+
+    def create_stim(self):
+        # run stim's end func
+        if self.stim != None:
+            self.stim.end_func()
+
+        # recycle any textures the previous stim is still holding
+        self.backend.release_all_textures()
+
+        print("StimWindow: {} live textures.".format(self.backend.n_live_textures()))
+
+        # new stims match the compiled table
+        self.stim_diverged = False
+
+        if self.n_stim > 0:
+            self.stim = STIM_CLASSES[self.stim_type](self)
+        else:
+            self.stim = None
+
+    def timestamp(self):
+        # get the time since the window was loaded (ms)
+        return self.stopwatch.Elapsed.TotalMilliseconds
+
+    def OnUpdateFrame(self, e):
+        GameWindow.OnUpdateFrame(self, e)
+
+        start_time = self.timestamp()
+
+        self.update_frame()
+
+        # record how long the update took
+        if self.controller.running_stim:
+            self.timings.record_update(self.stim_type, self.timestamp() - start_time)
+
+    def update_frame(self):
+        if self.reload_frames:
+            self.load_frames(self.params_time)
+
+            self.reload_frames = False
+
+        if self.frame_file is not None:
+            # play back prerendered frames instead of updating the stim
+            self.update_playback()
+            return
+
+        if self.stim != None:
+            if self.reset_stim:
+                # reset stim
+                self.switch_to_stim(0)
+
+                self.reset_stim = False
+
+            if self.controller:
+                if self.controller.running_stim:
+                    # stim sequence is running
+                    if self.controller.begin_stim == True:
+                        # beginning of stim sequence
+                        print("StimWindow: Begin signal received.")
+
+                        # reset begin stim bool
+                        self.controller.begin_stim = False
+
+                        # reset started bool
+                        self.started = False
+
+                        # reset stim
+                        self.switch_to_stim(0)
+
+                        # use the table compiled for this run
+                        self.stim_table = self.controller.stim_table
+
+                        # start counting frames
+                        self.clock.reset(self.timestamp())
+                        self.timings.reset()
+                    else:
+                        # count the frames since the last update
+                        self.clock.tick(self.timestamp())
+
+                    if self.started == True:
+                        # get the time since the start of the stim from the frame count, at the rate the
+                        # table was compiled for if there is one, so that the stim matches the table
+                        if self.stim_table is not None:
+                            self.t = self.stim_table.time(self.clock.frame - self.stim_start_frame)
+                        else:
+                            self.t = self.clock.time_since(self.stim_start_frame)
+
+                        if self.t < self.stim.duration:
+                            # run stim's update function
+                            if self.stim != None:
+                                self.stim.update_func(self.t)
+                        else:
+                            # stim's duration has finished
+
+                            if self.stim_index != self.n_stim - 1:
+                                # we haven't reached the end of the sequence; switch to the next stim
+                                self.switch_to_stim(self.stim_index + 1)
+
+                                # reset started bool to start the next stim on this frame
+                                self.started = False
+                            else:
+                                # we've reached the end; stop the stim sequence
+                                self.controller.param_window.start_stop_stim(None, None)
+
+                    if self.started == False:
+                        # beginning of a new stim
+                        print("StimWindow: Starting stim.")
+
+                        # update started bool
+                        self.started = True
+
+                        # reset time variable
+                        self.t = 0
+                        self.stim_start_frame = self.clock.frame
+                        self.table_stim = (self.stim_index, self.stim_start_frame)
+
+                        # run stim's start function
+                        if self.stim != None:
+                            self.stim.start_func()
+                else:
+                    # # stim sequence is not running; reset stim if necessary
+                    # if self.stim_index != 0:
+                    #     self.switch_to_stim(0)
+                    pass
+
+    def OnRenderFrame(self, e):
+        start_time = self.timestamp()
+
+        self.swap_duration = 0
+
+        self.render_frame()
+
+        # record how long the render & swap took
+        if self.controller.running_stim:
+            self.timings.record_render(self.timestamp() - start_time - self.swap_duration, self.swap_duration)
+
+    def render_frame(self):
+        if self.frame_file is not None:
+            self.render_playback()
+            return
+
+        if self.stim != None:
+            if self.stim_type != "Delay":
+                if self.t < self.stim.duration:
+                    # stim has started
+                    self.MakeCurrent()
+
+                    # start drawing into the frame buffer
+                    self.backend.begin_frame(self.display_width, self.display_height)
+
+                    # run stim's render function
+                    if self.stim != None:
+                        self.stim.render_func()
+
+                    # draw the frame buffer into the viewport, wrapped around the dish if necessary
+                    if self.warp_perspective:
+                        self.backend.end_frame(self.x_offset, self.y_offset, self.px_width, self.px_height, self.warp_mesh)
+                    else:
+                        self.backend.end_frame(self.x_offset, self.y_offset, self.px_width, self.px_height)
+
+                    # swap buffers
+                    self.swap_buffers()
+
+    def load_frames(self, params_time):
+        # play back the config's prerendered frames if they were saved after the params (at params_time),
+        # otherwise render the stims live
+        self.close_frames()
+
+        self.frame_file = open_frame_file(frame_file_path(self.controller.current_config_folder),
+                                          params_time, self.px_width, self.px_height)
+
+        if self.frame_file is not None:
+            print("StimWindow: Playing back {} prerendered frames from {}.".format(self.frame_file.n_frames, self.frame_file.path))
+
+            # map the file, so that only the frame being displayed is read from it
+            self.frame_mapping = MemoryMappedFile.CreateFromFile(self.frame_file.path, IO.FileMode.Open, None, 0, MemoryMappedFileAccess.Read)
+            self.frame_view    = self.frame_mapping.CreateViewAccessor(0, 0, MemoryMappedFileAccess.Read)
+
+            self.frame_texels = Array.CreateInstance(Byte, self.frame_file.frame_size)
+
+            self.frame_index     = 0
+            self.displayed_frame = 0
+            self.frame_block     = None
+
+    def close_frames(self):
+        # unmap the prerendered frames
+        if self.frame_file is not None:
+            self.frame_view.Dispose()
+            self.frame_mapping.Dispose()
+
+            self.frame_file    = None
+            self.frame_view    = None
+            self.frame_mapping = None
+
+    def update_playback(self):
+        if self.controller.running_stim:
+            if self.controller.begin_stim == True:
+                # beginning of stim sequence
+                print("StimWindow: Begin signal received.")
+
+                self.controller.begin_stim = False
+
+                # start counting frames
+                self.clock.reset(self.timestamp())
+                self.timings.reset()
+            else:
+                # count the frames since the last update, skipping any that were dropped
+                self.clock.tick(self.timestamp())
+
+            if self.clock.frame < self.frame_file.n_frames:
+                self.frame_index = self.clock.frame
+            else:
+                # we've reached the end; stop the stim sequence
+                self.controller.param_window.start_stop_stim(None, None)
+
+        # keep track of which stim is being shown
+        stim_state = self.frame_file.states[self.frame_index]
+
+        self.stim_index = stim_state["stim #"]
+        self.stim_name  = stim_state["stim name"]
+        self.stim_type  = stim_state["stim type"]
+
+    def render_playback(self):
+        self.MakeCurrent()
+
+        index = self.frame_index
+
+        # only upload the frame if it's different from the one on the screen
+        block = self.frame_file.block_index(index)
+
+        if block != self.frame_block:
+            self.frame_view.ReadArray[Byte](self.frame_file.frame_offset(index), self.frame_texels, 0, self.frame_file.frame_size)
+
+            self.backend.draw_frame(self.x_offset, self.y_offset, self.px_width, self.px_height, self.frame_texels)
+
+            self.frame_block = block
+        else:
+            self.backend.draw_frame(self.x_offset, self.y_offset, self.px_width, self.px_height)
+
+        self.displayed_frame = index
+
+        # swap buffers
+        self.swap_buffers()
+
+    def swap_buffers(self):
+        # swap buffers, keeping track of how long the swap took
+        start_time = self.timestamp()
+
+        self.SwapBuffers()
+
+        swap_time = self.timestamp()
+
+        self.swap_duration = swap_time - start_time
+
+        if self.controller.running_stim:
+            self.swap_monitor.swap(swap_time, self.stim_index, self.stim_name, self.stim_type)
+
+    def OnUnload(self, e):
+        self.close_frames()
+
+        # delete all of the textures & vertex buffers
+        self.backend.clear()
+
+        GameWindow.OnUnload(self, e)
+
+class OpenTKBackend(RenderBackend):
+    '''
+    Backend that draws with OpenTK.
+
+    Stims are drawn into a frame buffer, which is then drawn into the
+    viewport (optionally wrapped around the dish). Circles are kept in
+    vertex buffers that are only uploaded once, quads are streamed into a
+    single dynamic vertex buffer (their vertices change every frame for
+    moving & looming stims), and textures come from a shared pool.
+    '''
+
+    def __init__(self, display_width, display_height):
+        self.display_width  = display_width
+        self.display_height = display_height
+
+        # textures are uploaded from .NET byte arrays
+        self.texel_type = to_byte_array
+
+        self.create_frame_buffer()
+
+        # create the pool of textures shared by the stims
+        self.texture_pool = TexturePool()
+
+        # create the vertex buffers used to draw dots
+        self.circle_buffers = CircleBuffers()
+
+        # dynamic vertex buffer that quads are streamed into, & its size (bytes)
+        self.quad_stream      = None
+        self.quad_stream_size = 0
+
+        # vertex buffer holding the warp mesh
+        self.warp_mesh   = None
+        self.warp_buffer = None
+
+        # vertex buffer holding the unwarped frame buffer quad
+        self.frame_quad_buffer = None
+
+        # texture holding the prerendered frame being played back, & its size
+        self.playback_texture = None
+        self.playback_size    = None
+
+        # vertex buffers holding fields of dots, with the # of dots in each, & the shader program that moves them
+        self.dot_buffers = {}
+        self.dot_program = None
+
+        self.frame_width = display_width
+
+    def create_frame_buffer(self):
+        print("Creating frame buffer.")
+
+        GL.Clear(ClearBufferMask.ColorBufferBit | ClearBufferMask.DepthBufferBit)
+
+        texture = Array.CreateInstance(Byte, Array[int]([self.display_width, self.display_height, 3]))
+
+        self.texture = GL.GenTexture()
+        GL.BindTexture(TextureTarget.Texture2D, self.texture)
+
+        GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, self.display_width, self.display_height, 0, PixelFormat.Rgb, PixelType.UnsignedByte, texture)
+
+        GL.TexEnv( TextureEnvTarget.TextureEnv, TextureEnvParameter.TextureEnvMode,  int(TextureEnvMode.Replace) )
+        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
+        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
+        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapS, int(TextureWrapMode.Repeat))
+        GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapT, int(TextureWrapMode.Repeat))
+
+        self.frame_buffer = GL.GenFramebuffer()
+        GL.BindFramebuffer(FramebufferTarget.Framebuffer, self.frame_buffer)
+        GL.FramebufferTexture2D(FramebufferTarget.Framebuffer, FramebufferAttachment.ColorAttachment0, TextureTarget.Texture2D, self.texture, 0)
+
+        GL.BindTexture(TextureTarget.Texture2D, 0)
+
+    def begin_frame(self, width, height):
+        # clear buffers
+        GL.Clear(ClearBufferMask.ColorBufferBit | ClearBufferMask.DepthBufferBit)
+
+        if self.frame_buffer is not None:
+            GL.BindFramebuffer(FramebufferTarget.Framebuffer, self.frame_buffer)
+
+        GL.Viewport(0, 0, width, height)
+
+        self.frame_width = width
+
+    def end_frame(self, x, y, width, height, warp_mesh=None):
+        GL.BindFramebuffer(FramebufferTarget.Framebuffer, 0)
+
+        # set the viewport
+        GL.Viewport(x, y, width, height)
+
+        self.set_ortho(width, height)
+
+        GL.BindTexture(TextureTarget.Texture2D, self.texture)
+
+        # enable texture mode
+        GL.Enable(EnableCap.Texture2D)
+
+        GL.Translate(width/2, height/2, 0)
+
+        if warp_mesh is not None:
+            if warp_mesh is not self.warp_mesh:
+                # upload the new warp mesh
+                self.warp_buffer = create_vertex_buffer(warp_mesh.vertices, self.warp_buffer)
+                self.warp_mesh = warp_mesh
+
+            # draw the frame buffer wrapped around the cylinder
+            draw_vertex_buffer(self.warp_buffer, BeginMode.QuadStrip, warp_mesh.n_vertices, warp_mesh.stride, textured=True)
+        else:
+            # draw the middle of the frame buffer
+            draw_vertex_buffer(self.quad_buffer(quad(-width/2, -height/2, width/2, height/2, 0.25, 0.25, 0.75, 0.75)), BeginMode.Quads, 4, 4, textured=True)
+
+        # disable texture mode
+        GL.Disable(EnableCap.Texture2D)
+
+        GL.BindTexture(TextureTarget.Texture2D, 0)
+
+    def draw_frame(self, x, y, width, height, texels=None):
+        GL.BindFramebuffer(FramebufferTarget.Framebuffer, 0)
+
+        # clear buffers
+        GL.Clear(ClearBufferMask.ColorBufferBit | ClearBufferMask.DepthBufferBit)
+
+        if texels is not None:
+            # rows of RGB texels aren't necessarily aligned to 4 bytes
+            GL.PixelStore(PixelStoreParameter.UnpackAlignment, 1)
+
+            if self.playback_size != (width, height):
+                # create a texture with the size of the frames
+                if self.playback_texture is not None:
+                    GL.DeleteTextures(1, self.playback_texture)
+
+                self.playback_texture = GL.GenTexture()
+                self.playback_size    = (width, height)
+
+                GL.BindTexture(TextureTarget.Texture2D, self.playback_texture)
+
+                GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Nearest))
+                GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Nearest))
+
+                GL.TexImage2D(TextureTarget.Texture2D, 0, PixelInternalFormat.Rgb, width, height, 0, PixelFormat.Rgb, PixelType.UnsignedByte, texels)
+            else:
+                GL.BindTexture(TextureTarget.Texture2D, self.playback_texture)
+
+                GL.TexSubImage2D(TextureTarget.Texture2D, 0, 0, 0, width, height, PixelFormat.Rgb, PixelType.UnsignedByte, texels)
+
+            GL.PixelStore(PixelStoreParameter.UnpackAlignment, 4)
+        else:
+            GL.BindTexture(TextureTarget.Texture2D, self.playback_texture)
+
+        # draw the frame texel for pixel into the viewport
+        GL.Viewport(x, y, width, height)
+
+        self.set_ortho(width, height)
+
+        GL.Enable(EnableCap.Texture2D)
+
+        draw_vertex_buffer(self.quad_buffer(quad(0, 0, width, height)), BeginMode.Quads, 4, 4, textured=True)
+
+        GL.Disable(EnableCap.Texture2D)
+
+        GL.BindTexture(TextureTarget.Texture2D, 0)
+
+    def reset_transform(self):
+        GL.MatrixMode(MatrixMode.Projection)
+        GL.LoadIdentity()
+
+    def set_ortho(self, width, height):
+        self.reset_transform()
+        GL.Ortho(0.0, width, 0.0, height, -1.0, 1.0)
+
+    def push_transform(self, x=0, y=0, angle=0, scale_x=1, scale_y=1):
+        GL.PushMatrix()
+        GL.Translate(x, y, 0)
+
+        if angle != 0:
+            GL.Rotate(angle, 0, 0, 1)
+
+        if scale_x != 1 or scale_y != 1:
+            GL.Scale(scale_x, scale_y, 1)
+
+    def pop_transform(self):
+        GL.PopMatrix()
+
+    def create_texture(self, width, height, texels=None, rgba=False):
+        return self.texture_pool.acquire(width, height, PixelInternalFormat.Rgb, PixelFormat.Rgba if rgba else PixelFormat.Rgb, texels)
+
+    def update_texture(self, texture, texels, width, height=1, first_texel=0, rgba=False):
+        GL.BindTexture(TextureTarget.Texture2D, texture)
+
+        # upload the texels, starting from the given texel
+        if first_texel != 0:
+            GL.PixelStore(PixelStoreParameter.UnpackSkipPixels, first_texel)
+
+        GL.TexSubImage2D(TextureTarget.Texture2D, 0, 0, 0, width, height, PixelFormat.Rgba if rgba else PixelFormat.Rgb, PixelType.UnsignedByte, texels)
+
+        if first_texel != 0:
+            GL.PixelStore(PixelStoreParameter.UnpackSkipPixels, 0)
+
+        GL.BindTexture(TextureTarget.Texture2D, 0)
+
+    def release_texture(self, texture):
+        self.texture_pool.release(texture)
+
+    def release_all_textures(self):
+        self.texture_pool.release_all()
+
+    def n_live_textures(self):
+        return self.texture_pool.n_live()
+
+    def quad_buffer(self, vertices):
+        # stream the given quads into the dynamic vertex buffer, which only grows when a batch doesn't fit
+        if self.quad_stream is None:
+            self.quad_stream = GL.GenBuffer()
+
+        size = 4*len(vertices)
+
+        GL.BindBuffer(BufferTarget.ArrayBuffer, self.quad_stream)
+
+        if size > self.quad_stream_size:
+            GL.BufferData(BufferTarget.ArrayBuffer, IntPtr(size), Array[Single](vertices), BufferUsageHint.StreamDraw)
+
+            self.quad_stream_size = size
+        else:
+            # orphan the previous contents, so the upload doesn't wait for draws that are still using them
+            GL.BufferData(BufferTarget.ArrayBuffer, IntPtr(self.quad_stream_size), IntPtr.Zero, BufferUsageHint.StreamDraw)
+            GL.BufferSubData(BufferTarget.ArrayBuffer, IntPtr.Zero, IntPtr(size), Array[Single](vertices))
+
+        GL.BindBuffer(BufferTarget.ArrayBuffer, 0)
+
+        return self.quad_stream
+
+    def draw_quads(self, vertices, color=(1.0, 1.0, 1.0), texture=None, texture_offset=0):
+        GL.Color3(color[0], color[1], color[2])
+
+        if texture is not None:
+            GL.BindTexture(TextureTarget.Texture2D, texture)
+            GL.Enable(EnableCap.Texture2D)
+
+            if texture_offset != 0:
+                set_texture_offset(texture_offset)
+
+        draw_vertex_buffer(self.quad_buffer(vertices), BeginMode.Quads, len(vertices)//4, 4, textured=texture is not None)
+
+        if texture is not None:
+            if texture_offset != 0:
+                set_texture_offset(0)
+
+            GL.Disable(EnableCap.Texture2D)
+            GL.BindTexture(TextureTarget.Texture2D, 0)
+
+    def draw_circles(self, n_vertices, circles, texture=None, texture_transform=None):
+        textured = texture is not None
+
+        if textured:
+            GL.BindTexture(TextureTarget.Texture2D, texture)
+            GL.Enable(EnableCap.Texture2D)
+
+            if texture_transform is not None:
+                # map the unit circle's texture coordinates
+                scale_s, scale_t, offset_s, offset_t = texture_transform
+
+                GL.MatrixMode(MatrixMode.Texture)
+                GL.LoadIdentity()
+                GL.Translate(offset_s, offset_t, 0)
+                GL.Scale(scale_s, scale_t, 1)
+                GL.MatrixMode(MatrixMode.Projection)
+
+        bind_vertex_buffer(self.circle_buffers.buffer(n_vertices), UnitCircle.stride, textured)
+
+        for x, y, radius_x, radius_y, color in circles:
+            GL.Color3(color[0], color[1], color[2])
+
+            GL.PushMatrix()
+            GL.Translate(x, y, 0)
+            GL.Scale(radius_x, radius_y, 1)
+            GL.DrawArrays(BeginMode.Polygon, 0, n_vertices)
+            GL.PopMatrix()
+
+        unbind_vertex_buffer(textured)
+
+        if textured:
+            if texture_transform is not None:
+                # reset the texture coordinates
+                set_texture_offset(0)
+
+            GL.Disable(EnableCap.Texture2D)
+            GL.BindTexture(TextureTarget.Texture2D, 0)
+
+    def create_dots(self, vertices, stride):
+        # upload the dots once; they are moved by the dot program when they're drawn
+        buffer = create_vertex_buffer(vertices)
+
+        self.dot_buffers[buffer] = (len(vertices)//stride, stride)
+
+        return buffer
+
+    def release_dots(self, dots):
+        if self.dot_buffers.pop(dots, None) is not None:
+            GL.DeleteBuffers(1, dots)
+
+    def draw_dots(self, dots, t, bounds, first=0, count=None):
+        n_dots, stride = self.dot_buffers[dots]
+
+        if count is None:
+            count = n_dots - first
+
+        if self.dot_program is None:
+            self.dot_program = DotProgram()
+
+        program = self.dot_program
+
+        GL.UseProgram(program.program)
+
+        GL.Uniform1(program.t, float(t))
+        GL.Uniform4(program.bounds, float(bounds[0]), float(bounds[1]), float(bounds[2]), float(bounds[3]))
+        GL.Uniform1(program.half_width, self.frame_width/2.0)
+
+        # let the program set the size of the points, & draw them as sprites so that they can be made round
+        GL.Enable(EnableCap.VertexProgramPointSize)
+        GL.Enable(EnableCap.PointSprite)
+
+        GL.BindBuffer(BufferTarget.ArrayBuffer, dots)
+
+        GL.EnableClientState(ArrayCap.VertexArray)
+        GL.VertexPointer(2, VertexPointerType.Float, 4*stride, IntPtr.Zero)
+
+        for attribute, size, offset in program.attributes:
+            GL.EnableVertexAttribArray(attribute)
+            GL.VertexAttribPointer(attribute, size, VertexAttribPointerType.Float, False, 4*stride, IntPtr(4*offset))
+
+        # draw all of the dots at once
+        GL.DrawArrays(BeginMode.Points, first, count)
+
+        for attribute, size, offset in program.attributes:
+            GL.DisableVertexAttribArray(attribute)
+
+        GL.DisableClientState(ArrayCap.VertexArray)
+        GL.BindBuffer(BufferTarget.ArrayBuffer, 0)
+
+        GL.Disable(EnableCap.PointSprite)
+        GL.Disable(EnableCap.VertexProgramPointSize)
+
+        GL.UseProgram(0)
+
+    def clear(self):
+        # delete all of the textures & vertex buffers
+        self.texture_pool.release_all()
+        self.texture_pool.clear()
+
+        for buffer in list(self.dot_buffers.keys()):
+            self.release_dots(buffer)
+
+        if self.dot_program is not None:
+            self.dot_program.delete()
+
+            self.dot_program = None
+
+        self.circle_buffers.clear()
+
+        if self.quad_stream is not None:
+            GL.DeleteBuffers(1, self.quad_stream)
+
+            self.quad_stream      = None
+            self.quad_stream_size = 0
+
+        if self.warp_buffer is not None:
+            GL.DeleteBuffers(1, self.warp_buffer)
+
+            self.warp_mesh   = None
+            self.warp_buffer = None
+
+        if self.playback_texture is not None:
+            GL.DeleteTextures(1, self.playback_texture)
+
+            self.playback_texture = None
+            self.playback_size    = None
+
+class TexturePool():
+    '''
+    Pool of reusable textures.
+
+    Textures are handed out by size & format, and released textures are
+    kept to be handed out again instead of being deleted, so switching
+    between stims doesn't have to allocate new textures.
+    '''
+
+    # maximum number of released textures kept for each size & format
+    max_pooled = 4
+
+    def __init__(self):
+        self.live   = {} # textures in use, with their size & format
+        self.pooled = {} # released textures, by size & format
+
+    def acquire(self, width, height, internal_format=PixelInternalFormat.Rgb, pixel_format=PixelFormat.Rgb, texels=None):
+        # get a texture with the given size & format, filling it with the given texels if any
+        key = (width, height, internal_format, pixel_format)
+
+        textures = self.pooled.get(key)
+
+        if textures:
+            # reuse a released texture
+            texture = textures.pop()
+
+            GL.BindTexture(TextureTarget.Texture2D, texture)
+
+            if texels is not None:
+                GL.TexSubImage2D(TextureTarget.Texture2D, 0, 0, 0, width, height, pixel_format, PixelType.UnsignedByte, texels)
+        else:
+            # create a new texture
+            texture = GL.GenTexture()
+
+            GL.BindTexture(TextureTarget.Texture2D, texture)
+
+            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMagFilter, int(TextureMagFilter.Linear))
+            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureMinFilter, int(TextureMagFilter.Linear))
+            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapS, int(TextureWrapMode.Repeat))
+            GL.TexParameter(TextureTarget.Texture2D, TextureParameterName.TextureWrapT, int(TextureWrapMode.Repeat))
+
+            if texels is None:
+                # allocate the (black) texture
+                n_channels = 4 if pixel_format == PixelFormat.Rgba else 3
+                texels = Array.CreateInstance(Byte, width*height*n_channels)
+
+            GL.TexImage2D(TextureTarget.Texture2D, 0, internal_format, width, height, 0, pixel_format, PixelType.UnsignedByte, texels)
+
+        GL.BindTexture(TextureTarget.Texture2D, 0)
+
+        self.live[texture] = key
+
+        return texture
+
+    def release(self, texture):
+        # return a texture to the pool
+        key = self.live.pop(texture, None)
+
+        if key is None:
+            return
+
+        textures = self.pooled.setdefault(key, [])
+
+        if len(textures) < self.max_pooled:
+            textures.append(texture)
+        else:
+            GL.DeleteTextures(1, texture)
+
+    def release_all(self):
+        # return all live textures to the pool
+        for texture in list(self.live.keys()):
+            self.release(texture)
+
+    def clear(self):
+        # delete all pooled textures
+        for textures in self.pooled.values():
+            for texture in textures:
+                GL.DeleteTextures(1, texture)
+
+        self.pooled = {}
+
+    def n_live(self):
+        return len(self.live)
+
+    def n_pooled(self):
+        return sum([ len(textures) for textures in self.pooled.values() ])
+
+# vertex shader that moves the dots of a DotField (with x, y as the vertex & the rest as attributes) to their
+# positions at time t, wrapped into the bounds, & sizes them as circles of their radius (in NDC units of x)
+DOT_VERTEX_SHADER = """
+#version 120
+
+uniform float t;
+uniform vec4 bounds;
+uniform float half_width;
+
+attribute vec2 velocity;
+attribute float radius;
+attribute float brightness;
+
+varying float dot_brightness;
+
+void main() {
+    vec2 position = bounds.xy + mod(gl_Vertex.xy + velocity*t - bounds.xy, bounds.zw - bounds.xy);
+
+    gl_Position  = gl_ModelViewProjectionMatrix*vec4(position, 0.0, 1.0);
+    gl_PointSize = 2.0*radius*half_width;
+
+    dot_brightness = brightness;
+}
+"""
+
+# fragment shader that cuts the square point sprites down to circles
+DOT_FRAGMENT_SHADER = """
+#version 120
+
+varying float dot_brightness;
+
+void main() {
+    if (length(gl_PointCoord - vec2(0.5)) > 0.5) {
+        discard;
+    }
+
+    gl_FragColor = vec4(dot_brightness, dot_brightness, dot_brightness, 1.0);
+}
+"""
+
+class DotProgram():
+    '''
+    Shader program that draws fields of dots.
+
+    The positions of the dots are computed from their initial positions &
+    velocities on the GPU, so a whole field is drawn with a single call
+    from a vertex buffer that is only uploaded once.
+    '''
+
+    def __init__(self):
+        self.shaders = [ compile_shader(ShaderType.VertexShader, DOT_VERTEX_SHADER),
+                         compile_shader(ShaderType.FragmentShader, DOT_FRAGMENT_SHADER) ]
+
+        self.program = GL.CreateProgram()
+
+        for shader in self.shaders:
+            GL.AttachShader(self.program, shader)
+
+        GL.LinkProgram(self.program)
+
+        log = GL.GetProgramInfoLog(self.program)
+        if log:
+            print("DotProgram: {}".format(log))
+
+        self.t          = GL.GetUniformLocation(self.program, "t")
+        self.bounds     = GL.GetUniformLocation(self.program, "bounds")
+        self.half_width = GL.GetUniformLocation(self.program, "half_width")
+
+        # attributes, with their # of values & offset in the vertices (x & y come first, as the vertex)
+        self.attributes = [ (GL.GetAttribLocation(self.program, "velocity"), 2, 2),
+                            (GL.GetAttribLocation(self.program, "radius"), 1, 4),
+                            (GL.GetAttribLocation(self.program, "brightness"), 1, 5) ]
+
+    def delete(self):
+        GL.DeleteProgram(self.program)
+
+        for shader in self.shaders:
+            GL.DeleteShader(shader)
+
+class CircleBuffers():
+    '''
+    Vertex buffers holding unit circles.
+
+    Each tessellation level is uploaded once, and a circle of any size &
+    position is then drawn from it by scaling & translating the current
+    matrix.
+    '''
+
+    def __init__(self):
+        self.buffers = {}
+
+    def buffer(self, n_vertices):
+        # get the vertex buffer for the given number of vertices, creating it if necessary
+        buffer = self.buffers.get(n_vertices)
+
+        if buffer is None:
+            buffer = create_vertex_buffer(unit_circle(n_vertices).vertices)
+
+            self.buffers[n_vertices] = buffer
+
+        return buffer
+
+    def clear(self):
+        # delete all vertex buffers
+        for buffer in self.buffers.values():
+            GL.DeleteBuffers(1, buffer)
+
+        self.buffers = {}
+
+# --- HELPER FUNCTIONS --- #
+
+# convert texels to a .NET byte array that can be uploaded to a texture
+def to_byte_array(texels):
+    return Array[Byte](texels)
+
+# upload an interleaved x, y, s, t vertex table to a (new or existing) vertex buffer
+def create_vertex_buffer(vertices, buffer=None):
+    if buffer is None:
+        buffer = GL.GenBuffer()
+
+    GL.BindBuffer(BufferTarget.ArrayBuffer, buffer)
+    GL.BufferData(BufferTarget.ArrayBuffer, IntPtr(4*len(vertices)), Array[Single](vertices), BufferUsageHint.StaticDraw)
+    GL.BindBuffer(BufferTarget.ArrayBuffer, 0)
+
+    return buffer
+
+# draw the vertices in a vertex buffer with a single call
+def draw_vertex_buffer(buffer, mode, n_vertices, stride, textured=False):
+    bind_vertex_buffer(buffer, stride, textured)
+
+    GL.DrawArrays(mode, 0, n_vertices)
+
+    unbind_vertex_buffer(textured)
+
+# compile a shader from its source
+def compile_shader(shader_type, source):
+    shader = GL.CreateShader(shader_type)
+
+    GL.ShaderSource(shader, source)
+    GL.CompileShader(shader)
+
+    log = GL.GetShaderInfoLog(shader)
+    if log:
+        print("Shader: {}".format(log))
+
+    return shader
+
+# use the interleaved x, y, s, t vertices in a vertex buffer for the following draw calls
+def bind_vertex_buffer(buffer, stride, textured=False):
+    GL.BindBuffer(BufferTarget.ArrayBuffer, buffer)
+
+    GL.EnableClientState(ArrayCap.VertexArray)
+    GL.VertexPointer(2, VertexPointerType.Float, 4*stride, IntPtr.Zero)
+
+    if textured:
+        GL.EnableClientState(ArrayCap.TextureCoordArray)
+        GL.TexCoordPointer(2, TexCoordPointerType.Float, 4*stride, IntPtr(8))
+
+def unbind_vertex_buffer(textured=False):
+    if textured:
+        GL.DisableClientState(ArrayCap.TextureCoordArray)
+
+    GL.DisableClientState(ArrayCap.VertexArray)
+
+    GL.BindBuffer(BufferTarget.ArrayBuffer, 0)
+
+# shift the texture coordinates of everything drawn next by the given offset (in texture widths)
+def set_texture_offset(offset):
+    GL.MatrixMode(MatrixMode.Texture)
+    GL.LoadIdentity()
+
+    if offset != 0:
+        # only the fractional part matters for a repeating texture; dropping the
+        # integer part keeps the offset precise during long stimuli
+        GL.Translate(offset % 1.0, 0, 0)
+
+    GL.MatrixMode(MatrixMode.Projection)
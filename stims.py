@@ -0,0 +1,1468 @@
+'''
+Stimuli shown in the stim window.
+
+The stims draw through the stim window's rendering backend (see
+render_backend.py) instead of making OpenGL calls themselves, so this
+module doesn't depend on OpenTK and the stims can be created & rendered
+headlessly.
+
+update_func() is given the time since the start of the stim (ms), from
+which the stims compute their state, so the state on any frame doesn't
+depend on the frames before it.
+'''
+
+from __future__ import division
+
+import math
+
+from stim_textures import grating_profile, grating_period, broadband_profile, checkerboard, noise_texture, GRATING_PERIOD_TEXELS, NOISE_TEXTURE_SIZE, NOISE_CELLS
+from stim_geometry import circle_segments
+from render_backend import quad
+from frame_clock import FrameClock, Motion
+from dot_field import DotField, random_dot_field, random_dot_kinematogram
+from stim_params import as_stim_params
+
+# drift gratings by scrolling a texture that is only uploaded once (True),
+# or by regenerating the texture whenever the phase changes (False)
+SCROLL_GRATINGS = True
+
+# scale from the frame buffer to the screen (only the middle half of the
+# frame buffer is stretched over the viewport)
+FRAME_BUFFER_SCALE = 2
+
+class LoomingDot():
+    def __init__(self, stim):
+        self.stim = stim
+
+    def update_params(self, distance, resolution, params, window_width, window_height):
+        self.redraw = False
+
+        self.resolution = resolution # px/cm
+        self.distance   = distance # cm
+        self.window_width = window_width
+        self.window_height = window_height
+        self.max_radius = self.window_width*4 
+
+        self.x        = math.tan(math.radians(params.looming_dot_init_x_pos))*self.distance*self.resolution/(self.window_width/2)
+        self.y        = math.tan(math.radians(params.looming_dot_init_y_pos))*self.distance*self.resolution/(self.window_height/2)
+        self.l_v      = params.l_v
+        self.brightness = params.looming_dot_brightness
+        self.contrast = 1
+
+        self.A = self.distance*self.resolution*-self.l_v 
+
+        self.radius_init = 1 # initial radius
+        self.radius = self.radius_init
+
+        self.angle = 0
+        self.phase = 0
+        self.frequency = 0.01
+
+        self.texture = None
+
+        # combined dots have no checkered pattern
+        self.checkered = getattr(params, 'checkered', False)
+        self.texture_size = 100
+
+        self.num_squares = getattr(params, 'num_squares', 1)
+        self.expand_checkered_pattern = getattr(params, 'expand_checkered_pattern', False)
+
+        self.redraw = True
+
+    def create_grating(self):
+        # get the cached checkerboard texture
+        self.grating = checkerboard(self.texture_size, self.brightness, row_type=self.stim.stim_window.backend.texel_type)
+
+    def create_texture(self):
+        # generate the texture
+        self.create_grating()
+
+        # release the old texture & get a new one
+        self.end_func()
+
+        self.texture = self.stim.stim_window.backend.create_texture(self.texture_size, self.texture_size, self.grating, rgba=True)
+
+    def update_func(self, time):
+        if time < 0:
+            # update radius
+            self.radius = self.A/time
+        else:
+            self.radius = self.max_radius
+
+    def draw_circle(self, radius):
+        radius = min(2*(self.window_width/2.0), max(-2*(self.window_width/2.0), radius))
+        radius_x = radius/(self.window_width/2.0)
+        radius_y = radius/(self.window_height/2.0)
+
+        # use enough vertices to keep the edge within a pixel of the on-screen circle
+        n_vertices = circle_segments(FRAME_BUFFER_SCALE*abs(radius)) + 1
+
+        circle = (self.x, self.y, radius_x, radius_y, (self.brightness, self.brightness, self.brightness))
+
+        if not self.checkered:
+            self.stim.stim_window.backend.draw_circles(n_vertices, [ circle ])
+        else:
+            # map the unit circle's texture coordinates onto the checkerboard
+            if self.expand_checkered_pattern:
+                # the pattern grows with the dot
+                texture_transform = (self.num_squares/2, self.num_squares/2, 0, 0)
+            else:
+                # the pattern stays the same size as the dot grows
+                texture_transform = ((self.num_squares/2)*radius_y, (self.num_squares/2)*radius_y, (self.num_squares/2)*(radius_y/radius_x)*0.5*(1 - radius_x), (self.num_squares/2)*0.5*(1 - radius_y))
+
+            self.stim.stim_window.backend.draw_circles(n_vertices, [ circle ], self.texture, texture_transform)
+
+    def end_func(self):
+        # release the texture
+        if self.texture is not None:
+            self.stim.stim_window.backend.release_texture(self.texture)
+            self.texture = None
+
+    def render_func(self):
+        if self.redraw:
+            # redraw the texture (only checkered dots use one)
+            if self.checkered:
+                self.create_texture()
+
+            # reset redraw bool
+            self.redraw = False
+
+        # draw the dot
+        self.draw_circle(self.radius)
+
+class LoomingDotStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+        self.looming_dot = LoomingDot(self)
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("LoomingDotStim: Updating parameters.")
+
+        self.duration   = duration*1000.0 # ms
+
+        self.looming_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
+
+        # if a duration of 0 is given, calculate required duration for approaching dot to reach the screen
+        if self.duration == 0:
+            self.duration = -self.looming_dot.A/self.looming_dot.radius # ms
+
+        print(self.duration)
+
+        self.t_init = -self.duration
+        self.t = self.t_init
+
+        self.background_brightness = params.background_brightness
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):    ## Keeps track of time for LoomingDot
+        # update t
+        self.t = self.t_init + t
+
+        self.looming_dot.update_func(self.t)
+
+    def end_func(self):
+        self.looming_dot.end_func()
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "radius": self.looming_dot.radius}, ["radius"]
+
+    def render_func(self):
+        # draw in the viewport background
+        self.stim_window.backend.fill((self.background_brightness, self.background_brightness, self.background_brightness))
+
+        self.looming_dot.render_func()
+
+class MovingDot():     
+    def __init__(self,stim):
+        self.stim = stim
+
+    def update_params(self, distance, resolution, params, window_width, window_height): 
+        self.resolution = resolution # px/cm   ## What does this and self.distance do?
+        self.distance = distance # cm
+        self.window_width = window_width
+        self.window_height = window_height
+
+        self.radius   = params.radius # px
+        self.x_init   = math.tan(math.radians(params.moving_dot_init_x_pos))*self.distance*self.resolution/(self.window_width/2) # rel units
+        self.y_init   = math.tan(math.radians(params.moving_dot_init_y_pos))*self.distance*self.resolution/(self.window_height/2) # rel units
+        self.x = self.x_init
+        self.y = self.y_init
+
+        self.v_x = math.tan(math.radians(params.v_x))*self.distance*self.resolution/((self.window_width/2)*1000.0)
+        self.v_y = math.tan(math.radians(params.v_y))*self.distance*self.resolution/((self.window_height/2)*1000.0)
+
+        # initial speed, which live changes of the velocity along either axis are relative to
+        self.max_v_init = max(abs(self.v_x), abs(self.v_y))
+
+        # the position is computed from the time since the start of the stim
+        self.x_motion = Motion(self.x_init, self.v_x)
+        self.y_motion = Motion(self.y_init, self.v_y)
+
+        print(self.v_x, self.v_y)
+
+        self.brightness = params.moving_dot_brightness
+
+        self.radius_x = self.radius/(self.window_width/2.0)
+        self.radius_y = self.radius/(self.window_height/2.0)
+
+        # use enough vertices to keep the edge within a pixel of the on-screen circle
+        self.n_vertices = circle_segments(FRAME_BUFFER_SCALE*abs(self.radius)) + 1
+
+    def update_func(self, t):
+        self.x = self.x_motion.at(t)
+        self.y = self.y_motion.at(t)
+
+    def draw_circle(self, n_vertices):
+        # draw the dot at its current position
+        self.stim.stim_window.backend.draw_circles(n_vertices, [ (self.x, self.y, self.radius_x, self.radius_y, (self.brightness, self.brightness, self.brightness)) ])
+
+    def change_v_x(self, change_in_v_x):
+        # set the horizontal velocity to the given fraction of the initial speed
+        self.v_x = change_in_v_x*self.max_v_init
+        self.x_motion.change_rate(self.v_x)
+
+    def change_v_y(self, change_in_v_y):
+        # set the vertical velocity to the given fraction of the initial speed
+        self.v_y = change_in_v_y*self.max_v_init
+        self.y_motion.change_rate(self.v_y)
+
+    def render_func(self):
+        # draw the dot
+        self.draw_circle(self.n_vertices)
+
+class MovingDotStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        self.moving_dot = MovingDot(self)
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("MovingDotStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+        self.moving_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
+
+        ## if a duration of 0 is given, calculates duration for moving dot to move across screen
+        if self.duration == 0:
+            if self.moving_dot.v_x != 0:
+                if self.moving_dot.v_x > 0:
+                    self.duration = (1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
+                else:
+                    self.duration = (-1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
+            else:
+                if self.moving_dot.v_y > 0:
+                    self.duration = (1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
+                else:
+                    self.duration = (-1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
+        
+        self.t_init = -self.duration # ms
+        self.t = self.t_init
+
+        self.background_brightness = params.background_brightness
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update t
+        self.t = self.t_init + t
+
+        self.moving_dot.update_func(t)
+
+    def end_func(self):
+        pass
+
+    def change_v_x(self, change_in_v_x):
+        self.moving_dot.change_v_x(change_in_v_x)
+
+    def change_v_y(self, change_in_v_y):
+        self.moving_dot.change_v_y(change_in_v_y)
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "x": self.moving_dot.x,
+                "y": self.moving_dot.y}, ["x", "y"]
+
+    def render_func(self):
+        # draw in the viewport background
+        self.stim_window.backend.fill((self.background_brightness, self.background_brightness, self.background_brightness))
+
+        self.moving_dot.render_func()
+
+class MultipleMovingDotsStim():
+    '''
+    Field of many dots moving at (roughly) the same velocity.
+
+    The dots are kept in a DotField & drawn with a single call, with their
+    positions computed by the backend from the time since the start of the
+    stim, so the cost of a frame doesn't grow with the number of dots. The
+    state that is logged is the seed & the time, from which the position of
+    every dot can be recomputed.
+    '''
+
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        self.dots = None
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("MultipleMovingDotsStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+        self.t_init = -self.duration # ms
+        self.t = self.t_init
+
+        # time since the start of the stim (ms)
+        self.time = 0.0
+
+        window_width  = self.stim_window.px_width
+        window_height = self.stim_window.px_height
+
+        self.n_dots = int(params.n_dots)
+        self.seed   = int(params.seed)
+
+        # convert sizes & velocities to rel units, as for a moving dot
+        radius_x = params.radius/(window_width/2.0)
+        radius_y = params.radius/(window_height/2.0)
+
+        scale_x = distance*resolution/(window_width/2)
+        scale_y = distance*resolution/(window_height/2)
+
+        v_x = math.tan(math.radians(params.v_x))*scale_x/1000.0
+        v_y = math.tan(math.radians(params.v_y))*scale_y/1000.0
+
+        spread_x = math.tan(math.radians(params.velocity_spread))*scale_x/1000.0
+        spread_y = math.tan(math.radians(params.velocity_spread))*scale_y/1000.0
+
+        # the dots wrap around just outside of the part of the frame buffer that is shown, so they don't pop in & out of view
+        edge = 1.0/FRAME_BUFFER_SCALE
+        self.bounds = (-edge - radius_x, -edge - radius_y, edge + radius_x, edge + radius_y)
+
+        self.field = random_dot_field(self.n_dots, self.bounds, v_x, v_y, spread_x, spread_y, radius_x, params.dot_brightness, self.seed)
+
+        self.background_brightness = params.background_brightness
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update t
+        self.t = self.t_init + t
+        self.time = t
+
+    def end_func(self):
+        # delete the dots
+        if self.dots is not None:
+            self.stim_window.backend.release_dots(self.dots)
+            self.dots = None
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "seed": self.seed,
+                "t": self.time}, ["seed", "t"]
+
+    def render_func(self):
+        backend = self.stim_window.backend
+
+        # draw in the viewport background
+        backend.fill((self.background_brightness, self.background_brightness, self.background_brightness))
+
+        # upload the dots once
+        if self.dots is None:
+            self.dots = backend.create_dots(self.field.vertices(), DotField.stride)
+
+        # draw all of the dots at their current positions
+        backend.draw_dots(self.dots, self.time, self.bounds)
+
+class RandomDotKinematogramStim():
+    '''
+    Random dots, a fraction of which (the coherence) move in the same
+    direction while the rest move in random directions, at the same speed.
+
+    Each dot lives for a limited time & is then replaced by a new dot at a
+    random position. Every life of every dot is computed from the seed when
+    the params are set (see DotSchedule in dot_field.py), so drawing a frame
+    only looks up the range of dots that are alive. The state that is logged
+    is the seed & the index of the frame within the stim, from which the
+    dots on the frame can be recomputed.
+    '''
+
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        self.dots = None
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("RandomDotKinematogramStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+        self.t_init = -self.duration # ms
+        self.t = self.t_init
+
+        # time since the start of the stim (ms) & index of the frame
+        self.time  = 0.0
+        self.frame = 0
+
+        window_width  = self.stim_window.px_width
+        window_height = self.stim_window.px_height
+
+        self.seed = int(params.seed)
+
+        # convert sizes & speeds to rel units, as for a moving dot
+        radius_x = params.radius/(window_width/2.0)
+        radius_y = params.radius/(window_height/2.0)
+
+        scale_x = distance*resolution/(window_width/2)
+        scale_y = distance*resolution/(window_height/2)
+
+        speed_x = math.tan(math.radians(params.velocity))*scale_x/1000.0
+        speed_y = math.tan(math.radians(params.velocity))*scale_y/1000.0
+
+        # the dots wrap around just outside of the part of the frame buffer that is shown, so they don't pop in & out of view
+        edge = 1.0/FRAME_BUFFER_SCALE
+        self.bounds = (-edge - radius_x, -edge - radius_y, edge + radius_x, edge + radius_y)
+
+        # get the # of dots from the density (dots/deg^2) & the area of the field (deg^2)
+        field_width  = 2*math.degrees(math.atan((edge + radius_x)/scale_x))
+        field_height = 2*math.degrees(math.atan((edge + radius_y)/scale_y))
+
+        self.n_dots = max(1, int(round(params.density*field_width*field_height)))
+
+        self.schedule = random_dot_kinematogram(self.n_dots, self.bounds, speed_x, speed_y, params.angle, params.coherence, params.lifetime,
+                                                self.duration, radius_x, params.dot_brightness, self.seed)
+
+        self.first_dot, self.n_alive = self.schedule.alive(self.time)
+
+        self.background_brightness = params.background_brightness
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update t
+        self.t = self.t_init + t
+        self.time = t
+
+        self.frame = int(round(t/self.stim_window.clock.period))
+
+        # get the dots that are alive
+        self.first_dot, self.n_alive = self.schedule.alive(t)
+
+    def end_func(self):
+        # delete the dots
+        if self.dots is not None:
+            self.stim_window.backend.release_dots(self.dots)
+            self.dots = None
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "seed": self.seed,
+                "frame": self.frame}, ["seed", "frame"]
+
+    def render_func(self):
+        backend = self.stim_window.backend
+
+        # draw in the viewport background
+        backend.fill((self.background_brightness, self.background_brightness, self.background_brightness))
+
+        # upload every life of every dot once
+        if self.dots is None:
+            self.dots = backend.create_dots(self.schedule.field.vertices(), DotField.stride)
+
+        # draw the dots that are alive at their current positions
+        backend.draw_dots(self.dots, self.time, self.bounds, self.first_dot, self.n_alive)
+
+class CombinedDotStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        self.moving_dot = MovingDot(self)
+        self.looming_dot = LoomingDot(self)
+
+        # get parameters    ## I only need one get params because there is only one window
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+        
+    def update_params(self, distance, resolution, duration, params):
+        print("CombinedDotStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+        ## if a duration of 0 is given, calculates duration for moving dot to move across screen
+        if self.duration == 0:
+            if self.moving_dot.v_x != 0:
+                if self.moving_dot.v_x > 0:
+                    self.duration = (1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
+                else:
+                    self.duration = (-1.2 - self.moving_dot.x_init)/self.moving_dot.v_x
+            else:
+                if self.moving_dot.v_y > 0:
+                    self.duration = (1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
+                else:
+                    self.duration = (-1.2 - self.moving_dot.y_init)/self.moving_dot.v_y
+
+        self.background_brightness = params.background_brightness
+
+        print(self.duration)
+
+        self.moving_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
+        self.looming_dot.update_params(distance, resolution, params, self.stim_window.px_width, self.stim_window.px_height)
+        
+        self.t_init = -self.duration # ms
+        self.t = self.t_init
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update t
+        self.t = self.t_init + t
+
+        self.looming_dot.update_func(self.t)
+        self.moving_dot.update_func(t)
+
+    def end_func(self):
+        self.looming_dot.end_func()
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "looming dot radius": self.looming_dot.radius,
+                "moving dot x": self.moving_dot.x,
+                "moving dot y": self.moving_dot.y}, ["looming dot radius", "moving dot x", "moving dot y"]
+
+    def render_func(self):
+        # draw in the viewport background
+        self.stim_window.backend.fill((self.background_brightness, self.background_brightness, self.background_brightness))
+
+        self.looming_dot.render_func()
+        self.moving_dot.render_func()
+
+class GratingStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        self.texture = None
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("GratingStim: Updating parameters.")
+
+        self.redraw = False
+
+        self.resolution = resolution # px/cm
+        self.distance = distance # cm
+        self.duration = duration*1000.0 # ms
+
+        self.rad_width = math.atan2(self.stim_window.display_width/2.0, self.distance*self.resolution)*2
+        self.frequency = params.frequency*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width) # rad/px
+        self.init_phase = params.init_phase*(math.pi/180.0)*self.stim_window.display_width/self.rad_width
+        self.velocity_init = params.velocity*(math.pi/180.0)*self.stim_window.display_width/self.rad_width/1000.0
+        self.velocity = self.velocity_init
+        self.contrast = params.contrast
+        self.brightness = params.brightness
+        self.angle = params.angle
+        
+        self.velocity *= math.cos(self.angle*math.pi/180.0)
+        self.velocity_init *= math.cos(self.angle*math.pi/180.0)
+
+        self.t_init = -self.duration*1000.0 # ms
+        self.t = self.t_init
+
+        self.phase = self.init_phase
+
+        # the phase is computed from the time since the start of the stim
+        self.phase_motion = Motion(self.init_phase, self.velocity)
+
+        self.scroll = SCROLL_GRATINGS
+
+        if self.scroll:
+            # the texture holds one period of the grating
+            self.texture_width = GRATING_PERIOD_TEXELS
+        else:
+            self.texture_width = int(self.stim_window.display_width/2)
+
+            # get the precomputed grating profile for these params
+            self.profile = grating_profile(self.frequency, self.contrast, self.brightness, self.texture_width, 2*self.stim_window.display_width, row_type=self.stim_window.backend.texel_type)
+            self.phase_index = None
+
+        if self.scroll:
+            # number of grating periods across the quad
+            s = self.frequency*2*self.stim_window.display_width
+        else:
+            s = 1.0
+
+        self.quad = quad(-self.stim_window.px_width/2, -self.stim_window.px_height/2, self.stim_window.px_width/2, self.stim_window.px_height/2, s_1=s)
+
+        # set redraw bool
+        self.redraw = True
+
+    def create_grating(self):
+        if self.scroll:
+            # get the texture for one period of the grating
+            self.grating = grating_period(self.contrast, self.brightness, self.texture_width, row_type=self.stim_window.backend.texel_type)
+            first_texel = 0
+        else:
+            # select the slice of the profile for the current phase
+            self.phase_index = self.profile.index(self.phase)
+            self.grating = self.profile.rows[self.phase_index[0]]
+            first_texel = self.phase_index[1]
+
+        return first_texel
+
+    def create_texture(self):
+        # generate the texture
+        first_texel = self.create_grating()
+
+        if self.texture is None:
+            # create the texture
+            self.texture = self.stim_window.backend.create_texture(self.texture_width, 1)
+
+        # upload the grating, starting from the first texel of the slice
+        self.stim_window.backend.update_texture(self.texture, self.grating, self.texture_width, 1, first_texel)
+
+    def change_velocity(self, change_in_velocity):
+        self.velocity = change_in_velocity*self.velocity_init
+        self.phase_motion.change_rate(self.velocity)
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update phase
+        self.phase = self.phase_motion.at(t)
+        self.t = self.t_init + t
+
+        # set redraw bool if the grating has moved to a new phase step
+        if not self.scroll and self.profile.index(self.phase) != self.phase_index:
+            self.redraw = True
+
+    def end_func(self):
+        # release the texture
+        if self.texture is not None:
+            self.stim_window.backend.release_texture(self.texture)
+            self.texture = None
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "phase": self.phase}, ["phase"]
+
+    def render_func(self):
+        if self.redraw:
+            # redraw the texture
+            self.create_texture()
+
+            # reset redraw bool
+            self.redraw = False
+
+        backend = self.stim_window.backend
+
+        backend.set_ortho(self.stim_window.px_width, self.stim_window.px_height)
+
+        if self.scroll:
+            # shift the grating by the current phase
+            texture_offset = -self.phase*self.frequency
+        else:
+            texture_offset = 0
+
+        backend.push_transform(self.stim_window.px_width/2, self.stim_window.px_height/2, self.angle, self.stim_window.display_width/self.stim_window.px_width, self.stim_window.display_width/self.stim_window.px_height)
+
+        # draw texture quad
+        backend.draw_quads(self.quad, texture=self.texture, texture_offset=texture_offset)
+
+        backend.pop_transform()
+
+##!!Need class OKR
+class OptomotorGratingStim():
+    #taken from GratingStim in swim_window.py
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        self.texture = None
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("OptomotorStim: Updating parameters.")
+
+        self.redraw = False
+
+        self.resolution = resolution # px/cm
+        self.distance = distance # cm
+        self.duration = duration*1000.0 # ms
+
+        self.rad_width = math.atan2(self.stim_window.display_width/2.0, self.distance*self.resolution)*2
+        self.frequency = params.frequency*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width) # rad/px
+        self.init_phase = params.init_phase*(math.pi/180.0)*self.stim_window.display_width/self.rad_width
+        self.velocity_init = params.velocity*(math.pi/180.0)*self.stim_window.display_width/self.rad_width/1000.0
+        self.velocity = self.velocity_init
+        self.contrast = params.contrast
+        self.brightness = params.brightness
+        self.angle = params.angle
+        self.merging_pos = int(params.merging_pos*2*self.stim_window.display_width)
+        self.merging_pos_deg = self.merging_pos*self.rad_width/self.stim_window.display_width
+
+        print(self.merging_pos)
+
+        print(self.stim_window.display_width)
+        print("merging", self.merging_pos)
+
+        self.t_init = -self.duration*1000.0 # ms
+        self.t = self.t_init
+
+        self.phase = self.init_phase
+
+        # the phase is computed from the time since the start of the stim
+        self.phase_motion = Motion(self.init_phase, self.velocity)
+
+        self.scroll = SCROLL_GRATINGS
+
+        if self.scroll:
+            # the texture holds one period of the grating
+            self.texture_width = GRATING_PERIOD_TEXELS
+
+            self.quads = self.converging_quads()
+        else:
+            self.texture_width = int(self.stim_window.display_width/2)
+
+            self.quads = quad(-self.stim_window.px_width/2, -self.stim_window.px_height/2, self.stim_window.px_width/2, self.stim_window.px_height/2)
+
+        # set redraw bool
+        self.redraw = True
+
+    def create_grating(self):
+        if self.scroll:
+            # get the texture for one period of the grating
+            self.grating = grating_period(self.contrast, self.brightness, self.texture_width, row_type=self.stim_window.backend.texel_type)
+            return
+
+        grating = bytearray(3*self.texture_width)
+
+        # generate the grating texture
+        for x in range(self.texture_width):
+            x_2 = (x/self.texture_width)*(2*self.stim_window.display_width)
+            if x_2 >= self.merging_pos:
+                w = (0.5*self.contrast*math.sin((2*self.merging_pos - x_2)*2*math.pi*self.frequency - self.phase*self.frequency*2*math.pi + self.merging_pos_deg*self.frequency*2*math.pi) + 0.5)*self.brightness*255
+            else:
+                w = (0.5*self.contrast*math.sin(x_2*2*math.pi*self.frequency - self.phase*self.frequency*2*math.pi + self.merging_pos_deg*self.frequency*2*math.pi) + 0.5)*self.brightness*255
+
+            grating[3*x]   = int(w)
+            grating[3*x+1] = int(w)
+            grating[3*x+2] = int(w)
+
+        self.grating = self.stim_window.backend.texel_type(grating)
+
+    def create_texture(self):
+        # generate the texture
+        self.create_grating()
+
+        # create the texture, or upload the new grating to it
+        if self.texture is None:
+            self.texture = self.stim_window.backend.create_texture(self.texture_width, 1, self.grating)
+        else:
+            self.stim_window.backend.update_texture(self.texture, self.grating, self.texture_width)
+
+    def change_velocity(self, change_in_velocity):
+        self.velocity = change_in_velocity*self.velocity_init
+        self.phase_motion.change_rate(self.velocity)
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update phase
+        self.phase = self.phase_motion.at(t)
+        self.t = self.t_init + t
+
+        # set redraw bool
+        if not self.scroll:
+            self.redraw = True
+
+    def end_func(self):
+        # release the texture
+        if self.texture is not None:
+            self.stim_window.backend.release_texture(self.texture)
+            self.texture = None
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "phase": self.phase}, ["phase"]
+
+    def render_func(self):
+        if self.redraw:
+            # redraw the texture
+            self.create_texture()
+
+            # reset redraw bool
+            self.redraw = False
+
+        backend = self.stim_window.backend
+
+        # set projection
+        backend.set_ortho(self.stim_window.px_width, self.stim_window.px_height)
+
+        if self.scroll:
+            # shift the grating by the current phase
+            texture_offset = -self.phase*self.frequency
+        else:
+            texture_offset = 0
+
+        backend.push_transform(self.stim_window.px_width/2, self.stim_window.px_height/2, self.angle, self.stim_window.display_width/self.stim_window.px_width, self.stim_window.display_width/self.stim_window.px_height)
+
+        # draw texture quads
+        backend.draw_quads(self.quads, texture=self.texture, texture_offset=texture_offset)
+
+        backend.pop_transform()
+
+    def converging_quads(self):
+        # get the grating as two quads that meet at the merging position, with the
+        # texture mirrored on the right quad so that both halves drift towards it
+        width  = self.stim_window.px_width
+        height = self.stim_window.px_height
+        span   = 2*self.stim_window.display_width
+
+        # merging position as a fraction of the quad's width
+        split = min(max(self.merging_pos/span, 0.0), 1.0)
+        split_x = -width/2 + split*width
+
+        # texture coordinates (in grating periods) at the left edge, merging position & right edge
+        s_left   = self.frequency*self.merging_pos_deg
+        s_split  = self.frequency*(split*span + self.merging_pos_deg)
+        s_mirror = self.frequency*(2*self.merging_pos - split*span + self.merging_pos_deg)
+        s_right  = self.frequency*(2*self.merging_pos - span + self.merging_pos_deg)
+
+        quads = ()
+
+        if split > 0:
+            quads += quad(-width/2, -height/2, split_x, height/2, s_left, 0, s_split, 1.0)
+
+        if split < 1:
+            quads += quad(split_x, -height/2, width/2, height/2, s_mirror, 0, s_right, 1.0)
+
+        return quads
+
+class BroadbandGratingStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        # update parameters
+        self.texture = None
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("GratingStim: Updating parameters.")
+
+        self.redraw = False
+
+        self.resolution = resolution # px/cm
+        self.distance = distance # cm
+        self.duration = duration*1000.0 # ms
+
+        self.rad_width = math.atan2(self.stim_window.display_width*2/2.0, self.distance*self.resolution)*2
+        self.frequency = params.frequency*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width*2) # rad/px
+        self.init_phase = params.init_phase*(math.pi/180.0)*self.stim_window.display_width*2/self.rad_width
+        self.velocity_init = params.velocity*(math.pi/180.0)*self.stim_window.display_width*2/self.rad_width/1000.0
+        self.velocity = self.velocity_init
+        self.contrast = params.contrast
+        self.brightness = params.brightness
+        self.angle = params.angle
+        self.dish_radius = self.stim_window.dish_radius
+        self.warp_perspective = self.stim_window.warp_perspective
+
+        self.t_init = -self.duration*1000.0 # ms
+        self.t = self.t_init
+
+        self.phase = self.init_phase
+
+        # the phase & the offset of the profile are computed from the time since the start of the stim
+        self.phase_motion  = Motion(self.init_phase, -self.velocity)
+        self.offset_motion = Motion(self.t_init*self.velocity, self.velocity)
+        self.offset = self.offset_motion.at(0)
+
+        self.scroll = SCROLL_GRATINGS
+
+        # get the precomputed profile for these params (it repeats every display_width texels)
+        self.texture_width = self.stim_window.display_width*2
+        self.profile = broadband_profile(self.frequency, self.contrast, self.brightness, self.stim_window.display_width, self.texture_width, row_type=self.stim_window.backend.texel_type)
+
+        self.quad = quad(-self.stim_window.px_width/2, -self.stim_window.px_height/2, self.stim_window.px_width/2, self.stim_window.px_height/2)
+
+        # set redraw bool
+        self.redraw = True
+
+    def create_texture(self):
+        if self.scroll:
+            # upload the whole profile once; it is shifted by scrolling the texture
+            row, first_texel = 0, 0
+            n_texels = self.texture_width
+        else:
+            # select the slice of the profile for the current offset
+            row, first_texel = self.profile.index(self.offset)
+            n_texels = 2*self.stim_window.px_width
+
+        if self.texture is None:
+            # create the texture
+            self.texture = self.stim_window.backend.create_texture(self.texture_width, 1, rgba=True)
+
+        # upload the texels, starting from the first texel of the slice
+        self.stim_window.backend.update_texture(self.texture, self.profile.rows[row], n_texels, 1, first_texel, rgba=True)
+
+    def change_velocity(self, change_in_velocity):
+        self.velocity = change_in_velocity*self.velocity_init
+        self.phase_motion.change_rate(-self.velocity)
+        self.offset_motion.change_rate(self.velocity)
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update phase & offset
+        self.phase = self.phase_motion.at(t)
+        self.offset = self.offset_motion.at(t)
+        self.t = self.t_init + t
+
+        # set redraw bool
+        if not self.scroll:
+            self.redraw = True
+
+    def end_func(self):
+        # release the texture
+        if self.texture is not None:
+            self.stim_window.backend.release_texture(self.texture)
+            self.texture = None
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "phase": self.phase}, ["phase"]
+
+    def render_func(self):
+        backend = self.stim_window.backend
+
+        # set projection
+        backend.set_ortho(self.stim_window.px_width, self.stim_window.px_height)
+
+        if self.redraw:
+            # redraw the texture
+            self.create_texture()
+
+            # reset redraw bool
+            self.redraw = False
+
+        if self.scroll:
+            # shift the profile by the distance it has drifted
+            texture_offset = -self.offset/(self.stim_window.display_width*2)
+        else:
+            texture_offset = 0
+
+        backend.push_transform(self.stim_window.px_width/2, self.stim_window.px_height/2, self.angle, 2*self.stim_window.display_width/self.stim_window.px_width, 2*self.stim_window.display_height/self.stim_window.px_height)
+
+        # draw texture quad
+        backend.draw_quads(self.quad, (1.0, 1.0, 1.0), self.texture, texture_offset)
+
+        backend.pop_transform()
+
+class NoiseStim():
+    '''
+    Drifting Perlin noise luminance pattern.
+
+    The noise field is computed once per seed & # of octaves (& cached on
+    disk, see noise_field()) into a texture that tiles, which is drifted by
+    scrolling it like a grating, so no noise is evaluated while the stim is
+    running.
+    '''
+
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        self.texture = None
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("NoiseStim: Updating parameters.")
+
+        self.redraw = False
+
+        self.resolution = resolution # px/cm
+        self.distance = distance # cm
+        self.duration = duration*1000.0 # ms
+
+        self.rad_width = math.atan2(self.stim_window.display_width/2.0, self.distance*self.resolution)*2
+        self.frequency = params.frequency*(180.0/math.pi)*self.rad_width/(self.stim_window.display_width) # noise cells/px
+        self.velocity_init = params.velocity*(math.pi/180.0)*self.stim_window.display_width/self.rad_width/1000.0
+        self.velocity = self.velocity_init
+        self.contrast = params.contrast
+        self.brightness = params.brightness
+        self.angle = params.angle
+        self.octaves = max(1, int(params.octaves))
+        self.seed = int(params.seed)
+
+        self.t_init = -self.duration*1000.0 # ms
+        self.t = self.t_init
+
+        # the distance the noise has drifted (px) is computed from the time since the start of the stim
+        self.phase = 0.0
+        self.phase_motion = Motion(0.0, self.velocity)
+
+        # number of times the texture repeats across the quad
+        s = self.frequency*2*self.stim_window.display_width/NOISE_CELLS
+
+        self.quad = quad(-self.stim_window.px_width/2, -self.stim_window.px_height/2, self.stim_window.px_width/2, self.stim_window.px_height/2, s_1=s, t_1=s)
+
+        # set redraw bool
+        self.redraw = True
+
+    def create_texture(self):
+        # get the texels of the noise field & upload them once
+        texels = noise_texture(self.seed, self.octaves, self.contrast, self.brightness, row_type=self.stim_window.backend.texel_type)
+
+        self.texture = self.stim_window.backend.create_texture(NOISE_TEXTURE_SIZE, NOISE_TEXTURE_SIZE, texels)
+
+    def change_velocity(self, change_in_velocity):
+        self.velocity = change_in_velocity*self.velocity_init
+        self.phase_motion.change_rate(self.velocity)
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        # update phase
+        self.phase = self.phase_motion.at(t)
+        self.t = self.t_init + t
+
+    def end_func(self):
+        # release the texture
+        if self.texture is not None:
+            self.stim_window.backend.release_texture(self.texture)
+            self.texture = None
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type,
+                "phase": self.phase}, ["phase"]
+
+    def render_func(self):
+        if self.redraw:
+            # create the texture
+            self.create_texture()
+
+            # reset redraw bool
+            self.redraw = False
+
+        backend = self.stim_window.backend
+
+        backend.set_ortho(self.stim_window.px_width, self.stim_window.px_height)
+
+        backend.push_transform(self.stim_window.px_width/2, self.stim_window.px_height/2, self.angle, self.stim_window.display_width/self.stim_window.px_width, self.stim_window.display_width/self.stim_window.px_height)
+
+        # draw texture quad, shifted by the distance the noise has drifted
+        backend.draw_quads(self.quad, texture=self.texture, texture_offset=-self.phase*self.frequency/NOISE_CELLS)
+
+        backend.pop_transform()
+
+class DelayStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("DelayStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        pass
+
+    def end_func(self):
+        pass
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type}, None
+
+    def render_func(self):
+        pass
+
+class BlackFlashStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("BlackFlashStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        pass
+
+    def end_func(self):
+        pass
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type}, None
+
+    def render_func(self):
+        # draw in the viewport background
+        self.stim_window.backend.fill((0.0, 0.0, 0.0))
+
+class WhiteFlashStim():
+    def __init__(self, stim_window):
+        self.stim_window = stim_window
+
+        # get parameters
+        distance = self.stim_window.distance
+        resolution = self.stim_window.resolution
+        duration = self.stim_window.duration
+        params = self.stim_window.params
+
+        self.stim_index = self.stim_window.stim_index
+        self.stim_name  = self.stim_window.stim_name
+        self.stim_type  = self.stim_window.stim_type
+
+        self.brightness = params.brightness
+
+        # update parameters
+        self.update_params(distance, resolution, duration, params)
+
+    def update_params(self, distance, resolution, duration, params):
+        print("WhiteFlashStim: Updating parameters.")
+
+        self.duration = duration*1000.0 # ms
+
+    def start_func(self):
+        pass
+
+    def update_func(self, t):
+        pass
+
+    def end_func(self):
+        pass
+
+    def current_state(self):
+        return {"stim #": self.stim_index,
+                "stim name": self.stim_name,
+                "stim type": self.stim_type}, None
+
+    def render_func(self):
+        # draw in the viewport background
+        self.stim_window.backend.fill((self.brightness, self.brightness, self.brightness))
+
+# stim classes by stim type
+STIM_CLASSES = {"Looming Dot": LoomingDotStim,
+                "Moving Dot": MovingDotStim,
+                "Grating": GratingStim,
+                "Delay": DelayStim,
+                "Black Flash": BlackFlashStim,
+                "White Flash": WhiteFlashStim,
+                "Combined Dots": CombinedDotStim,
+                "Optomotor Grating": OptomotorGratingStim,
+                "Broadband Grating": BroadbandGratingStim,
+                "Perlin Noise": NoiseStim,
+                "Multiple Moving Dots": MultipleMovingDotsStim,
+                "Random Dot Kinematogram": RandomDotKinematogramStim}
+
+# --- TESTS --- #
+
+class _HeadlessStimWindow():
+    '''
+    Stand-in for StimWindow with the attributes that the stims use.
+    '''
+
+    def __init__(self, backend, stim_type, params, duration=10):
+        self.backend = backend
+
+        self.display_width  = 1280
+        self.display_height = 800
+        self.px_width  = 640
+        self.px_height = 400
+
+        self.dish_radius = 100
+        self.distance = self.dish_radius
+        self.resolution = self.display_width/20
+        self.warp_perspective = True
+
+        self.clock = FrameClock(60)
+
+        self.stim_index = 0
+        self.stim_name  = stim_type
+        self.stim_type  = stim_type
+        self.duration   = duration
+        self.params     = as_stim_params(stim_type, params)
+
+def check_render_costs(n_frames=120):
+    # render each type of stim with a recording backend & check how much it costs per frame
+    from render_backend import RecordingBackend
+
+    grating_params = {'frequency': 0.2, 'init_phase': 0.0, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0}
+    looming_dot_params = {'looming_dot_init_x_pos': 0, 'looming_dot_init_y_pos': 0, 'l_v': 20, 'looming_dot_brightness': 1.0, 'background_brightness': 0, 'checkered': False, 'num_squares': 10, 'expand_checkered_pattern': True}
+    moving_dot_params = {'radius': 10.0, 'moving_dot_init_x_pos': 0.0, 'moving_dot_init_y_pos': 0.0, 'v_x': 1.0, 'v_y': 0.0, 'moving_dot_brightness': 1.0, 'background_brightness': 0}
+
+    checkered_params = dict(looming_dot_params)
+    checkered_params['checkered'] = True
+
+    combined_dots_params = dict(looming_dot_params)
+    combined_dots_params.update(moving_dot_params)
+
+    optomotor_grating_params = dict(grating_params)
+    optomotor_grating_params['merging_pos'] = 0.25
+
+    noise_params = {'frequency': 0.1, 'octaves': 3, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0, 'seed': 0}
+
+    multiple_moving_dots_params = {'n_dots': 5000, 'radius': 2.0, 'v_x': 5.0, 'v_y': 0.0, 'velocity_spread': 1.0, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': 0}
+
+    random_dot_kinematogram_params = {'density': 50, 'radius': 2.0, 'velocity': 5.0, 'angle': 45, 'coherence': 0.5, 'lifetime': 100, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': 0}
+
+    # stim type, stim class, params & maximum draw calls per frame
+    stims = [("Looming Dot", LoomingDotStim, looming_dot_params, 2),
+             ("Looming Dot (checkered)", LoomingDotStim, checkered_params, 2),
+             ("Moving Dot", MovingDotStim, moving_dot_params, 2),
+             ("Combined Dots", CombinedDotStim, combined_dots_params, 3),
+             ("Grating", GratingStim, grating_params, 1),
+             ("Optomotor Grating", OptomotorGratingStim, optomotor_grating_params, 1),
+             ("Broadband Grating", BroadbandGratingStim, grating_params, 1),
+             ("Perlin Noise", NoiseStim, noise_params, 1),
+             ("Multiple Moving Dots", MultipleMovingDotsStim, multiple_moving_dots_params, 2),
+             ("Random Dot Kinematogram", RandomDotKinematogramStim, random_dot_kinematogram_params, 2),
+             ("Black Flash", BlackFlashStim, {}, 1),
+             ("White Flash", WhiteFlashStim, {'brightness': 1.0}, 1)]
+
+    backend = RecordingBackend()
+
+    print("stim                     draw calls/frame  state changes/frame  texture uploads")
+
+    for stim_type, stim_class, params, max_draw_calls in stims:
+        # some stim types are labelled with their params in brackets
+        stim_window = _HeadlessStimWindow(backend, stim_type.split(" (")[0], params)
+
+        backend.reset()
+
+        stim = stim_class(stim_window)
+        stim.start_func()
+
+        for i in range(n_frames):
+            stim.update_func((i + 1)*1000.0/60)
+            stim.render_func()
+
+        stim.end_func()
+
+        counts = backend.counts()
+
+        print("{:24s} {:16.2f} {:20.2f} {:16d}".format(stim_type, counts["draw calls"]/n_frames, counts["state changes"]/n_frames, counts["texture uploads"]))
+
+        assert counts["draw calls"] <= max_draw_calls*n_frames, stim_type
+
+        # scrolling gratings & checkered dots only upload their texture once
+        if stim_class is not BroadbandGratingStim or SCROLL_GRATINGS:
+            assert counts["texture uploads"] <= 1, stim_type
+
+        # all textures are released when the stim ends
+        assert backend.n_live_textures() == 0, stim_type
+
+def check_state_at_any_frame(n_frames=600):
+    # check that jumping straight to a frame gives the same state as updating the stim on every frame before it
+    from render_backend import RecordingBackend
+
+    grating_params = {'frequency': 0.2, 'init_phase': 10.0, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 0}
+    moving_dot_params = {'radius': 10.0, 'moving_dot_init_x_pos': 0.0, 'moving_dot_init_y_pos': 0.0, 'v_x': 1.0, 'v_y': 2.0, 'moving_dot_brightness': 1.0, 'background_brightness': 0}
+    looming_dot_params = {'looming_dot_init_x_pos': 0, 'looming_dot_init_y_pos': 0, 'l_v': 20, 'looming_dot_brightness': 1.0, 'background_brightness': 0, 'checkered': False, 'num_squares': 10, 'expand_checkered_pattern': True}
+
+    stims = [("Looming Dot", LoomingDotStim, looming_dot_params),
+             ("Moving Dot", MovingDotStim, moving_dot_params),
+             ("Grating", GratingStim, grating_params),
+             ("Optomotor Grating", OptomotorGratingStim, dict(grating_params, merging_pos=0.25)),
+             ("Broadband Grating", BroadbandGratingStim, grating_params),
+             ("Perlin Noise", NoiseStim, {'frequency': 0.1, 'octaves': 2, 'velocity': 5, 'contrast': 1.0, 'brightness': 1.0, 'angle': 30, 'seed': 1}),
+             ("Random Dot Kinematogram", RandomDotKinematogramStim, {'density': 20, 'radius': 2.0, 'velocity': 5.0, 'angle': 0, 'coherence': 0.8, 'lifetime': 200, 'dot_brightness': 1.0, 'background_brightness': 0, 'seed': 2})]
+
+    period = 1000.0/60
+
+    for stim_type, stim_class, params in stims:
+        stepped = stim_class(_HeadlessStimWindow(RecordingBackend(), stim_type, params, duration=20))
+        stepped.start_func()
+
+        for i in range(1, n_frames + 1):
+            stepped.update_func(i*period)
+
+        jumped = stim_class(_HeadlessStimWindow(RecordingBackend(), stim_type, params, duration=20))
+        jumped.start_func()
+        jumped.update_func(n_frames*period)
+
+        assert stepped.current_state() == jumped.current_state(), stim_type
+
+    # live changes of a moving dot's velocity are relative to its initial speed, along either axis
+    moving_dot = MovingDotStim(_HeadlessStimWindow(RecordingBackend(), "Moving Dot", moving_dot_params, duration=20)).moving_dot
+    moving_dot.change_v_x(0.5)
+    moving_dot.change_v_y(-0.5)
+    moving_dot.change_v_y(-0.5)
+
+    assert moving_dot.v_x == -moving_dot.v_y == 0.5*moving_dot.max_v_init > 0
+
+    print("state after {} frames matches the state computed directly for {} stims".format(n_frames, len(stims)))
+
+if __name__ == "__main__":
+    check_render_costs()
+    check_state_at_any_frame()
@@ -1,3 +1,3 @@
-import controller as c
-
+import controller as c
+
 controller = c.StimController()
\ No newline at end of file